@@ -11,6 +11,7 @@ from alembic import context
 from app.config import settings
 from app.database import Base
 from app.models import User, Task
+from app.utils.backfill import checkpoint_metadata
 
 # this is the Alembic Config object
 config = context.config
@@ -23,7 +24,8 @@ if config.config_file_name is not None:
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # Model metadata for autogenerate support
-target_metadata = Base.metadata
+# Backfill checkpoints are created on demand but must not look like drift
+target_metadata = [Base.metadata, checkpoint_metadata]
 
 
 def run_migrations_offline() -> None:
@@ -42,7 +44,14 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection: Connection) -> None:
     """Run migrations with connection."""
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # Commit each revision separately so a long backfill never holds
+        # earlier schema changes hostage, and an interrupted run resumes there
+        transaction_per_migration=True,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,84 @@
+"""backfill task title_lower
+
+Adds a nullable ``tasks.title_lower`` column (a metadata-only change on
+PostgreSQL, so no table rewrite or long lock), backfills it in keyset-ordered,
+checkpointed batches outside the migration transaction, then builds the index
+concurrently. Tune the run with ``-x`` arguments, for example::
+
+    alembic -x batch_size=5000 -x rows_per_second=20000 upgrade head
+
+Revision ID: 7c4e2a9f5d13
+Revises: 3b1f8c2d9a41
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Optional
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.backfill import Backfill, reset_checkpoint
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e2a9f5d13'
+down_revision = '3b1f8c2d9a41'
+branch_labels = None
+depends_on = None
+
+BACKFILL_NAME = 'tasks_title_lower'
+
+tasks = sa.table(
+    'tasks',
+    sa.column('id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('title_lower', sa.String),
+)
+
+
+def fill_title_lower(connection: sa.engine.Connection, lower: Optional[int], upper: int) -> None:
+    """Lowercase titles in Python so non-ASCII matches ``str.lower`` on every dialect."""
+    query = sa.select(tasks.c.id, tasks.c.title).where(
+        tasks.c.id <= upper, tasks.c.title_lower.is_(None)
+    )
+    if lower is not None:
+        query = query.where(tasks.c.id > lower)
+    rows = connection.execute(query).all()
+    if rows:
+        connection.execute(
+            tasks.update().where(tasks.c.id == sa.bindparam('task_id')),
+            [{'task_id': row.id, 'title_lower': row.title.lower()} for row in rows],
+        )
+
+
+def upgrade() -> None:
+    options = context.get_x_argument(as_dictionary=True)
+    rows_per_second = options.get('rows_per_second')
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('title_lower', sa.String(length=200), nullable=True))
+
+    # Leave the migration transaction; the backfill commits per batch on its own connection
+    with op.get_context().autocommit_block():
+        with op.get_bind().engine.connect() as connection:
+            Backfill(
+                BACKFILL_NAME,
+                tasks,
+                apply=fill_title_lower,
+                batch_size=int(options.get('batch_size', 1000)),
+                rows_per_second=float(rows_per_second) if rows_per_second else None,
+            ).run(connection)
+        op.create_index(
+            op.f('ix_tasks_title_lower'),
+            'tasks',
+            ['title_lower'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tasks_title_lower'), table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('title_lower')
+    reset_checkpoint(op.get_bind(), BACKFILL_NAME)
@@ -0,0 +1,113 @@
+"""task change feed
+
+Adds ``tasks.change_seq`` (backfilled from ``id`` in checkpointed batches),
+the single-row ``change_sequence`` counter, the ``task_tombstones`` table and
+``(owner_id, change_seq)`` indexes so the change feed is a range scan.
+
+Revision ID: e5a8d1c3b7f2
+Revises: 7c4e2a9f5d13
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Optional
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.backfill import Backfill, reset_checkpoint
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a8d1c3b7f2'
+down_revision = '7c4e2a9f5d13'
+branch_labels = None
+depends_on = None
+
+BACKFILL_NAME = 'tasks_change_seq'
+
+tasks = sa.table(
+    'tasks',
+    sa.column('id', sa.Integer),
+    sa.column('change_seq', sa.BigInteger),
+)
+
+
+def fill_change_seq(connection: sa.engine.Connection, lower: Optional[int], upper: int) -> None:
+    """Existing rows take their id as change sequence, which keeps insertion order."""
+    query = tasks.update().where(
+        tasks.c.id <= upper, tasks.c.change_seq.is_(None)
+    ).values(change_seq=tasks.c.id)
+    if lower is not None:
+        query = query.where(tasks.c.id > lower)
+    connection.execute(query)
+
+
+def upgrade() -> None:
+    options = context.get_x_argument(as_dictionary=True)
+    rows_per_second = options.get('rows_per_second')
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_task_tombstones_owner_id_change_seq',
+        'task_tombstones',
+        ['owner_id', 'change_seq'],
+        unique=False,
+    )
+    op.create_index(
+        op.f('ix_task_tombstones_deleted_at'), 'task_tombstones', ['deleted_at'], unique=False
+    )
+    change_sequence = op.create_table(
+        'change_sequence',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('compacted_through', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(change_sequence, [{'id': 1, 'value': 0, 'compacted_through': 0}])
+
+    # Leave the migration transaction; the backfill commits per batch on its own connection
+    with op.get_context().autocommit_block():
+        with op.get_bind().engine.connect() as connection:
+            Backfill(
+                BACKFILL_NAME,
+                tasks,
+                apply=fill_change_seq,
+                batch_size=int(options.get('batch_size', 1000)),
+                rows_per_second=float(rows_per_second) if rows_per_second else None,
+            ).run(connection)
+            # New sequence numbers start above every backfilled one
+            connection.execute(
+                sa.text(
+                    'UPDATE change_sequence SET value = '
+                    '(SELECT COALESCE(MAX(change_seq), 0) FROM tasks) WHERE id = 1'
+                )
+            )
+            connection.commit()
+        op.create_index(
+            'ix_tasks_owner_id_change_seq',
+            'tasks',
+            ['owner_id', 'change_seq'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_owner_id_change_seq', table_name='tasks')
+    op.drop_table('change_sequence')
+    op.drop_index(op.f('ix_task_tombstones_deleted_at'), table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_owner_id_change_seq', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('change_seq')
+    reset_checkpoint(op.get_bind(), BACKFILL_NAME)
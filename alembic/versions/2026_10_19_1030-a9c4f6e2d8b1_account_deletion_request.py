@@ -0,0 +1,29 @@
+"""account deletion request
+
+Adds ``users.deletion_requested_at``, set when an account is closed and
+cleared only by purging the account.
+
+Revision ID: a9c4f6e2d8b1
+Revises: e5a8d1c3b7f2
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c4f6e2d8b1'
+down_revision = 'e5a8d1c3b7f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('deletion_requested_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('deletion_requested_at')
@@ -0,0 +1,92 @@
+"""task list filters
+
+Adds ``tasks.priority_rank`` (backfilled from ``priority`` in checkpointed
+batches) and an owner-leading index per task list filter and sort key, built
+concurrently on PostgreSQL. Tune the backfill with ``-x``
+arguments as for the earlier backfills.
+
+Revision ID: c3f7b2e9a6d4
+Revises: a9c4f6e2d8b1
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Optional
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.backfill import Backfill, reset_checkpoint
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f7b2e9a6d4'
+down_revision = 'a9c4f6e2d8b1'
+branch_labels = None
+depends_on = None
+
+BACKFILL_NAME = 'tasks_priority_rank'
+
+# Priorities are stored by enum name
+PRIORITY_RANKS = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3}
+
+INDEXES = {
+    'ix_tasks_owner_id_created_at': ['owner_id', 'created_at'],
+    'ix_tasks_owner_id_updated_at': ['owner_id', 'updated_at'],
+    'ix_tasks_owner_id_due_date': ['owner_id', 'due_date'],
+    'ix_tasks_owner_id_completed_at': ['owner_id', 'completed_at'],
+    'ix_tasks_owner_id_title_lower': ['owner_id', 'title_lower'],
+    'ix_tasks_owner_id_status_created_at': ['owner_id', 'status', 'created_at'],
+    'ix_tasks_owner_id_priority_rank_created_at': ['owner_id', 'priority_rank', 'created_at'],
+}
+
+tasks = sa.table(
+    'tasks',
+    sa.column('id', sa.Integer),
+    sa.column('priority', sa.String),
+    sa.column('priority_rank', sa.SmallInteger),
+)
+
+
+def fill_priority_rank(connection: sa.engine.Connection, lower: Optional[int], upper: int) -> None:
+    """Rank each task's priority so sorting by priority can use an index."""
+    query = tasks.update().where(
+        tasks.c.id <= upper, tasks.c.priority_rank.is_(None)
+    ).values(priority_rank=sa.case(PRIORITY_RANKS, value=tasks.c.priority, else_=2))
+    if lower is not None:
+        query = query.where(tasks.c.id > lower)
+    connection.execute(query)
+
+
+def upgrade() -> None:
+    options = context.get_x_argument(as_dictionary=True)
+    rows_per_second = options.get('rows_per_second')
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('priority_rank', sa.SmallInteger(), nullable=True))
+
+    # Leave the migration transaction; the backfill commits per batch on its own connection
+    with op.get_context().autocommit_block():
+        with op.get_bind().engine.connect() as connection:
+            Backfill(
+                BACKFILL_NAME,
+                tasks,
+                apply=fill_priority_rank,
+                batch_size=int(options.get('batch_size', 1000)),
+                rows_per_second=float(rows_per_second) if rows_per_second else None,
+            ).run(connection)
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                'tasks',
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('priority_rank')
+    reset_checkpoint(op.get_bind(), BACKFILL_NAME)
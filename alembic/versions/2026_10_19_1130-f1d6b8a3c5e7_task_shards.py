@@ -0,0 +1,36 @@
+"""task shards
+
+Adds ``users.shard`` (the task shard holding a user's tasks, NULL for
+shard 0) and ``change_sequence.next_task_id`` (the id counter a task shard
+draws new task ids from). Both stay NULL until sharding is enabled; shard
+tables are created and their counters seeded by ``python -m app.shards
+init``.
+
+Revision ID: f1d6b8a3c5e7
+Revises: c3f7b2e9a6d4
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1d6b8a3c5e7'
+down_revision = 'c3f7b2e9a6d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('shard', sa.SmallInteger(), nullable=True))
+    with op.batch_alter_table('change_sequence') as batch_op:
+        batch_op.add_column(sa.Column('next_task_id', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('change_sequence') as batch_op:
+        batch_op.drop_column('next_task_id')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('shard')
@@ -0,0 +1,63 @@
+"""archived tasks
+
+Adds ``archived_tasks``, the cold table the task archiver moves tasks done
+for longer than ``TASK_ARCHIVE_AFTER_DAYS`` into. It reuses the task enum
+types and carries a single index, so it starts empty and costs nothing
+until the archiver runs.
+
+Revision ID: b4e9d2f7a6c1
+Revises: f1d6b8a3c5e7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e9d2f7a6c1'
+down_revision = 'f1d6b8a3c5e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'archived_tasks',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('title_lower', sa.String(length=200), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column(
+            'status',
+            postgresql.ENUM('TODO', 'IN_PROGRESS', 'DONE', name='taskstatus', create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            'priority',
+            postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', name='taskpriority', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('priority_rank', sa.SmallInteger(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=True),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_archived_tasks_owner_id_completed_at',
+        'archived_tasks',
+        ['owner_id', 'completed_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_archived_tasks_owner_id_completed_at', table_name='archived_tasks')
+    op.drop_table('archived_tasks')
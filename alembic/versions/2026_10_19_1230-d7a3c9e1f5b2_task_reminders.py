@@ -0,0 +1,37 @@
+"""task reminders
+
+Adds ``ix_tasks_due_date``, which lets the reminder scheduler load the next
+window of due tasks across all owners with a range scan, and
+``job_leases``, which elects the one worker that sends reminders.
+
+Revision ID: d7a3c9e1f5b2
+Revises: b4e9d2f7a6c1
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3c9e1f5b2'
+down_revision = 'b4e9d2f7a6c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_due_date', 'tasks', ['due_date'], unique=False)
+    op.create_table(
+        'job_leases',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('holder', sa.String(length=100), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('checkpoint', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('job_leases')
+    op.drop_index('ix_tasks_due_date', table_name='tasks')
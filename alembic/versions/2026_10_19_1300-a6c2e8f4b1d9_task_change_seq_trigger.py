@@ -0,0 +1,91 @@
+"""task change seq trigger
+
+Tasks inserted without a change sequence, by workers still running a
+version from before the change feed, kept ``change_seq`` NULL and never
+appeared in the feed. A trigger now numbers such rows from the
+``change_sequence`` counter, and rows left unnumbered since the backfill
+are numbered once, above every existing sequence, so clients pick them up
+as new changes.
+
+Revision ID: a6c2e8f4b1d9
+Revises: d7a3c9e1f5b2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c2e8f4b1d9'
+down_revision = 'd7a3c9e1f5b2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+tasks = sa.table(
+    'tasks',
+    sa.column('id', sa.BigInteger),
+    sa.column('change_seq', sa.BigInteger),
+)
+change_sequence = sa.table(
+    'change_sequence',
+    sa.column('id', sa.Integer),
+    sa.column('value', sa.BigInteger),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            'CREATE OR REPLACE FUNCTION tasks_change_seq() RETURNS trigger AS $$ BEGIN '
+            'UPDATE change_sequence SET value = value + 1 WHERE id = 1 '
+            'RETURNING value INTO NEW.change_seq; '
+            'RETURN NEW; '
+            'END $$ LANGUAGE plpgsql'
+        )
+        op.execute(
+            'CREATE TRIGGER tasks_change_seq BEFORE INSERT ON tasks '
+            'FOR EACH ROW WHEN (NEW.change_seq IS NULL) EXECUTE PROCEDURE tasks_change_seq()'
+        )
+    else:
+        op.execute(
+            'CREATE TRIGGER tasks_change_seq AFTER INSERT ON tasks '
+            'WHEN NEW.change_seq IS NULL BEGIN '
+            'UPDATE change_sequence SET value = value + 1 WHERE id = 1; '
+            'UPDATE tasks SET change_seq = (SELECT value FROM change_sequence WHERE id = 1) '
+            'WHERE id = NEW.id; '
+            'END'
+        )
+
+    # With the trigger in place no new rows are left unnumbered; number the old ones
+    ids = bind.execute(
+        sa.select(tasks.c.id).where(tasks.c.change_seq.is_(None)).order_by(tasks.c.id)
+    ).scalars().all()
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        last = bind.execute(
+            change_sequence.update()
+            .where(change_sequence.c.id == 1)
+            .values(value=change_sequence.c.value + len(batch))
+            .returning(change_sequence.c.value)
+        ).scalar_one()
+        bind.execute(
+            tasks.update()
+            .where(tasks.c.id == sa.bindparam('task_id'), tasks.c.change_seq.is_(None))
+            .values(change_seq=sa.bindparam('seq')),
+            [
+                {'task_id': task_id, 'seq': last - len(batch) + offset + 1}
+                for offset, task_id in enumerate(batch)
+            ],
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS tasks_change_seq ON tasks')
+        op.execute('DROP FUNCTION IF EXISTS tasks_change_seq()')
+    else:
+        op.execute('DROP TRIGGER IF EXISTS tasks_change_seq')
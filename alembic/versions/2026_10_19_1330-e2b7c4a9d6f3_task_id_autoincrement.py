@@ -0,0 +1,58 @@
+"""task id autoincrement
+
+Without ``AUTOINCREMENT`` SQLite gives a new row the highest id in the
+table plus one, so once the newest tasks were archived their ids were
+handed out again: restoring the archived task then conflicted, and
+archived and hot tasks shared ids. SQLite can only add ``AUTOINCREMENT``
+by rebuilding the table, which also drops its triggers, so the change
+sequence trigger is created again, and the counter is seeded above every
+id used by ``tasks`` or ``archived_tasks``. PostgreSQL sequences never
+reuse ids, so nothing changes there.
+
+Revision ID: e2b7c4a9d6f3
+Revises: a6c2e8f4b1d9
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c4a9d6f3'
+down_revision = 'a6c2e8f4b1d9'
+branch_labels = None
+depends_on = None
+
+CHANGE_SEQ_TRIGGER = (
+    'CREATE TRIGGER tasks_change_seq AFTER INSERT ON tasks '
+    'WHEN NEW.change_seq IS NULL BEGIN '
+    'UPDATE change_sequence SET value = value + 1 WHERE id = 1; '
+    'UPDATE tasks SET change_seq = (SELECT value FROM change_sequence WHERE id = 1) '
+    'WHERE id = NEW.id; '
+    'END'
+)
+
+
+def _rebuild_tasks(autoincrement: bool) -> None:
+    with op.batch_alter_table(
+        'tasks', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}
+    ):
+        pass
+    op.execute(CHANGE_SEQ_TRIGGER)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_tasks(autoincrement=True)
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', coalesce(max(id), 0) "
+        "FROM (SELECT id FROM tasks UNION ALL SELECT id FROM archived_tasks)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_tasks(autoincrement=False)
@@ -0,0 +1,45 @@
+"""bigint task ids
+
+Widens ``tasks.id``, ``archived_tasks.id`` and ``task_tombstones.task_id``
+to 64 bits, along with the sequence behind ``tasks.id``: task shard n
+hands out ids from n * 2**40, past the 32-bit range of PostgreSQL's
+INTEGER. SQLite integers are already 64-bit, so nothing changes there.
+
+Revision ID: c8f1a5d3e9b7
+Revises: e2b7c4a9d6f3
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f1a5d3e9b7'
+down_revision = 'e2b7c4a9d6f3'
+branch_labels = None
+depends_on = None
+
+TASK_ID_COLUMNS = (('tasks', 'id'), ('archived_tasks', 'id'), ('task_tombstones', 'task_id'))
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in TASK_ID_COLUMNS:
+        op.alter_column(
+            table, column, existing_type=sa.Integer(), type_=sa.BigInteger(),
+            existing_nullable=False,
+        )
+    op.execute("ALTER SEQUENCE IF EXISTS tasks_id_seq AS BIGINT")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("ALTER SEQUENCE IF EXISTS tasks_id_seq AS INTEGER")
+    for table, column in TASK_ID_COLUMNS:
+        op.alter_column(
+            table, column, existing_type=sa.BigInteger(), type_=sa.Integer(),
+            existing_nullable=False,
+        )
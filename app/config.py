@@ -1,8 +1,10 @@
 """Application configuration and settings."""
-from typing import List, Union
+from typing import List, Literal, Union
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
 
+from app.startup import startup_timer
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -17,6 +19,92 @@ class Settings(BaseSettings):
         default="sqlite+aiosqlite:///./test.db",
         description="Database connection URL"
     )
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    
+    # Task sharding by owner (users stay in DATABASE_URL)
+    TASK_SHARD_URLS: str = Field(
+        default="",
+        description="Comma-separated task database URLs, append only (empty = no sharding)"
+    )
+    TASK_SHARD_VNODES: int = Field(default=64, ge=1, description="Hash ring points per shard")
+    
+    # SQLite concurrent mode (ignored for other databases)
+    SQLITE_CONCURRENT_MODE: bool = Field(
+        default=False,
+        description="Apply SQLite pragmas and route writes through one serialized connection"
+    )
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, ge=0)
+    SQLITE_MMAP_SIZE: int = Field(default=268435456, ge=0)
+    SQLITE_CACHE_SIZE: int = Field(default=-64000, description="Pages, or KiB when negative")
+    SQLITE_READ_POOL_SIZE: int = Field(default=4, ge=1)
+    
+    # Group commit for task writes
+    WRITE_BATCHING_ENABLED: bool = Field(
+        default=False,
+        description="Coalesce concurrent task writes into shared transactions"
+    )
+    WRITE_BATCH_MAX_SIZE: int = Field(default=64, ge=1)
+    WRITE_BATCH_MAX_LATENCY_MS: float = Field(
+        default=5.0,
+        ge=0,
+        description="Longest a queued write waits for its batch to fill"
+    )
+    
+    # Startup settings
+    DB_STARTUP_MODE: Literal["create_all", "migrations", "none"] = Field(
+        default="create_all",
+        description="create_all runs DDL on boot, migrations only checks the Alembic head"
+    )
+    ALEMBIC_CONFIG: str = "alembic.ini"
+    DB_POOL_WARMUP: int = Field(
+        default=0,
+        ge=0,
+        description="Connections opened at startup per engine (capped at its pool size)"
+    )
+    STARTUP_BUDGET_SECONDS: float = Field(default=2.0, ge=0)
+    
+    # Production server (python -m app.serve)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = Field(default=8000, ge=0, le=65535)
+    SERVER_WORKERS: int = Field(
+        default=0,
+        ge=0,
+        description="Worker processes (0 = sized from the CPUs available to the container)"
+    )
+    SERVER_WORKERS_PER_CPU: float = Field(default=1.0, gt=0)
+    SERVER_MAX_WORKERS: int = Field(default=32, ge=1)
+    SERVER_LOOP: Literal["auto", "asyncio", "uvloop"] = Field(
+        default="auto",
+        description="auto uses uvloop when installed"
+    )
+    SERVER_HTTP: Literal["auto", "h11", "httptools"] = Field(
+        default="auto",
+        description="auto uses httptools when installed"
+    )
+    SERVER_KEEPALIVE_SECONDS: int = Field(
+        default=65,
+        ge=1,
+        description="Idle keep-alive; keep above the load balancer's idle timeout"
+    )
+    SERVER_BACKLOG: int = Field(default=2048, ge=1)
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = Field(
+        default=30,
+        ge=0,
+        description="Time given to in-flight requests on shutdown and restart"
+    )
+    SERVER_MAX_REQUESTS: int = Field(
+        default=0,
+        ge=0,
+        description="Recycle a worker after this many requests (0 = never)"
+    )
+    SERVER_MAX_REQUESTS_JITTER: int = Field(
+        default=0,
+        ge=0,
+        description="Random extra requests per worker so workers do not recycle together"
+    )
     
     # Security settings
     SECRET_KEY: str = Field(
@@ -44,6 +132,169 @@ class Settings(BaseSettings):
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
+    # Paginated responses with estimate=true count at most this many rows
+    PAGE_TOTAL_ESTIMATE_CAP: int = Field(default=10_000, ge=1)
+    # Ids accepted by one GET/POST /tasks/batch request
+    TASK_BATCH_MAX_IDS: int = Field(default=200, ge=1)
+    
+    # Response cache for task reads
+    RESPONSE_CACHE_BACKEND: Literal["off", "memory", "redis"] = Field(
+        default="off",
+        description=(
+            "memory is per worker (turned off by app.serve for several workers "
+            "with local events); redis is shared by all workers"
+        )
+    )
+    RESPONSE_CACHE_TTL_SECONDS: float = Field(default=30.0, gt=0)
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=10_000, ge=1)
+    RESPONSE_CACHE_MAX_BYTES: int = Field(default=64 * 2**20, ge=1)
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    
+    # Task change feed
+    CHANGE_FEED_MAX_LIMIT: int = Field(default=500, ge=1)
+    TOMBSTONE_RETENTION_DAYS: int = Field(
+        default=30,
+        ge=1,
+        description="Deleted-task tombstones older than this are purged"
+    )
+    TOMBSTONE_COMPACTION_INTERVAL_SECONDS: float = Field(
+        default=3600,
+        ge=0,
+        description="Seconds between tombstone purges (0 disables the background job)"
+    )
+    
+    # Archiving of completed tasks into the cold archived_tasks table
+    TASK_ARCHIVE_AFTER_DAYS: int = Field(
+        default=90,
+        ge=1,
+        description="Tasks done and unchanged for longer than this are archived"
+    )
+    TASK_ARCHIVE_BATCH_SIZE: int = Field(
+        default=1000,
+        ge=1,
+        description="Tasks moved per transaction"
+    )
+    TASK_ARCHIVE_INTERVAL_SECONDS: float = Field(
+        default=3600,
+        ge=0,
+        description="Seconds between archiver runs (0 disables the background job)"
+    )
+    
+    # Task event stream (Server-Sent Events)
+    EVENTS_BACKEND: Literal["local", "postgres"] = Field(
+        default="local",
+        description="local reaches this worker only; postgres uses LISTEN/NOTIFY across workers"
+    )
+    EVENTS_QUEUE_SIZE: int = Field(
+        default=100,
+        ge=1,
+        description="Events buffered per connection before it is dropped with a resync hint"
+    )
+    EVENTS_HEARTBEAT_SECONDS: float = Field(default=15.0, gt=0)
+    EVENTS_MAX_SUBSCRIBERS: int = Field(default=10_000, ge=0)
+    
+    # Account deletion
+    ACCOUNT_PURGE_BATCH_SIZE: int = Field(
+        default=1000,
+        ge=1,
+        description="Tasks deleted per transaction when purging a closed account"
+    )
+    ACCOUNT_PURGE_INTERVAL_SECONDS: float = Field(
+        default=300,
+        ge=0,
+        description="Seconds between sweeps for unfinished purges (0 disables the sweep)"
+    )
+    
+    # Due-date reminders, sent by the one worker holding the reminder lease
+    REMINDER_SINK: Literal["off", "log", "events"] = Field(
+        default="events",
+        description="events publishes task.reminder to the owner's event streams; off disables"
+    )
+    REMINDER_LEAD_SECONDS: float = Field(
+        default=0.0,
+        ge=0,
+        description="Seconds before the due date to send the reminder"
+    )
+    REMINDER_WINDOW_SECONDS: float = Field(
+        default=300.0,
+        gt=0,
+        description="Upcoming reminders kept in memory; the window is reloaded every half window"
+    )
+    REMINDER_LEASE_SECONDS: float = Field(
+        default=30.0,
+        gt=0,
+        description="A dead lease holder is replaced after this long"
+    )
+    
+    # Readiness probe (/health/ready), answered from background measurements
+    HEALTH_SAMPLE_INTERVAL_SECONDS: float = Field(
+        default=0.5,
+        gt=0,
+        description="Seconds between event loop lag and pool saturation samples"
+    )
+    HEALTH_PING_INTERVAL_SECONDS: float = Field(default=5.0, gt=0)
+    HEALTH_PING_TIMEOUT_SECONDS: float = Field(default=2.0, gt=0)
+    HEALTH_MAX_POOL_SATURATION: float = Field(
+        default=1.0,
+        gt=0,
+        le=1,
+        description="Not ready when the pool averages at least this share checked out"
+    )
+    HEALTH_MAX_LOOP_LAG_MS: float = Field(
+        default=250.0,
+        gt=0,
+        description="Not ready when the event loop averages at least this much lag"
+    )
+    
+    # Structured access log
+    ACCESS_LOG_ENABLED: bool = False
+    ACCESS_LOG_FILE: str = Field(default="", description="Append to this file instead of stdout")
+    ACCESS_LOG_SAMPLE_RATE: float = Field(
+        default=0.01,
+        ge=0,
+        le=1,
+        description="Fraction of successful requests logged; errors and slow requests always are"
+    )
+    ACCESS_LOG_SLOW_MS: float = Field(default=500.0, ge=0)
+    ACCESS_LOG_QUEUE_SIZE: int = Field(
+        default=10_000,
+        ge=1,
+        description="Records buffered for the writer thread before new ones are dropped"
+    )
+    
+    # Request profiling (off unless a token or a sample rate is set)
+    PROFILING_TOKEN: str = Field(
+        default="",
+        description="Requests with this X-Profile-Token get their profile as the response"
+    )
+    PROFILING_SAMPLE_RATE: float = Field(
+        default=0.0,
+        ge=0,
+        le=1,
+        description="Fraction of requests profiled into PROFILING_DIR"
+    )
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_FILES: int = Field(default=100, ge=1)
+    PROFILING_INTERVAL_MS: float = Field(default=1.0, gt=0)
+    
+    # Bulk user provisioning
+    BULK_PROVISION_MAX_USERS: int = Field(default=1000, ge=1)
+    BULK_PROVISION_BATCH_SIZE: int = Field(default=500, ge=1)
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=0,
+        ge=0,
+        description="Processes used for bulk password hashing (0 = all CPUs)"
+    )
+    
+    # Request batching (POST /api/v1/batch)
+    BATCH_MAX_REQUESTS: int = Field(
+        default=20, ge=1, description="Most sub-requests accepted in one batch"
+    )
+    BATCH_MAX_CONCURRENCY: int = Field(
+        default=4,
+        ge=1,
+        description="Sub-requests of a parallel batch run at once, each with its own connection"
+    )
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -69,4 +320,5 @@ class Settings(BaseSettings):
         return [host.strip() for host in self.ALLOWED_HOSTS.split(",") if host.strip()]
 
 
-settings = Settings()
\ No newline at end of file
+with startup_timer.phase("settings"):
+    settings = Settings()
\ No newline at end of file
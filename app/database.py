@@ -1,47 +1,456 @@
 """Database configuration and session management."""
-from typing import AsyncGenerator
+import bisect
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.config import settings
+from app.startup import startup_timer
+
+
+def is_sqlite(url: str) -> bool:
+    """Check whether a database URL points at SQLite."""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_sqlite_memory(url: str) -> bool:
+    """Check whether a SQLite URL is an in-memory database."""
+    parsed = make_url(url)
+    database = parsed.database
+    return (
+        not database
+        or database == ":memory:"
+        or "mode=memory" in database
+        or parsed.query.get("mode") == "memory"
+    )
+
+
+def sqlite_pragmas(read_only: bool = False) -> Tuple[str, ...]:
+    """
+    PRAGMA statements applied to every SQLite connection in concurrent mode.
+    
+    Args:
+        read_only: Also make the connection refuse writes
+        
+    Returns:
+        Tuple[str, ...]: PRAGMA statements in execution order
+    """
+    pragmas = (
+        # busy_timeout first, so switching the journal mode waits for locks
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}",
+    )
+    if read_only:
+        pragmas += ("PRAGMA query_only = ON",)
+    return pragmas
+
+
+def _enable_foreign_keys(engine: AsyncEngine) -> None:
+    """Enforce foreign keys (and ON DELETE CASCADE) on SQLite, where they are off by default."""
+    
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
+
+
+def _install_pragmas(engine: AsyncEngine, read_only: bool = False) -> None:
+    """Run the SQLite pragmas whenever the engine opens a connection."""
+    statements = sqlite_pragmas(read_only)
+    
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+
+def create_engines(url: str) -> Tuple[AsyncEngine, Optional[AsyncEngine]]:
+    """
+    Create the engine(s) for a database URL.
+    
+    In SQLite concurrent mode the primary engine holds a single connection,
+    so writers queue on the pool instead of failing with "database is
+    locked", and a second engine provides read-only connections.
+    
+    Args:
+        url: Database URL
+        
+    Returns:
+        Tuple[AsyncEngine, Optional[AsyncEngine]]: Primary (writer) engine and
+        optional read-only engine
+    """
+    options: dict = dict(echo=settings.DEBUG, future=True, pool_pre_ping=True)
+    memory = is_sqlite(url) and is_sqlite_memory(url)
+    
+    if memory:
+        # In-memory SQLite uses a static pool, which takes no sizing options
+        engine = create_async_engine(url, **options)
+        _enable_foreign_keys(engine)
+        return engine, None
+    if not (settings.SQLITE_CONCURRENT_MODE and is_sqlite(url)):
+        engine = create_async_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            **options,
+        )
+        if is_sqlite(url):
+            _enable_foreign_keys(engine)
+        return engine, None
+    
+    writer = create_async_engine(url, pool_size=1, max_overflow=0, **options)
+    _enable_foreign_keys(writer)
+    _install_pragmas(writer)
+    reader = create_async_engine(
+        url, pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0, **options
+    )
+    _enable_foreign_keys(reader)
+    _install_pragmas(reader, read_only=True)
+    return writer, reader
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the read-only engine and writes to the writer.
+    
+    Once a transaction has written, every statement stays on the writer until
+    commit or rollback so the transaction reads its own writes. Sessions
+    with ``writer_only`` set (see ``use_writer``) never use the reader.
+    """
+    
+    def __init__(self, *args: Any, writer: Engine, reader: Engine, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.reader = reader
+        self.writer_only = False
+        self._wrote = False
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.writer_only or self._wrote or self._flushing or isinstance(clause, UpdateBase):
+            self._wrote = True
+            return self.writer
+        return self.reader
+    
+    def commit(self) -> None:
+        try:
+            super().commit()
+        finally:
+            self._wrote = False
+    
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            self._wrote = False
+
+
+def use_writer(session: AsyncSession) -> None:
+    """
+    Run every statement of a session on the writer, reads included.
+    
+    A read-modify-write reading from the reader would read one snapshot and
+    write over whatever another writer committed since, without an error.
+    
+    Args:
+        session: Session to pin; sessions that do not route are left as they are
+    """
+    if isinstance(session.sync_session, RoutingSession):
+        session.sync_session.writer_only = True
+
+
+def create_session_factory(
+    writer: AsyncEngine,
+    reader: Optional[AsyncEngine] = None,
+    info: Optional[Dict[str, Any]] = None,
+) -> async_sessionmaker:
+    """
+    Create an async session factory, routing reads when a reader is given.
+    
+    Args:
+        writer: Primary engine
+        reader: Optional read-only engine
+        info: Initial ``Session.info`` of every session
+        
+    Returns:
+        async_sessionmaker: Session factory
+    """
+    options: dict = dict(
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+        info=info,
+    )
+    if reader is None:
+        return async_sessionmaker(writer, **options)
+    return async_sessionmaker(
+        sync_session_class=RoutingSession,
+        writer=writer.sync_engine,
+        reader=reader.sync_engine,
+        **options,
+    )
+
+
+def create_read_session_factory(
+    writer: AsyncEngine,
+    reader: Optional[AsyncEngine] = None,
+) -> async_sessionmaker:
+    """
+    Create a factory for sessions that only read.
+    
+    Sessions use the read-only engine when there is one (its connections
+    refuse writes), and open ``READ ONLY`` transactions on PostgreSQL.
+    
+    Args:
+        writer: Primary engine
+        reader: Optional read-only engine
+        
+    Returns:
+        async_sessionmaker: Session factory
+    """
+    bind = reader or writer
+    if bind.dialect.name == "postgresql":
+        bind = bind.execution_options(postgresql_readonly=True)
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+class ShardRouter:
+    """
+    Places each user's tasks on one of several task databases (shards).
+    
+    A user's shard is stored in ``users.shard``, which authentication
+    already loads, so routing a request costs no query. Users without one
+    (created before sharding) live on shard 0, which may be the main
+    database. New users are placed with a consistent hash ring over their
+    id, so appending a shard changes the placement of only about 1/N of
+    the users; ``python -m app.shards rebalance`` moves those.
+    Shard numbers are positions in ``TASK_SHARD_URLS``, so shards may only
+    be appended.
+    
+    Args:
+        urls: Database URL of each shard; empty disables sharding
+        vnodes: Points per shard on the hash ring
+    """
+    
+    # Shard n hands out task ids from n * ID_RANGE, so ids stay unique across shards
+    ID_RANGE = 2**40
+    
+    def __init__(self, urls: Sequence[str], vnodes: int = 64):
+        self.engines: List[Tuple[AsyncEngine, Optional[AsyncEngine]]] = [
+            create_engines(url) for url in urls
+        ]
+        self.factories = [
+            create_session_factory(writer, reader, info={"task_shard": shard})
+            for shard, (writer, reader) in enumerate(self.engines)
+        ]
+        self.read_factories = [
+            create_read_session_factory(writer, reader) for writer, reader in self.engines
+        ]
+        self.ring: List[Tuple[int, int]] = sorted(
+            (self._hash(f"shard-{shard}-{point}"), shard)
+            for shard in range(len(self.engines))
+            for point in range(vnodes)
+        )
+        self._points = [point for point, _ in self.ring]
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+    
+    def place(self, owner_id: int) -> int:
+        """Shard the hash ring assigns to an owner (where new users go)."""
+        index = bisect.bisect(self._points, self._hash(f"owner-{owner_id}"))
+        return self.ring[index % len(self.ring)][1]
+    
+    def shard_for(self, user: Any) -> int:
+        """Shard currently holding a user's tasks."""
+        return user.shard if user.shard is not None else 0
+    
+    def session_factory(self, shard: int, read_only: bool = False) -> async_sessionmaker:
+        """Session factory of a shard."""
+        return (self.read_factories if read_only else self.factories)[shard]
+    
+    async def dispose(self) -> None:
+        """Close every shard's connections."""
+        for writer, reader in self.engines:
+            await writer.dispose()
+            if reader is not None:
+                await reader.dispose()
+
+
+def _shard_urls(value: str) -> List[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-)
+with startup_timer.phase("engine"):
+    engine, read_engine = create_engines(settings.DATABASE_URL)
+    shard_router = ShardRouter(_shard_urls(settings.TASK_SHARD_URLS), settings.TASK_SHARD_VNODES)
 
-# Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+# Create async session factories
+AsyncSessionLocal = create_session_factory(engine, read_engine)
+ReadSessionLocal = create_read_session_factory(engine, read_engine)
 
 # Create declarative base
 Base = declarative_base()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+def get_session_factory() -> async_sessionmaker:
     """
-    Dependency for getting database sessions.
+    Dependency for work that opens its own sessions, such as background tasks.
     
+    Returns:
+        async_sessionmaker: Application session factory
+    """
+    return AsyncSessionLocal
+
+
+def get_shard_router() -> ShardRouter:
+    """
+    Dependency returning the task shard router.
+    
+    Returns:
+        ShardRouter: Shared router (disabled when no shards are configured)
+    """
+    return shard_router
+
+
+# Request scope key of the session a batch shares with its sub-requests
+BATCH_SESSION = "app.batch_session"
+
+
+def _depends_on(dependant: Any, call: Any) -> bool:
+    return any(
+        dependency.call is call or _depends_on(dependency, call)
+        for dependency in dependant.dependencies
+    )
+
+
+def _reads_only(route: Any) -> bool:
+    """Whether a route's endpoint takes its session from ``get_read_db``, directly or not."""
+    dependant = getattr(route, "dependant", None)
+    return dependant is not None and _depends_on(dependant, get_read_db)
+
+
+@asynccontextmanager
+async def request_transaction(
+    session: AsyncSession, read_only: bool = False
+) -> AsyncIterator[AsyncSession]:
+    """
+    One request's work on a session: committed on success unless read-only, rolled back on error.
+    
+    Args:
+        session: Database session, left open
+        read_only: Never commit
+        
+    Yields:
+        AsyncSession: The same session
+    """
+    try:
+        yield session
+        if session.in_transaction() and not read_only:
+            await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+
+@asynccontextmanager
+async def session_scope(
+    factory: async_sessionmaker, read_only: bool = False
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for one request: committed on success unless read-only, rolled back on error.
+    
+    Args:
+        factory: Session factory
+        read_only: Never commit
+        
     Yields:
         AsyncSession: Database session
     """
-    async with AsyncSessionLocal() as session:
+    async with factory() as session:
         try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
+            async with request_transaction(session, read_only):
+                yield session
         finally:
             await session.close()
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting database sessions.
+    
+    One session serves the whole request: FastAPI caches dependencies per
+    request, so authentication and the endpoint share it and at most one
+    connection is checked out, on the first query. Requests that never
+    query never check one out. The session is committed only when a
+    transaction is open and the endpoint may write, and it reads from the
+    writer too (in SQLite concurrent mode), so what it reads is what it
+    writes over. Endpoints declaring ``get_read_db`` get a read-only
+    session for the whole request, authentication included, which is
+    never committed. Sub-requests of a
+    sequential batch share the batch's session instead, each committed or
+    rolled back like a request of its own.
+    
+    Args:
+        request: Incoming request, whose route selects the session kind
+        
+    Yields:
+        AsyncSession: Database session
+    """
+    read_only = _reads_only(request.scope.get("route"))
+    shared = request.scope.get(BATCH_SESSION)
+    if shared is not None:
+        async with request_transaction(shared, read_only) as session:
+            yield session
+        return
+    factory = ReadSessionLocal if read_only else AsyncSessionLocal
+    async with session_scope(factory, read_only) as session:
+        if not read_only:
+            use_writer(session)
+        yield session
+
+
+async def get_read_db(db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    """
+    Dependency for endpoints that only read.
+    
+    Declaring it makes ``get_db`` open a read-only session for the request;
+    the session it returns is the one authentication uses too.
+    
+    Args:
+        db: The request's session
+        
+    Returns:
+        AsyncSession: Read-only database session
+    """
+    return db
@@ -1,5 +1,11 @@
 """Main FastAPI application with security and middleware configuration."""
-from contextlib import asynccontextmanager
+# Imported first so the startup timer covers every other import
+from app.startup import startup_timer  # isort: skip
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
@@ -8,19 +14,152 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.database import engine, Base
-from app.routers import auth, tasks, users
+from app.database import AsyncSessionLocal, engine, read_engine, shard_router
+from app.routers import auth, batch, tasks, users
+from app.startup import check_schema_revision, create_schema, over_budget, warm_up_pool
+from app.utils.access_log import AccessLogMiddleware, configure_access_log, install_sql_hooks
+from app.utils.account_purge import run_account_purge
+from app.utils.archive import run_task_archiver
+from app.utils.changes import run_tombstone_compaction
+from app.utils.events import event_hub
+from app.utils.health import HealthMonitor
+from app.utils.leases import Lease
+from app.utils.provisioning import shutdown_hash_pool
+from app.utils.reminders import LEASE_NAME, ReminderScheduler, build_sink
+from app.utils import request_profiling
+from app.utils.request_profiling import RequestProfiler
+from app.utils.response_cache import response_cache
+from app.utils.write_batcher import write_batcher
+
+logger = logging.getLogger(__name__)
+
+
+def job_lease(name: str, interval: float) -> Lease:
+    """Lease for a periodic job, lasting two runs so a dead holder is replaced."""
+    return Lease(AsyncSessionLocal, name, ttl=2 * interval)
+
+
+startup_timer.mark_imports_done()
+
+# Measures readiness in the background so probes never query the database
+health_monitor = HealthMonitor(
+    {
+        "primary": engine,
+        "read": read_engine,
+        **{f"shard-{n}": writer for n, (writer, _) in enumerate(shard_router.engines)},
+    },
+    sample_interval=settings.HEALTH_SAMPLE_INTERVAL_SECONDS,
+    ping_interval=settings.HEALTH_PING_INTERVAL_SECONDS,
+    ping_timeout=settings.HEALTH_PING_TIMEOUT_SECONDS,
+    max_pool_saturation=settings.HEALTH_MAX_POOL_SATURATION,
+    max_loop_lag_ms=settings.HEALTH_MAX_LOOP_LAG_MS,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator:
     """Handle startup and shutdown events."""
-    # Startup: Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup: Prepare the schema according to DB_STARTUP_MODE
+    with startup_timer.phase("schema"):
+        if settings.DB_STARTUP_MODE == "create_all":
+            await create_schema(engine, shard_router)
+        elif settings.DB_STARTUP_MODE == "migrations":
+            await check_schema_revision(engine, settings.ALEMBIC_CONFIG)
+    
+    # Startup: Open pooled connections before the first request needs them
+    with startup_timer.phase("warmup"):
+        # Each engine is warmed up to its own pool size (the reader in SQLite concurrent mode)
+        for pool_engine in filter(None, (engine, read_engine)):
+            await warm_up_pool(pool_engine, settings.DB_POOL_WARMUP)
+    
+    report = startup_timer.report()
+    app.state.startup_timings = report
+    if over_budget(report, settings.STARTUP_BUDGET_SECONDS):
+        logger.warning("Startup exceeded %.2fs budget: %s", settings.STARTUP_BUDGET_SECONDS, report)
+    else:
+        logger.info("Startup complete: %s", report)
+    
+    # Background jobs, the health monitor, the access log writer and the event backend
+    health_monitor.start()
+    access_log_writer = None
+    if settings.ACCESS_LOG_ENABLED:
+        access_log_writer = configure_access_log(
+            settings.ACCESS_LOG_FILE, settings.ACCESS_LOG_QUEUE_SIZE
+        )
+        access_log_writer.start()
+    await event_hub.start()
+    if response_cache.enabled and response_cache.backend.local:
+        # Writes made by other workers reach this worker's cache as events
+        event_hub.listeners.append(response_cache.on_task_event)
+    # Every worker starts the periodic jobs; only the holder of each job's lease runs it
+    jobs = []
+    task_databases = list(enumerate(shard_router.factories or [AsyncSessionLocal]))
+    if settings.TOMBSTONE_COMPACTION_INTERVAL_SECONDS > 0:
+        # Tombstones live wherever tasks do: in each shard, or in the main database
+        for shard, session_factory in task_databases:
+            jobs.append(asyncio.create_task(run_tombstone_compaction(
+                session_factory,
+                settings.TOMBSTONE_COMPACTION_INTERVAL_SECONDS,
+                timedelta(days=settings.TOMBSTONE_RETENTION_DAYS),
+                job_lease(
+                    f"tombstone_compaction:{shard}",
+                    settings.TOMBSTONE_COMPACTION_INTERVAL_SECONDS,
+                ),
+            )))
+    if settings.TASK_ARCHIVE_INTERVAL_SECONDS > 0:
+        for shard, session_factory in task_databases:
+            jobs.append(asyncio.create_task(run_task_archiver(
+                session_factory,
+                settings.TASK_ARCHIVE_INTERVAL_SECONDS,
+                timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS),
+                settings.TASK_ARCHIVE_BATCH_SIZE,
+                response_cache,
+                job_lease(f"task_archiver:{shard}", settings.TASK_ARCHIVE_INTERVAL_SECONDS),
+            )))
+    if settings.ACCOUNT_PURGE_INTERVAL_SECONDS > 0:
+        jobs.append(asyncio.create_task(run_account_purge(
+            AsyncSessionLocal,
+            settings.ACCOUNT_PURGE_INTERVAL_SECONDS,
+            settings.ACCOUNT_PURGE_BATCH_SIZE,
+            shard_router,
+            job_lease("account_purge", settings.ACCOUNT_PURGE_INTERVAL_SECONDS),
+        )))
+    reminders = None
+    reminder_sink = build_sink(settings.REMINDER_SINK, event_hub)
+    if reminder_sink is not None:
+        # Every worker competes for the lease; the holder sends all reminders
+        reminders = ReminderScheduler(
+            shard_router.factories or [AsyncSessionLocal],
+            reminder_sink,
+            Lease(AsyncSessionLocal, LEASE_NAME, settings.REMINDER_LEASE_SECONDS),
+            lead=settings.REMINDER_LEAD_SECONDS,
+            window=settings.REMINDER_WINDOW_SECONDS,
+        )
+        event_hub.listeners.append(reminders.on_task_event)
+        reminders.start()
     yield
-    # Shutdown: Close database connections
+    # Shutdown: Report not ready, stop jobs, commit queued writes, stop hashing
+    # workers, close connections
+    await health_monitor.close()
+    for job in jobs:
+        job.cancel()
+        with suppress(asyncio.CancelledError):
+            await job
+    if reminders is not None:
+        await reminders.close()
+        event_hub.listeners.remove(reminders.on_task_event)
+    await write_batcher.close()
+    await event_hub.close()
+    if response_cache.on_task_event in event_hub.listeners:
+        event_hub.listeners.remove(response_cache.on_task_event)
+    shutdown_hash_pool()
     await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+    await shard_router.dispose()
+    if access_log_writer is not None:
+        # Writes out the queued records
+        access_log_writer.stop()
 
 
 app = FastAPI(
@@ -47,6 +186,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request profiling, installed only when configured so it costs nothing otherwise
+request_profiler = RequestProfiler(
+    token=settings.PROFILING_TOKEN,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    directory=settings.PROFILING_DIR,
+    max_files=settings.PROFILING_MAX_FILES,
+    interval=settings.PROFILING_INTERVAL_MS / 1000,
+)
+if request_profiler.enabled:
+    request_profiling.install_sql_hooks()
+    app.middleware("http")(request_profiler)
+
 
 @app.middleware("http")
 async def add_security_headers(request, call_next):
@@ -59,10 +210,21 @@ async def add_security_headers(request, call_next):
     return response
 
 
+# Access log, added last so it wraps every other middleware
+if settings.ACCESS_LOG_ENABLED:
+    install_sql_hooks()
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+        slow_ms=settings.ACCESS_LOG_SLOW_MS,
+    )
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["Tasks"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
+app.include_router(batch.router, prefix="/api/v1/batch", tags=["Batch"])
 
 
 @app.get("/", tags=["Health"])
@@ -80,11 +242,33 @@ async def health_check():
     """Detailed health check endpoint."""
     return {
         "status": "healthy",
-        "database": "connected",
+        "database": "connected" if health_monitor.database_ok else "unavailable",
         "api_version": "1.0.0"
     }
 
 
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    """Liveness probe: the worker is serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness():
+    """Readiness probe from the health monitor's last measurements (503 when not ready)."""
+    report = health_monitor.readiness()
+    return JSONResponse(
+        status_code=200 if report["ready"] else 503,
+        content={"status": "ready" if report["ready"] else "not_ready", **report},
+    )
+
+
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """Counters for this worker."""
+    return {"response_cache": response_cache.stats()}
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled errors."""
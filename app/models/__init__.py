@@ -2,12 +2,31 @@
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    Enum as SQLEnum,
+    event,
+    update,
+)
+from sqlalchemy.orm import Session, relationship, validates
 import enum
 
 from app.database import Base
 
+# Task ids are 64-bit: shard n hands them out from n * 2**40. SQLite keeps INTEGER,
+# the only type that makes a primary key the (already 64-bit) rowid
+TaskId = BigInteger().with_variant(Integer, "sqlite")
+
 
 class TaskStatus(str, enum.Enum):
     """Task status enumeration."""
@@ -23,6 +42,10 @@ class TaskPriority(str, enum.Enum):
     HIGH = "high"
 
 
+# Sort rank of each priority; stored in ``tasks.priority_rank`` so sorting is index-backed
+PRIORITY_RANKS = {TaskPriority.LOW: 1, TaskPriority.MEDIUM: 2, TaskPriority.HIGH: 3}
+
+
 class User(Base):
     """User model for authentication and task ownership."""
     
@@ -37,9 +60,16 @@ class User(Base):
     is_superuser = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Set when the account is closed; its tasks are purged in the background
+    deletion_requested_at = Column(DateTime, nullable=True)
+    # Task shard holding the user's tasks when sharding is enabled (NULL = shard 0)
+    shard = Column(SmallInteger, nullable=True)
     
-    # Relationships
-    tasks = relationship("Task", back_populates="owner", cascade="all, delete-orphan")
+    # Relationships; deleting a user leaves its tasks to ON DELETE CASCADE
+    # instead of loading them all
+    tasks = relationship(
+        "Task", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
+    )
     
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
@@ -50,15 +80,23 @@ class Task(Base):
     
     __tablename__ = "tasks"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(TaskId, primary_key=True, index=True)
     title = Column(String(200), nullable=False, index=True)
+    # Lowercased title for case-insensitive prefix search; backfilled by migration
+    title_lower = Column(String(200), nullable=True, index=True)
     description = Column(Text, nullable=True)
     status = Column(SQLEnum(TaskStatus), default=TaskStatus.TODO, nullable=False, index=True)
     priority = Column(SQLEnum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
+    # Numeric priority for sorting (the enum is stored by name); backfilled by migration
+    priority_rank = Column(
+        SmallInteger, default=PRIORITY_RANKS[TaskPriority.MEDIUM], nullable=True
+    )
     due_date = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Position in the change feed; assigned on every insert and update
+    change_seq = Column(BigInteger, nullable=True)
     
     # Foreign keys
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -66,5 +104,225 @@ class Task(Base):
     # Relationships
     owner = relationship("User", back_populates="tasks")
     
+    # One index per task list filter and sort key; equality filters carry
+    # created_at so they also serve the default order. ``due_date`` alone
+    # serves the reminder scheduler's scan across owners
+    __table_args__ = (
+        Index("ix_tasks_due_date", "due_date"),
+        Index("ix_tasks_owner_id_change_seq", "owner_id", "change_seq"),
+        Index("ix_tasks_owner_id_created_at", "owner_id", "created_at"),
+        Index("ix_tasks_owner_id_updated_at", "owner_id", "updated_at"),
+        Index("ix_tasks_owner_id_due_date", "owner_id", "due_date"),
+        Index("ix_tasks_owner_id_completed_at", "owner_id", "completed_at"),
+        Index("ix_tasks_owner_id_title_lower", "owner_id", "title_lower"),
+        Index("ix_tasks_owner_id_status_created_at", "owner_id", "status", "created_at"),
+        Index(
+            "ix_tasks_owner_id_priority_rank_created_at", "owner_id", "priority_rank", "created_at"
+        ),
+        # Ids of archived tasks must not be handed out again (SQLite reuses the highest id)
+        {"sqlite_autoincrement": True},
+    )
+    
+    @validates("title")
+    def _sync_title_lower(self, key: str, value: str) -> str:
+        """Keep ``title_lower`` in step with ``title``."""
+        self.title_lower = value.lower() if value is not None else None
+        return value
+    
+    @validates("priority")
+    def _sync_priority_rank(self, key: str, value: TaskPriority) -> TaskPriority:
+        """Keep ``priority_rank`` in step with ``priority``."""
+        self.priority_rank = PRIORITY_RANKS[TaskPriority(value)] if value is not None else None
+        return value
+    
     def __repr__(self) -> str:
         return f"<Task(id={self.id}, title={self.title}, status={self.status})>"
+
+
+class ArchivedTask(Base):
+    """
+    Task done for long enough to be moved out of ``tasks`` by the archiver.
+
+    Same columns as ``Task`` plus ``archived_at``, but only the indexes the
+    archive is read with, so old tasks stop weighing on the hot table's
+    indexes. Rows keep their task id and are only read with
+    ``include_archived`` or moved back by a restore.
+    """
+
+    __tablename__ = "archived_tasks"
+
+    id = Column(TaskId, primary_key=True, autoincrement=False)
+    title = Column(String(200), nullable=False)
+    title_lower = Column(String(200), nullable=True)
+    description = Column(Text, nullable=True)
+    status = Column(SQLEnum(TaskStatus), nullable=False)
+    priority = Column(SQLEnum(TaskPriority), nullable=False)
+    priority_rank = Column(SmallInteger, nullable=True)
+    due_date = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    change_seq = Column(BigInteger, nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_archived_tasks_owner_id_completed_at", "owner_id", "completed_at"),
+    )
+
+
+class TaskTombstone(Base):
+    """Record of a deleted task, kept so sync clients learn about the deletion."""
+    
+    __tablename__ = "task_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    task_id = Column(TaskId, nullable=False)
+    # No foreign key: tombstones may outlive their owner until compaction
+    owner_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    __table_args__ = (
+        Index("ix_task_tombstones_owner_id_change_seq", "owner_id", "change_seq"),
+    )
+
+
+class ChangeSequence(Base):
+    """
+    Single-row counter handing out change sequence numbers.
+    
+    Allocating updates the row, so concurrent writers commit in sequence
+    order and a client never sees a lower number appear after a higher one.
+    The price is that task writes on one database are serialized: the row
+    stays locked from the flush that allocates until commit, so keep work
+    between a task flush and its commit short (``benchmarks/change_seq.py``
+    measures the cost). A database sequence would not hold the lock, but
+    numbers would then commit out of order and the feed could skip them.
+    Shards each have their own counter.
+    """
+    
+    __tablename__ = "change_sequence"
+    
+    id = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    # Tombstones up to this sequence have been purged
+    compacted_through = Column(BigInteger, nullable=False, default=0)
+    # Next task id on a task shard; ids come from the shard's own range so
+    # tasks keep their ids when moved between shards (NULL when unsharded)
+    next_task_id = Column(BigInteger, nullable=True)
+
+
+class JobLease(Base):
+    """
+    Lease letting one worker at a time run a singleton background job.
+
+    The holder renews ``expires_at`` while it runs; once it lapses another
+    worker may take over, resuming from ``checkpoint``.
+    """
+
+    __tablename__ = "job_leases"
+
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(100), nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    # Job progress handed over with the lease, e.g. reminders sent up to this time
+    checkpoint = Column(DateTime, nullable=True)
+
+
+event.listen(
+    ChangeSequence.__table__,
+    "after_create",
+    DDL("INSERT INTO change_sequence (id, value, compacted_through) VALUES (1, 0, 0)"),
+)
+
+# Tasks inserted without a change sequence, e.g. by workers still running a
+# version from before the change feed, get one from the database so the feed
+# does not miss them. Task rows written by this version always carry one.
+event.listen(Task.__table__, "after_create", DDL(
+    "CREATE TRIGGER tasks_change_seq AFTER INSERT ON tasks "
+    "WHEN NEW.change_seq IS NULL BEGIN "
+    "UPDATE change_sequence SET value = value + 1 WHERE id = 1; "
+    "UPDATE tasks SET change_seq = (SELECT value FROM change_sequence WHERE id = 1) "
+    "WHERE id = NEW.id; "
+    "END"
+).execute_if(dialect="sqlite"))
+event.listen(Task.__table__, "after_create", DDL(
+    "CREATE OR REPLACE FUNCTION tasks_change_seq() RETURNS trigger AS $$ BEGIN "
+    "UPDATE change_sequence SET value = value + 1 WHERE id = 1 "
+    "RETURNING value INTO NEW.change_seq; "
+    "RETURN NEW; "
+    "END $$ LANGUAGE plpgsql"
+).execute_if(dialect="postgresql"))
+event.listen(Task.__table__, "after_create", DDL(
+    "CREATE TRIGGER tasks_change_seq BEFORE INSERT ON tasks "
+    "FOR EACH ROW WHEN (NEW.change_seq IS NULL) EXECUTE PROCEDURE tasks_change_seq()"
+).execute_if(dialect="postgresql"))
+
+
+def allocate_change_seqs(session: Session, count: int) -> int:
+    """
+    Reserve ``count`` consecutive change sequence numbers.
+    
+    Returns:
+        int: The first reserved number
+    """
+    table = ChangeSequence.__table__
+    last = session.execute(
+        update(table)
+        .where(table.c.id == 1)
+        .values(value=table.c.value + count)
+        .returning(table.c.value)
+    ).scalar_one()
+    return last - count + 1
+
+
+def allocate_task_ids(session: Session, count: int) -> int:
+    """
+    Reserve ``count`` consecutive task ids on a task shard.
+    
+    Returns:
+        int: The first reserved id
+    """
+    table = ChangeSequence.__table__
+    following = session.execute(
+        update(table)
+        .where(table.c.id == 1)
+        .values(next_task_id=table.c.next_task_id + count)
+        .returning(table.c.next_task_id)
+    ).scalar_one()
+    return following - count
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_task_changes(session: Session, flush_context, instances) -> None:
+    """Give written tasks a new change sequence, tombstone deleted ones and record both."""
+    changed = [obj for obj in session.new if isinstance(obj, Task)]
+    changed += [
+        obj for obj in session.dirty if isinstance(obj, Task) and session.is_modified(obj)
+    ]
+    deleted_owners = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    deleted = [
+        obj for obj in session.deleted
+        if isinstance(obj, Task) and obj.owner_id not in deleted_owners
+    ]
+    if not changed and not deleted:
+        return
+    
+    # Recorded for publishing once the transaction commits
+    recorded = session.info.setdefault("task_changes", [])
+    seq = allocate_change_seqs(session, len(changed) + len(deleted))
+    for task in changed:
+        recorded.append(("created" if task in session.new else "updated", task))
+        task.change_seq = seq
+        seq += 1
+    if session.info.get("task_shard") is not None:
+        unnumbered = [task for task in changed if task in session.new and task.id is None]
+        if unnumbered:
+            first = allocate_task_ids(session, len(unnumbered))
+            for offset, task in enumerate(unnumbered):
+                task.id = first + offset
+    for task in deleted:
+        recorded.append(("deleted", (task.id, task.owner_id, seq)))
+        session.add(TaskTombstone(task_id=task.id, owner_id=task.owner_id, change_seq=seq))
+        seq += 1
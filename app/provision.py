@@ -0,0 +1,112 @@
+"""Command line bulk user provisioning.
+
+Usage:
+    python -m app.provision users.csv
+    python -m app.provision users.jsonl --batch-size 1000
+
+CSV files need a header row with ``email``, ``username``, ``password`` and
+optionally ``full_name``. JSON files may hold a list of objects or one object
+per line.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine, shard_router
+from app.utils.provisioning import provision_users, shutdown_hash_pool
+
+
+def load_rows(path: Path) -> List[Dict[str, Any]]:
+    """
+    Load user rows from a CSV, JSON or JSON lines file.
+
+    Args:
+        path: Input file
+
+    Returns:
+        List[Dict[str, Any]]: Raw user rows
+    """
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as handle:
+            return [
+                {key: value for key, value in row.items() if value != ""}
+                for row in csv.DictReader(handle)
+            ]
+
+    text = path.read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+async def run(rows: List[Dict[str, Any]], chunk_size: int, batch_size: Optional[int]) -> int:
+    """
+    Provision rows in chunks and print a report.
+
+    Args:
+        rows: Raw user rows
+        chunk_size: Rows validated and hashed per provisioning run
+        batch_size: Rows per insert batch
+
+    Returns:
+        int: Process exit code (1 if any row failed)
+    """
+    started = time.perf_counter()
+    created = 0
+    failed = 0
+
+    try:
+        for offset in range(0, len(rows), chunk_size):
+            async with AsyncSessionLocal() as session:
+                result = await provision_users(
+                    session, rows[offset:offset + chunk_size], batch_size=batch_size,
+                    shards=shard_router,
+                )
+            created += result.created
+            failed += result.failed
+            for failure in result.failures:
+                print(
+                    f"row {offset + failure.index}: {failure.username or '-'}: {failure.detail}",
+                    file=sys.stderr,
+                )
+    finally:
+        shutdown_hash_pool()
+        await engine.dispose()
+        await shard_router.dispose()
+
+    elapsed = time.perf_counter() - started
+    rate = created / elapsed if elapsed > 0 else 0.0
+    print(f"created={created} failed={failed} elapsed={elapsed:.2f}s rate={rate:.1f} users/s")
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and provision users."""
+    parser = argparse.ArgumentParser(description="Bulk provision users")
+    parser.add_argument("file", type=Path, help="CSV, JSON or JSON lines file of users")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.BULK_PROVISION_MAX_USERS,
+        help="Rows validated and hashed per run",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Rows per insert batch",
+    )
+    args = parser.parse_args(argv)
+
+    rows = load_rows(args.file)
+    return asyncio.run(run(rows, args.chunk_size, args.batch_size))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.config import settings
-from app.database import get_db
+from app.database import ShardRouter, get_db, get_shard_router
 from app.models import User
 from app.schemas import UserCreate, UserResponse, Token, LoginRequest
 from app.utils.auth import (
@@ -21,7 +21,8 @@ router = APIRouter()
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    shards: ShardRouter = Depends(get_shard_router)
 ):
     """
     Register a new user.
@@ -29,6 +30,7 @@ async def register(
     Args:
         user_data: User registration data
         db: Database session
+        shards: Task shard router, which places the user's tasks
         
     Returns:
         UserResponse: Created user data
@@ -61,8 +63,11 @@ async def register(
     )
     
     db.add(db_user)
+    if shards.enabled:
+        # The hash ring places users by id, which the insert assigns
+        await db.flush()
+        db_user.shard = shards.place(db_user.id)
     await db.commit()
-    await db.refresh(db_user)
     
     return db_user
 
@@ -0,0 +1,99 @@
+"""Request batching endpoint."""
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.models import User
+from app.schemas import BatchRequest, BatchRequestItem, BatchResponse
+from app.utils.auth import BATCH_USER, get_current_active_user
+from app.utils.batch import SubResponse, dispatch
+
+router = APIRouter()
+
+
+async def _run_item(
+    request: Request,
+    item: BatchRequestItem,
+    user: User,
+    session: Optional[AsyncSession] = None,
+) -> SubResponse:
+    body = json.dumps(item.body).encode() if item.body is not None else b""
+    return await dispatch(request, item.method, item.path, item.headers, body, user, session)
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    request: Request,
+    batch: BatchRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Run several API calls in one request, e.g. everything an app loads at launch.
+
+    The caller is authenticated once for every call. By default the calls
+    run in order on this request's session, each committed or rolled back
+    on its own, so later calls see earlier writes. With ``parallel`` the
+    calls, which must all be GETs, run concurrently on their own
+    connections, at most ``BATCH_MAX_CONCURRENCY`` at a time.
+
+    Each call's status, headers and body are returned in request order; a
+    failing call does not fail the batch.
+
+    Args:
+        request: Incoming request, whose scope the calls inherit
+        batch: Calls to run, at most ``BATCH_MAX_REQUESTS``
+        current_user: Current authenticated user
+        db: Database session shared by sequential calls
+
+    Returns:
+        BatchResponse: Outcome of each call
+
+    Raises:
+        HTTPException: If the batch is nested, too large, or parallel with a non-GET call
+    """
+    if BATCH_USER in request.scope:
+        # Checked on the scope rather than the path, which may be spelled many ways
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batches cannot be nested"
+        )
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds maximum of {settings.BATCH_MAX_REQUESTS} requests"
+        )
+
+    if batch.parallel:
+        if any(item.method != "GET" for item in batch.requests):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parallel batches may only contain GET requests"
+            )
+        # End the auth lookup's transaction so the batch does not pin a connection
+        await db.commit()
+        limit = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+        async def run(item: BatchRequestItem) -> SubResponse:
+            async with limit:
+                return await _run_item(request, item, current_user)
+
+        responses = await asyncio.gather(*(run(item) for item in batch.requests))
+    else:
+        responses = []
+        for item in batch.requests:
+            responses.append(await _run_item(request, item, current_user, db))
+            if inspect(current_user).expired_attributes:
+                # A call rolled the shared session back
+                await db.refresh(current_user)
+
+    return Response(
+        content=b'{"responses":[' + b",".join(r.render() for r in responses) + b"]}",
+        media_type="application/json",
+    )
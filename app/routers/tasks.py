@@ -1,80 +1,429 @@
 """Task management endpoints."""
 from datetime import datetime
-from typing import List, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 
+from app.config import settings
 from app.database import get_db
-from app.models import Task, User, TaskStatus
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse
+from app.models import Task, User, TaskPriority, TaskStatus
+from app.schemas import (
+    TaskBatch,
+    TaskBatchRequest,
+    TaskChanges,
+    TaskCreate,
+    TaskPage,
+    TaskUpdate,
+    TaskResponse,
+)
+from app.utils.archive import restore_task, with_archived
 from app.utils.auth import get_current_active_user
+from app.utils.changes import ChangeTokenExpired, fetch_changes
+from app.utils.events import event_hub, event_stream
+from app.utils.pagination import paginate
+from app.utils.fieldsets import (
+    TASK_FIELDS,
+    UnknownFields,
+    parse_fields,
+    render_batch,
+    render_page,
+    render_task,
+    render_tasks,
+    task_load_options,
+)
+from app.utils.response_cache import ResponseCache, get_response_cache
+from app.utils.sharding import get_task_db, get_task_read_db
+from app.utils.task_filters import DEFAULT_SORT, SORT_PATTERN, filter_tasks, sort_tasks
+from app.utils.write_batcher import WriteBatcher, get_write_batcher
 
 router = APIRouter()
 
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated fields to return, e.g. id,title,status,due_date",
+)
+INCLUDE_ARCHIVED_QUERY = Query(False, description="Also read archived tasks")
 
-@router.get("/", response_model=List[TaskResponse])
+
+def _json(body: bytes, cache_status: Optional[str] = None) -> Response:
+    """JSON response from pre-rendered bytes."""
+    headers = {"X-Cache": cache_status} if cache_status else None
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _fieldset(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse ``fields``, rejecting unknown names with a 400."""
+    try:
+        return parse_fields(fields)
+    except UnknownFields as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {exc}. Allowed: {', '.join(TASK_FIELDS)}"
+        )
+
+
+def _apply_task_update(task: Task, task_data: TaskUpdate) -> None:
+    """Apply an update to a task, maintaining ``completed_at``."""
+    update_data = task_data.model_dump(exclude_unset=True)
+    
+    # Set completed_at when status changes to DONE
+    if "status" in update_data and update_data["status"] == TaskStatus.DONE:
+        if task.status != TaskStatus.DONE:
+            update_data["completed_at"] = datetime.utcnow()
+    elif "status" in update_data and update_data["status"] != TaskStatus.DONE:
+        update_data["completed_at"] = None
+    
+    for field, value in update_data.items():
+        setattr(task, field, value)
+
+
+def _parse_ids(ids: str) -> List[int]:
+    """Parse a comma-separated ``ids`` parameter, rejecting non-integers with a 400."""
+    try:
+        return [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers"
+        )
+
+
+async def _fetch_batch(
+    ids: List[int], selected: Optional[Tuple[str, ...]], owner_id: int, db: AsyncSession
+) -> Response:
+    """
+    Fetch the owner's tasks among ``ids`` with one query.
+    
+    Items follow the order of ``ids`` (duplicates are returned once) and
+    ids that do not exist or belong to someone else are listed as missing.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No task ids given"
+        )
+    if len(ids) > settings.TASK_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds maximum of {settings.TASK_BATCH_MAX_IDS} ids"
+        )
+    
+    query = select(Task).where(and_(Task.owner_id == owner_id, Task.id.in_(ids)))
+    if selected is not None:
+        query = query.options(task_load_options(selected))
+    result = await db.execute(query)
+    found = {task.id: task for task in result.scalars()}
+    
+    batch = {
+        "items": [found[task_id] for task_id in ids if task_id in found],
+        "missing": [task_id for task_id in ids if task_id not in found],
+    }
+    return _json(render_batch(batch, selected))
+
+
+async def _insert_task(values: Dict[str, Any], owner_id: int, db: AsyncSession) -> Task:
+    """Batched write: insert a task."""
+    task = Task(**values, owner_id=owner_id)
+    db.add(task)
+    await db.flush()
+    return task
+
+
+async def _update_task(
+    task_id: int, owner_id: int, task_data: TaskUpdate, db: AsyncSession
+) -> Optional[Task]:
+    """Batched write: update a task, or return None when it does not exist."""
+    result = await db.execute(
+        select(Task).where(and_(Task.id == task_id, Task.owner_id == owner_id))
+    )
+    task = result.scalar_one_or_none()
+    if task is not None:
+        _apply_task_update(task, task_data)
+        await db.flush()
+    return task
+
+
+@router.get("/", response_model=Union[List[TaskResponse], TaskPage])
 async def get_tasks(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of records"),
     status: Optional[TaskStatus] = Query(None, description="Filter by task status"),
+    priority: Optional[TaskPriority] = Query(None, description="Filter by task priority"),
+    due_after: Optional[datetime] = Query(None, description="Due at or after this time"),
+    due_before: Optional[datetime] = Query(None, description="Due before this time"),
+    overdue: Optional[bool] = Query(None, description="Past due and not done"),
+    completed_since: Optional[datetime] = Query(
+        None, description="Completed at or after this time"
+    ),
+    title_prefix: Optional[str] = Query(
+        None, max_length=200, description="Title starts with this (case-insensitive)"
+    ),
+    sort: str = Query(
+        DEFAULT_SORT,
+        pattern=SORT_PATTERN,
+        description="created_at, updated_at, due_date or priority; prefix - for descending",
+    ),
+    fields: Optional[str] = FIELDS_QUERY,
+    envelope: bool = Query(False, description="Return items with total and has_more"),
+    estimate: bool = Query(
+        False, description="With envelope: stop counting the total at a cap (large accounts)"
+    ),
+    include_archived: bool = INCLUDE_ARCHIVED_QUERY,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_task_read_db),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """
     Get all tasks for the current user with pagination and filtering.
     
+    With ``envelope`` the page comes as a ``TaskPage`` whose total is
+    computed in the same query as the items. First pages are served from
+    the response cache until the user's next task write.
+    
+    Each filter and sort key is backed by an ``(owner_id, column)`` index.
+    With ``fields`` only the requested columns are loaded and returned, so
+    e.g. ``description`` is never read for lists that only show titles.
+    Archived tasks are left out unless ``include_archived`` is set.
+    
     Args:
+        request: Incoming request (its query string is part of the cache key)
         skip: Number of records to skip (pagination)
         limit: Maximum number of records to return
         status: Optional status filter
+        priority: Optional priority filter
+        due_after: Optional lower bound on the due date (inclusive)
+        due_before: Optional upper bound on the due date (exclusive)
+        overdue: Optional overdue filter
+        completed_since: Optional lower bound on the completion time
+        title_prefix: Optional case-insensitive title prefix
+        sort: Sort key
+        fields: Optional comma-separated subset of task fields to return
+        envelope: Whether to wrap the tasks in a paginated envelope
+        estimate: Whether the envelope's total may be a capped lower bound
+        include_archived: Whether to list archived tasks too
         current_user: Current authenticated user
-        db: Database session
+        db: Session holding the user's tasks
+        cache: Response cache
         
     Returns:
-        List[TaskResponse]: List of tasks
+        Union[List[TaskResponse], TaskPage]: Tasks, or a page of tasks with
+        ``envelope``; items are trimmed to ``fields`` if given
+        
+    Raises:
+        HTTPException: If ``fields`` names an unknown field
     """
-    query = select(Task).where(Task.owner_id == current_user.id)
+    selected = _fieldset(fields)
+    cache_key = await cache.key(current_user.id, request) if skip == 0 else None
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return _json(cached, "HIT")
     
-    # Apply status filter if provided
-    if status:
-        query = query.where(Task.status == status)
+    if include_archived:
+        tasks = with_archived(current_user.id)
+        query = select(tasks)
+    else:
+        tasks = Task
+        query = select(Task).where(Task.owner_id == current_user.id)
+    if selected is not None:
+        query = query.options(task_load_options(selected, tasks))
     
-    # Apply pagination
-    query = query.offset(skip).limit(limit).order_by(Task.created_at.desc())
+    query = filter_tasks(
+        query,
+        status=status,
+        priority=priority,
+        due_after=due_after,
+        due_before=due_before,
+        overdue=overdue,
+        completed_since=completed_since,
+        title_prefix=title_prefix,
+        entity=tasks,
+    )
     
-    result = await db.execute(query)
-    tasks = result.scalars().all()
+    query = sort_tasks(query, sort, tasks)
+    
+    if envelope:
+        cap = settings.PAGE_TOTAL_ESTIMATE_CAP if estimate else None
+        page = await paginate(db, query, skip, limit, estimate_cap=cap)
+        body = render_page(page, selected)
+    else:
+        # Apply pagination
+        query = query.offset(skip).limit(limit)
+        
+        result = await db.execute(query)
+        body = render_tasks(result.scalars().all(), selected)
     
-    return tasks
+    await cache.set(cache_key, body)
+    return _json(body, "MISS" if cache_key else None)
 
 
-@router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(
-    task_id: int,
+@router.get("/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: int = Query(0, ge=0, description="Change token from the previous sync"),
+    limit: int = Query(100, ge=1, le=settings.CHANGE_FEED_MAX_LIMIT, description="Maximum changes"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_task_read_db)
+):
+    """
+    Get tasks created, updated or deleted after a change token.
+    
+    Args:
+        since: Change token returned by the previous call (0 for a full sync)
+        limit: Maximum number of changes to return
+        current_user: Current authenticated user
+        db: Session holding the user's tasks
+        
+    Returns:
+        TaskChanges: Changed tasks, deleted task IDs and the next token
+        
+    Raises:
+        HTTPException: If the token is older than the tombstone retention
+    """
+    try:
+        return await fetch_changes(db, current_user.id, since, limit)
+    except ChangeTokenExpired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Change token expired, resync with since=0"
+        )
+
+
+@router.get("/events")
+async def stream_task_events(
+    last_event_id: Optional[int] = Header(None, description="Sent by reconnecting clients"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get a specific task by ID.
+    Stream the current user's task changes as Server-Sent Events.
+    
+    Events are ``task.created``, ``task.updated`` and ``task.deleted`` with
+    the change sequence as event id. A ``resync`` event carries the token
+    to pass to ``/tasks/changes`` after a reconnect or when the client fell
+    too far behind (the stream then ends).
     
     Args:
-        task_id: Task ID
+        last_event_id: Last event id seen on a previous connection
         current_user: Current authenticated user
         db: Database session
         
     Returns:
-        TaskResponse: Task data
+        StreamingResponse: ``text/event-stream`` response
         
     Raises:
-        HTTPException: If task not found or unauthorized
+        HTTPException: If this worker has no room for another subscriber
     """
-    result = await db.execute(
-        select(Task).where(
-            and_(Task.id == task_id, Task.owner_id == current_user.id)
+    # End the auth lookup's transaction so the stream does not pin a connection
+    await db.commit()
+    await event_hub.start()
+    if event_hub.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event subscribers, retry later"
         )
+    return StreamingResponse(
+        event_stream(event_hub, current_user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+@router.get("/batch", response_model=TaskBatch)
+async def get_task_batch(
+    ids: str = Query(..., description="Comma-separated task IDs, e.g. 3,1,2"),
+    fields: Optional[str] = FIELDS_QUERY,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_task_read_db)
+):
+    """
+    Get several tasks by ID with a single query.
+    
+    Args:
+        ids: Comma-separated task IDs, at most ``TASK_BATCH_MAX_IDS``
+        fields: Optional comma-separated subset of task fields to return
+        current_user: Current authenticated user
+        db: Session holding the user's tasks
+        
+    Returns:
+        TaskBatch: Found tasks in request order and the IDs not found
+        
+    Raises:
+        HTTPException: If ``ids`` is empty, malformed or too long, or
+            ``fields`` is invalid
+    """
+    return await _fetch_batch(_parse_ids(ids), _fieldset(fields), current_user.id, db)
+
+
+@router.post("/batch", response_model=TaskBatch)
+async def post_task_batch(
+    batch: TaskBatchRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_task_read_db)
+):
+    """
+    Get several tasks by ID, for ID lists too long for a URL.
+    
+    Args:
+        batch: Task IDs, at most ``TASK_BATCH_MAX_IDS``
+        fields: Optional comma-separated subset of task fields to return
+        current_user: Current authenticated user
+        db: Session holding the user's tasks
+        
+    Returns:
+        TaskBatch: Found tasks in request order and the IDs not found
+        
+    Raises:
+        HTTPException: If there are too many IDs or ``fields`` is invalid
+    """
+    return await _fetch_batch(batch.ids, _fieldset(fields), current_user.id, db)
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(
+    task_id: int,
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    include_archived: bool = INCLUDE_ARCHIVED_QUERY,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_task_read_db),
+    cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Get a specific task by ID, from the response cache when possible.
+    
+    Args:
+        task_id: Task ID
+        request: Incoming request (its path and query are the cache key)
+        fields: Optional comma-separated subset of task fields to return
+        include_archived: Whether an archived task is found too
+        current_user: Current authenticated user
+        db: Session holding the user's tasks
+        cache: Response cache
+        
+    Returns:
+        TaskResponse: Task data, trimmed to ``fields`` if given
+        
+    Raises:
+        HTTPException: If task not found or unauthorized, or ``fields`` is invalid
+    """
+    selected = _fieldset(fields)
+    cache_key = await cache.key(current_user.id, request)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return _json(cached, "HIT")
+    
+    tasks = with_archived(current_user.id) if include_archived else Task
+    query = select(tasks).where(and_(tasks.id == task_id, tasks.owner_id == current_user.id))
+    if selected is not None:
+        query = query.options(task_load_options(selected, tasks))
+    result = await db.execute(query)
     task = result.scalar_one_or_none()
     
     if not task:
@@ -83,14 +432,18 @@ async def get_task(
             detail="Task not found"
         )
     
-    return task
+    body = render_task(task, selected)
+    await cache.set(cache_key, body)
+    return _json(body, "MISS" if cache_key else None)
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_task_db),
+    batcher: Optional[WriteBatcher] = Depends(get_write_batcher),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """
     Create a new task.
@@ -98,11 +451,20 @@ async def create_task(
     Args:
         task_data: Task creation data
         current_user: Current authenticated user
-        db: Database session
+        db: Session holding the user's tasks
+        batcher: Group-commit batcher, when enabled
+        cache: Response cache, invalidated for the user once committed
         
     Returns:
         TaskResponse: Created task data
     """
+    if batcher is not None:
+        task = await batcher.submit(
+            partial(_insert_task, task_data.model_dump(), current_user.id)
+        )
+        await cache.invalidate(current_user.id)
+        return task
+    
     db_task = Task(
         **task_data.model_dump(),
         owner_id=current_user.id
@@ -110,7 +472,7 @@ async def create_task(
     
     db.add(db_task)
     await db.commit()
-    await db.refresh(db_task)
+    await cache.invalidate(current_user.id)
     
     return db_task
 
@@ -120,7 +482,9 @@ async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_task_db),
+    batcher: Optional[WriteBatcher] = Depends(get_write_batcher),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """
     Update an existing task.
@@ -129,7 +493,9 @@ async def update_task(
         task_id: Task ID
         task_data: Task update data
         current_user: Current authenticated user
-        db: Database session
+        db: Session holding the user's tasks
+        batcher: Group-commit batcher, when enabled
+        cache: Response cache, invalidated for the user once committed
         
     Returns:
         TaskResponse: Updated task data
@@ -137,6 +503,18 @@ async def update_task(
     Raises:
         HTTPException: If task not found or unauthorized
     """
+    if batcher is not None:
+        task = await batcher.submit(
+            partial(_update_task, task_id, current_user.id, task_data)
+        )
+        if task is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+        await cache.invalidate(current_user.id)
+        return task
+    
     result = await db.execute(
         select(Task).where(
             and_(Task.id == task_id, Task.owner_id == current_user.id)
@@ -150,21 +528,10 @@ async def update_task(
             detail="Task not found"
         )
     
-    # Update task fields
-    update_data = task_data.model_dump(exclude_unset=True)
-    
-    # Set completed_at when status changes to DONE
-    if "status" in update_data and update_data["status"] == TaskStatus.DONE:
-        if task.status != TaskStatus.DONE:
-            update_data["completed_at"] = datetime.utcnow()
-    elif "status" in update_data and update_data["status"] != TaskStatus.DONE:
-        update_data["completed_at"] = None
-    
-    for field, value in update_data.items():
-        setattr(task, field, value)
+    _apply_task_update(task, task_data)
     
     await db.commit()
-    await db.refresh(task)
+    await cache.invalidate(current_user.id)
     
     return task
 
@@ -173,7 +540,8 @@ async def update_task(
 async def delete_task(
     task_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_task_db),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """
     Delete a task.
@@ -181,7 +549,8 @@ async def delete_task(
     Args:
         task_id: Task ID
         current_user: Current authenticated user
-        db: Database session
+        db: Session holding the user's tasks
+        cache: Response cache, invalidated for the user once committed
         
     Raises:
         HTTPException: If task not found or unauthorized
@@ -201,19 +570,65 @@ async def delete_task(
     
     await db.delete(task)
     await db.commit()
+    await cache.invalidate(current_user.id)
+
+
+@router.post("/{task_id}/restore", response_model=TaskResponse)
+async def restore_archived_task(
+    task_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_task_db),
+    cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Move an archived task back to the active tasks.
+    
+    The task keeps its ID, reaches sync clients as a new change and is not
+    archived again before another full retention period.
+    
+    Args:
+        task_id: Task ID
+        current_user: Current authenticated user
+        db: Session holding the user's tasks
+        cache: Response cache, invalidated for the user once committed
+        
+    Returns:
+        TaskResponse: Restored task data
+        
+    Raises:
+        HTTPException: If no such archived task exists, or an active task has its ID
+    """
+    try:
+        task = await restore_task(db, task_id, current_user.id)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An active task already has this ID"
+        )
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived task not found"
+        )
+    
+    await db.commit()
+    await cache.invalidate(current_user.id)
+    
+    return task
 
 
 @router.get("/stats/summary")
 async def get_task_stats(
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_task_read_db)
 ):
     """
     Get task statistics for the current user.
     
     Args:
         current_user: Current authenticated user
-        db: Database session
+        db: Session holding the user's tasks
         
     Returns:
         dict: Task statistics
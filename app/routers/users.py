@@ -1,17 +1,20 @@
 """User management endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 
-from app.database import get_db
+from app.config import settings
+from app.database import ShardRouter, get_db, get_read_db, get_session_factory, get_shard_router
 from app.models import User
-from app.schemas import UserResponse, UserUpdate
-from app.utils.auth import get_current_active_user, get_password_hash
+from app.schemas import BulkUserCreate, BulkUserResult, UserResponse, UserUpdate
+from app.utils.account_purge import close_account, purge_account, task_sessions
+from app.utils.auth import get_current_active_user, get_current_superuser, get_password_hash
+from app.utils.provisioning import provision_users
 
 router = APIRouter()
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(get_read_db)])
 async def get_current_user_profile(
     current_user: User = Depends(get_current_active_user)
 ):
@@ -69,22 +72,67 @@ async def update_current_user(
         setattr(current_user, field, value)
     
     await db.commit()
-    await db.refresh(current_user)
     
     return current_user
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_current_user(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    shards: ShardRouter = Depends(get_shard_router)
 ):
     """
     Delete current user account.
     
+    The account is deactivated before the response is sent; its tasks and
+    the account row are purged in batches afterwards.
+    
     Args:
+        background_tasks: Runs the purge after the response
         current_user: Current authenticated user
         db: Database session
+        session_factory: Session factory for the purge
+        shards: Task shard router, which locates the user's tasks
     """
-    await db.delete(current_user)
-    await db.commit()
+    await close_account(db, current_user)
+    background_tasks.add_task(
+        purge_account,
+        session_factory,
+        current_user.id,
+        settings.ACCOUNT_PURGE_BATCH_SIZE,
+        task_sessions(shards, current_user),
+    )
+
+
+@router.post("/bulk", response_model=BulkUserResult)
+async def bulk_create_users(
+    bulk_data: BulkUserCreate,
+    current_user: User = Depends(get_current_superuser),
+    db: AsyncSession = Depends(get_db),
+    shards: ShardRouter = Depends(get_shard_router)
+):
+    """
+    Provision many users in one request (superusers only).
+    
+    Args:
+        bulk_data: Raw user rows to provision
+        current_user: Current superuser
+        db: Database session
+        shards: Task shard router, which places each new user
+        
+    Returns:
+        BulkUserResult: Counts, per-row failures and throughput
+        
+    Raises:
+        HTTPException: If the batch exceeds the configured maximum
+    """
+    if len(bulk_data.users) > settings.BULK_PROVISION_MAX_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds maximum of {settings.BULK_PROVISION_MAX_USERS} users"
+        )
+    
+    return await provision_users(db, bulk_data.users, shards=shards)
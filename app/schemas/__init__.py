@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation."""
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, EmailStr, Field, validator
 import re
 
@@ -54,6 +54,32 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class BulkUserCreate(BaseModel):
+    """Schema for bulk user provisioning.
+    
+    Rows are validated individually against ``UserCreate`` so that one bad
+    row is reported as a failure instead of rejecting the whole batch.
+    """
+    users: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class BulkUserFailure(BaseModel):
+    """A row that could not be provisioned."""
+    index: int
+    username: Optional[str] = None
+    detail: str
+
+
+class BulkUserResult(BaseModel):
+    """Outcome of a bulk provisioning run."""
+    created: int
+    failed: int
+    failures: List[BulkUserFailure]
+    hash_seconds: float
+    elapsed_seconds: float
+    users_per_second: float
+
+
 # Task schemas
 class TaskBase(BaseModel):
     """Base task schema."""
@@ -90,6 +116,25 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskChanges(BaseModel):
+    """Tasks changed since a change token."""
+    changed: List[TaskResponse]
+    deleted: List[int] = Field(..., description="IDs of tasks deleted since the token")
+    next_token: int = Field(..., description="Pass as ``since`` to continue")
+    has_more: bool
+
+
+class TaskBatchRequest(BaseModel):
+    """Task ids to fetch in one request."""
+    ids: List[int] = Field(..., min_length=1)
+
+
+class TaskBatch(BaseModel):
+    """Tasks fetched by id, in request order."""
+    items: List[TaskResponse]
+    missing: List[int] = Field(..., description="Requested ids that are not the user's tasks")
+
+
 # Authentication schemas
 class Token(BaseModel):
     """JWT token response."""
@@ -124,3 +169,44 @@ class PaginatedResponse(BaseModel):
     skip: int
     limit: int
     has_more: bool
+    estimated: bool = Field(False, description="``total`` is a lower bound")
+
+
+class TaskPage(PaginatedResponse):
+    """A page of tasks with the total number of matching tasks."""
+    items: List[TaskResponse]
+
+
+# Request batching schemas
+class BatchRequestItem(BaseModel):
+    """One API call inside a batch."""
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(
+        ..., pattern=r"^/", description="Path with optional query, e.g. /api/v1/tasks/?limit=20"
+    )
+    headers: Dict[str, str] = Field(
+        default_factory=dict, description="Extra headers; the batch's Authorization applies"
+    )
+    body: Optional[Any] = Field(None, description="JSON request body")
+
+
+class BatchRequest(BaseModel):
+    """API calls to run in one request, authenticated once."""
+    requests: List[BatchRequestItem] = Field(..., min_length=1)
+    parallel: bool = Field(
+        False,
+        description="Run the calls concurrently, each on its own connection (GET only); "
+        "otherwise they run in order on one session",
+    )
+
+
+class BatchResponseItem(BaseModel):
+    """Outcome of one call of a batch."""
+    status: int
+    headers: Dict[str, str]
+    body: Any
+
+
+class BatchResponse(BaseModel):
+    """Outcomes of a batch's calls, in request order."""
+    responses: List[BatchResponseItem]
@@ -0,0 +1,257 @@
+"""Production server entrypoint.
+
+Runs uvicorn with one worker per available CPU (honouring cgroup CPU quotas,
+so a container limited to 2 CPUs on a 16-core host gets 2 workers), uvloop
+and httptools when installed, and the keep-alive, backlog, graceful shutdown
+and worker recycling settings from ``Settings``. With several workers, or
+with recycling enabled, uvicorn's supervisor (uvicorn 0.30 or later) restarts
+workers that exit and restarts all of them one by one on ``SIGHUP``.
+
+With ``DB_STARTUP_MODE=create_all`` and several workers, the schema is
+created once here before the workers start, and the workers skip it, so
+they do not race each other running DDL.
+
+Usage:
+    python -m app.serve
+    python -m app.serve --workers 4
+    python -m app.serve --dry-run
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import math
+import os
+import random
+import sys
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import Settings, settings
+from app.database import is_sqlite, is_sqlite_memory
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    CPU quota of this process's cgroup, in CPUs.
+
+    Args:
+        root: Mount point of the cgroup filesystem
+
+    Returns:
+        Optional[float]: The quota, or None when unlimited or unknown
+    """
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        quota, period = (root / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for directory in ("cpu,cpuacct", "cpu"):
+        try:
+            quota = int((root / directory / "cpu.cfs_quota_us").read_text())
+            period = int((root / directory / "cpu.cfs_period_us").read_text())
+        except (OSError, ValueError):
+            continue
+        return quota / period if quota > 0 and period > 0 else None
+    return None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> float:
+    """CPUs this process may use: its affinity mask, capped by any cgroup quota."""
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:  # not available on macOS
+        cpus = float(os.cpu_count() or 1)
+    limit = cgroup_cpu_limit(root)
+    return min(cpus, limit) if limit else cpus
+
+
+def worker_count(config: Settings, cpus: float) -> int:
+    """
+    Number of worker processes to run.
+
+    ``SERVER_WORKERS`` wins when set; otherwise ``SERVER_WORKERS_PER_CPU``
+    per available CPU, at least one and at most ``SERVER_MAX_WORKERS``. An
+    in-memory SQLite database exists once per process, so it always gets a
+    single worker.
+
+    Args:
+        config: Settings to size for
+        cpus: Available CPUs
+
+    Returns:
+        int: Worker count
+    """
+    if is_sqlite(config.DATABASE_URL) and is_sqlite_memory(config.DATABASE_URL):
+        return 1
+    if config.SERVER_WORKERS:
+        return config.SERVER_WORKERS
+    workers = math.floor(cpus * config.SERVER_WORKERS_PER_CPU)
+    return max(1, min(config.SERVER_MAX_WORKERS, workers))
+
+
+def response_cache_coherent(config: Settings, workers: int) -> bool:
+    """
+    Whether the response cache stays coherent across ``workers`` workers.
+
+    A memory cache only learns of other workers' writes through task
+    events, so with several workers it needs a shared events backend.
+    """
+    return not (
+        workers > 1 and config.RESPONSE_CACHE_BACKEND == "memory"
+        and config.EVENTS_BACKEND == "local"
+    )
+
+
+def _resolve(choice: str, module: str, fallback: str) -> str:
+    """Resolve ``auto`` to ``module`` when it is importable, else to ``fallback``."""
+    if choice != "auto":
+        return choice
+    return module if importlib.util.find_spec(module) is not None else fallback
+
+
+def server_options(config: Settings, workers: int) -> Dict[str, Any]:
+    """
+    Keyword arguments for ``uvicorn.Config``.
+
+    Args:
+        config: Settings to apply
+        workers: Worker count
+
+    Returns:
+        Dict[str, Any]: uvicorn options
+    """
+    return {
+        "app": "app.main:app",
+        "host": config.SERVER_HOST,
+        "port": config.SERVER_PORT,
+        "workers": workers,
+        "loop": _resolve(config.SERVER_LOOP, "uvloop", "asyncio"),
+        "http": _resolve(config.SERVER_HTTP, "httptools", "h11"),
+        "backlog": config.SERVER_BACKLOG,
+        "timeout_keep_alive": config.SERVER_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": config.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "limit_max_requests": config.SERVER_MAX_REQUESTS or None,
+        "log_level": "debug" if config.DEBUG else "info",
+    }
+
+
+def run_worker(config, max_requests_jitter: int = 0, sockets=None) -> None:
+    """
+    Run one uvicorn server, drawing its request limit with jitter.
+
+    Every worker receives the same config; adding a random number of
+    requests in each process keeps workers started together from all
+    recycling at the same moment.
+    """
+    import uvicorn
+
+    if config.limit_max_requests and max_requests_jitter:
+        config.limit_max_requests += random.randint(0, max_requests_jitter)
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+async def _create_schema() -> None:
+    from app.database import engine, read_engine, shard_router
+    from app.startup import create_schema
+
+    try:
+        await create_schema(engine, shard_router)
+    finally:
+        await engine.dispose()
+        if read_engine is not None:
+            await read_engine.dispose()
+        await shard_router.dispose()
+
+
+def prepare_schema(config: Settings, workers: int) -> None:
+    """
+    Create the schema once before starting several workers.
+
+    Workers started together would all run ``create_all`` at once. With
+    ``DB_STARTUP_MODE=create_all`` and more than one worker, the tables are
+    created here and ``DB_STARTUP_MODE=none`` is passed to the workers
+    through the environment (they are spawned, so they read it afresh).
+
+    Args:
+        config: Settings being served
+        workers: Worker count
+    """
+    if workers <= 1 or config.DB_STARTUP_MODE != "create_all":
+        return
+    asyncio.run(_create_schema())
+    os.environ["DB_STARTUP_MODE"] = "none"
+
+
+def serve(options: Dict[str, Any], max_requests_jitter: int = 0) -> None:
+    """
+    Run the server until it is stopped.
+
+    Several workers, or recycling, run under uvicorn's process supervisor,
+    which shares one listening socket, replaces workers that exit and
+    restarts them gracefully on ``SIGHUP``. A single worker without
+    recycling runs in this process.
+    """
+    import uvicorn
+    from uvicorn.supervisors import Multiprocess
+
+    config = uvicorn.Config(**options)
+    if config.workers > 1 or config.limit_max_requests:
+        target = partial(run_worker, config, max_requests_jitter)
+        Multiprocess(config, target=target, sockets=[config.bind_socket()]).run()
+    else:
+        run_worker(config)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Size the server from the environment and run it."""
+    parser = argparse.ArgumentParser(description="Run the API with production settings")
+    parser.add_argument("--workers", type=int, default=None, help="Override SERVER_WORKERS")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the server options and exit"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    config = settings
+    if args.workers is not None:
+        config = settings.model_copy(update={"SERVER_WORKERS": args.workers})
+    cpus = available_cpus()
+    options = server_options(config, worker_count(config, cpus))
+
+    logger.info(
+        "Serving with %d worker(s) for %.1f available CPU(s), loop=%s, http=%s",
+        options["workers"], cpus, options["loop"], options["http"],
+    )
+    if options["workers"] > 1 and config.EVENTS_BACKEND == "local":
+        logger.warning(
+            "EVENTS_BACKEND=local: task events only reach streams on the worker "
+            "that made the change"
+        )
+    if not response_cache_coherent(config, options["workers"]):
+        logger.warning(
+            "RESPONSE_CACHE_BACKEND=memory with EVENTS_BACKEND=local would let workers "
+            "serve stale task reads after another worker's write; caching is off"
+        )
+    if args.dry_run:
+        print(json.dumps(
+            {**options, "max_requests_jitter": config.SERVER_MAX_REQUESTS_JITTER}, indent=2
+        ))
+        return 0
+    prepare_schema(config, options["workers"])
+    if not response_cache_coherent(config, options["workers"]):
+        # Read by the spawned workers when they build the response cache
+        os.environ["RESPONSE_CACHE_BACKEND"] = "off"
+    serve(options, config.SERVER_MAX_REQUESTS_JITTER)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
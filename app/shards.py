@@ -0,0 +1,112 @@
+"""Command line task shard maintenance.
+
+Usage:
+    python -m app.shards init
+    python -m app.shards status
+    python -m app.shards move 42 1 --grace 30
+    python -m app.shards rebalance --dry-run
+
+``init`` creates the task tables on new shards. ``move`` moves one user's
+tasks to a shard; ``rebalance`` moves every user whose shard differs from
+its place on the hash ring, e.g. after a shard was appended to
+``TASK_SHARD_URLS``. Give ``--grace`` longer than the slowest request, so
+writes routed to the old shard just before a switch are copied too.
+"""
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal, engine, shard_router
+from app.models import ArchivedTask, Task, User
+from app.utils.sharding import create_shard_schema, move_user, plan_rebalance
+
+
+async def status() -> None:
+    """Print users, tasks and archived tasks per shard."""
+    user_shard = func.coalesce(User.shard, 0)
+    async with AsyncSessionLocal() as session:
+        users = dict((await session.execute(
+            select(user_shard, func.count()).group_by(user_shard)
+        )).all())
+    for shard in range(len(shard_router.engines)):
+        async with shard_router.session_factory(shard)() as session:
+            tasks = (await session.execute(select(func.count(Task.id)))).scalar()
+            archived = (await session.execute(select(func.count(ArchivedTask.id)))).scalar()
+        print(f"shard={shard} users={users.get(shard, 0)} tasks={tasks} archived={archived}")
+
+
+async def rebalance(dry_run: bool, batch_size: int, grace: float) -> None:
+    """Move users to their place on the hash ring."""
+    moves = await plan_rebalance(shard_router, AsyncSessionLocal)
+    for user_id, current, placed in moves:
+        if dry_run:
+            print(f"user={user_id} shard={current} -> {placed}")
+            continue
+        moved = await move_user(
+            shard_router, AsyncSessionLocal, user_id, placed, batch_size, grace
+        )
+        print(f"user={user_id} shard={current} -> {placed} tasks={moved}")
+    print(f"{'planned' if dry_run else 'moved'}={len(moves)}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    """
+    Run a subcommand.
+
+    Returns:
+        int: Process exit code
+    """
+    try:
+        if args.command == "init":
+            await create_shard_schema(shard_router)
+        elif args.command == "status":
+            await status()
+        elif args.command == "move":
+            moved = await move_user(
+                shard_router, AsyncSessionLocal, args.user_id, args.shard,
+                args.batch_size, args.grace,
+            )
+            print(f"user={args.user_id} shard={args.shard} tasks={moved}")
+        else:
+            await rebalance(args.dry_run, args.batch_size, args.grace)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    finally:
+        await shard_router.dispose()
+        await engine.dispose()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run the subcommand."""
+    parser = argparse.ArgumentParser(description="Task shard maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init", help="Create task tables on the shards")
+    commands.add_parser("status", help="Show users and tasks per shard")
+    move = commands.add_parser("move", help="Move one user's tasks to a shard")
+    move.add_argument("user_id", type=int)
+    move.add_argument("shard", type=int)
+    balance = commands.add_parser("rebalance", help="Move users to their hash ring shard")
+    balance.add_argument("--dry-run", action="store_true", help="Only list the moves")
+    for command in (move, balance):
+        command.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+        command.add_argument(
+            "--grace",
+            type=float,
+            default=30.0,
+            help="Seconds to wait after switching a user before the final copy",
+        )
+    args = parser.parse_args(argv)
+
+    if not shard_router.enabled:
+        print("TASK_SHARD_URLS is not set", file=sys.stderr)
+        return 1
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Startup helpers: timing breakdown, schema creation and revision check, pool warm-up.
+
+This module is imported before settings and the engine are created so it
+can time them; it only imports the standard library at module level.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+    from app.database import ShardRouter
+
+
+class StartupTimer:
+    """Collect wall-clock durations of the startup phases."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as the named phase."""
+        phase_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - phase_started)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record (or add to) the duration of a phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def mark_imports_done(self) -> None:
+        """Record import time, excluding phases already timed while importing."""
+        nested = sum(self.phases.values())
+        self.record("imports", time.perf_counter() - self.started - nested)
+
+    def report(self) -> Dict[str, float]:
+        """
+        Get the timing breakdown in milliseconds.
+
+        Returns:
+            Dict[str, float]: Duration per phase plus ``total``
+        """
+        report = {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        report["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return report
+
+
+startup_timer = StartupTimer()
+
+
+async def create_schema(engine: "AsyncEngine", shards: "ShardRouter") -> None:
+    """
+    Create missing tables in the main database and on every task shard.
+
+    Args:
+        engine: Main database engine
+        shards: Task shard router
+    """
+    from app.database import Base
+    from app.utils.sharding import create_shard_schema
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await create_shard_schema(shards)
+
+
+def _compare_revisions(connection: "Connection", alembic_config: str) -> None:
+    """Raise if the database is not at the Alembic head revision."""
+    # Alembic is only needed in migrations mode, keep it off the default import path
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(Config(alembic_config))
+    expected = set(script.get_heads())
+    current = set(MigrationContext.configure(connection).get_current_heads())
+
+    if current != expected:
+        raise RuntimeError(
+            f"Database revision {sorted(current) or 'base'} does not match "
+            f"Alembic head {sorted(expected) or 'base'}; run 'alembic upgrade head'"
+        )
+
+
+async def check_schema_revision(
+    engine: "AsyncEngine",
+    alembic_config: str = "alembic.ini",
+) -> None:
+    """
+    Verify the database schema is at the Alembic head without running DDL.
+
+    Args:
+        engine: Database engine
+        alembic_config: Path to ``alembic.ini``
+
+    Raises:
+        RuntimeError: If the database revision differs from the head revision
+    """
+    async with engine.connect() as conn:
+        await conn.run_sync(_compare_revisions, alembic_config)
+
+
+def pool_capacity(engine: "AsyncEngine") -> Optional[int]:
+    """
+    Connections an engine's pool keeps open, or None when it does not limit them.
+
+    Overflow connections are closed when returned, so they do not count.
+    """
+    size = getattr(engine.pool, "size", None)
+    return size() if callable(size) else None
+
+
+async def warm_up_pool(engine: "AsyncEngine", size: int) -> int:
+    """
+    Open up to ``size`` pooled connections concurrently so first requests skip connect.
+
+    Never opens more than the pool keeps, e.g. one on the SQLite
+    concurrent-mode writer, since extra connections would wait for a
+    checkout that never comes.
+
+    Args:
+        engine: Database engine
+        size: Number of connections to open
+
+    Returns:
+        int: Number of connections warmed
+    """
+    capacity = pool_capacity(engine)
+    if capacity is not None:
+        size = min(size, capacity)
+    if size <= 0:
+        return 0
+
+    connections = await asyncio.gather(*(engine.connect() for _ in range(size)))
+    try:
+        await asyncio.gather(*(conn.exec_driver_sql("SELECT 1") for conn in connections))
+    finally:
+        # Closing returns the connections to the pool, where they stay open
+        await asyncio.gather(*(conn.close() for conn in connections))
+    return len(connections)
+
+
+def over_budget(report: Dict[str, float], budget_seconds: Optional[float]) -> bool:
+    """Check whether a startup report exceeds the configured budget."""
+    return bool(budget_seconds) and report["total"] > budget_seconds * 1000
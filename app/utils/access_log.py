@@ -0,0 +1,198 @@
+"""Structured access log written off the event loop.
+
+``AccessLogMiddleware`` builds one JSON record per request (method,
+templated route, status, latency, user id, database time and response
+bytes) and hands it to a ``logging.handlers.QueueHandler``. A
+``QueueListener`` thread formats and writes the records, so a slow disk or
+pipe never blocks request handling. When the queue is full, records are
+dropped and counted instead of waiting.
+
+Successful, fast requests are sampled at ``ACCESS_LOG_SAMPLE_RATE``;
+errors (status 400 and above) and requests slower than
+``ACCESS_LOG_SLOW_MS`` are always logged.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.access")
+
+
+class RequestTimings:
+    """Database work done on behalf of one request."""
+
+    __slots__ = ("db_seconds", "db_queries")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_queries = 0
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("access_log_timings", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _timings.get() is not None:
+        conn.info.setdefault("access_log_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _timings.get()
+    if timings is not None and conn.info.get("access_log_started"):
+        timings.db_seconds += time.perf_counter() - conn.info["access_log_started"].pop()
+        timings.db_queries += 1
+
+
+def install_sql_hooks() -> None:
+    """Add statement time to the current request's record on every engine (idempotent)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """
+    Path template of the matched route, e.g. ``/api/v1/tasks/{task_id}``.
+
+    Routes of included routers only know their path below the router's
+    prefix, so the prefix is recovered from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return None
+    try:
+        matched = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    return path[: len(path) - len(matched)] + template if path.endswith(matched) else template
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: the record's ``access`` fields plus time and level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "access", None) or {"message": record.getMessage()}
+        return json.dumps({
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname.lower(),
+            **fields,
+        })
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records when the queue is full instead of blocking."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Records are formatted by the listener thread; skip the copy QueueHandler makes
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_access_log(
+    path: str = "", queue_size: int = 10_000
+) -> logging.handlers.QueueListener:
+    """
+    Route the access logger through a queue to a background writer.
+
+    Args:
+        path: File to append to, or "" for standard output
+        queue_size: Records buffered before new ones are dropped
+
+    Returns:
+        logging.handlers.QueueListener: Writer thread, not yet started
+    """
+    target = logging.FileHandler(path) if path else logging.StreamHandler(sys.stdout)
+    target.setFormatter(JsonFormatter())
+    handler = DroppingQueueHandler(queue.Queue(queue_size))
+    for existing in list(logger.handlers):
+        logger.removeHandler(existing)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logging.handlers.QueueListener(handler.queue, target)
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware writing one access log record per HTTP request.
+
+    Args:
+        app: Wrapped application
+        sample_rate: Fraction of successful, fast requests logged
+        slow_ms: Requests at least this slow are always logged
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0, slow_ms: float = 500.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = RequestTimings()
+        reset = _timings.set(timings)
+        response = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(reset)
+            self._log(scope, response, timings, time.perf_counter() - started)
+
+    def _log(
+        self, scope: Scope, response: Dict[str, int], timings: RequestTimings, elapsed: float
+    ) -> None:
+        latency_ms = elapsed * 1000
+        status = response["status"]
+        if status < 400 and latency_ms < self.slow_ms and random.random() >= self.sample_rate:
+            return
+        state = scope.get("state") or {}
+        record: Dict[str, Any] = {
+            "method": scope["method"],
+            "route": route_template(scope),
+            "path": scope["path"],
+            "status": status,
+            "latency_ms": round(latency_ms, 3),
+            "user_id": state.get("user_id"),
+            "db_ms": round(timings.db_seconds * 1000, 3),
+            "db_queries": timings.db_queries,
+            "bytes": response["bytes"],
+        }
+        if status < 400 and latency_ms < self.slow_ms:
+            record["sample_rate"] = self.sample_rate
+        logger.info("access", extra={"access": record})
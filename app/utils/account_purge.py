@@ -0,0 +1,144 @@
+"""Account closure: deactivate at once, purge the account's data in batches."""
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import ShardRouter
+from app.models import ArchivedTask, Task, TaskTombstone, User
+from app.utils.leases import Lease
+
+logger = logging.getLogger(__name__)
+
+tasks_table = Task.__table__
+archive_table = ArchivedTask.__table__
+
+
+async def close_account(db: AsyncSession, user: User) -> None:
+    """
+    Deactivate an account and mark it for purging.
+
+    Args:
+        db: Database session
+        user: Account to close
+    """
+    user.is_active = False
+    user.deletion_requested_at = datetime.utcnow()
+    await db.commit()
+
+
+async def purge_account(
+    session_factory: Callable[[], AsyncSession],
+    user_id: int,
+    batch_size: int = 1000,
+    task_session_factory: Optional[Callable[[], AsyncSession]] = None,
+) -> int:
+    """
+    Delete a closed account's tasks and archived tasks in batches, then the account itself.
+
+    Each batch is its own short transaction, so the purge never holds long
+    locks or loads the tasks, and an interrupted purge simply continues
+    where it stopped.
+
+    Args:
+        session_factory: Callable returning a new session
+        user_id: Account to purge
+        batch_size: Tasks deleted per transaction
+        task_session_factory: Sessions on the account's task shard, if tasks are sharded
+
+    Returns:
+        int: Number of tasks deleted, archived ones included
+    """
+    task_session_factory = task_session_factory or session_factory
+    deleted = 0
+    for table in (tasks_table, archive_table):
+        while True:
+            async with task_session_factory() as session:
+                batch = (
+                    select(table.c.id)
+                    .where(table.c.owner_id == user_id)
+                    .order_by(table.c.id)
+                    .limit(batch_size)
+                    .scalar_subquery()
+                )
+                result = await session.execute(delete(table).where(table.c.id.in_(batch)))
+                await session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+
+    async with task_session_factory() as session:
+        await session.execute(
+            delete(TaskTombstone.__table__).where(TaskTombstone.owner_id == user_id)
+        )
+        await session.commit()
+    async with session_factory() as session:
+        await session.execute(delete(User.__table__).where(User.id == user_id))
+        await session.commit()
+    return deleted
+
+
+def task_sessions(
+    shards: Optional[ShardRouter], user: User
+) -> Optional[Callable[[], AsyncSession]]:
+    """Session factory of the shard holding a user's tasks, or None when unsharded."""
+    if shards is None or not shards.enabled:
+        return None
+    return shards.session_factory(shards.shard_for(user))
+
+
+async def purge_closed_accounts(
+    session_factory: Callable[[], AsyncSession],
+    batch_size: int = 1000,
+    shards: Optional[ShardRouter] = None,
+) -> int:
+    """
+    Finish purging every closed account, e.g. after a restart cut one short.
+
+    Returns:
+        int: Number of accounts purged
+    """
+    async with session_factory() as session:
+        users = (await session.execute(
+            select(User.id, User.shard).where(User.deletion_requested_at.is_not(None))
+        )).all()
+    for user in users:
+        await purge_account(session_factory, user.id, batch_size, task_sessions(shards, user))
+    return len(users)
+
+
+async def run_account_purge(
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+    batch_size: int = 1000,
+    shards: Optional[ShardRouter] = None,
+    lease: Optional[Lease] = None,
+) -> None:
+    """
+    Sweep for closed accounts every ``interval`` seconds until cancelled.
+
+    Args:
+        session_factory: Callable returning a new session
+        interval: Seconds between sweeps
+        batch_size: Tasks deleted per transaction
+        shards: Task shard router, when tasks are sharded
+        lease: Lease electing the one worker that sweeps, claimed before each sweep
+    """
+    try:
+        while True:
+            try:
+                if lease is None or await lease.acquire():
+                    purged = await purge_closed_accounts(session_factory, batch_size, shards)
+                    if purged:
+                        logger.info("Purged %d closed accounts", purged)
+            except Exception:
+                logger.exception("Account purge sweep failed")
+            await asyncio.sleep(interval)
+    finally:
+        if lease is not None:
+            with suppress(Exception):
+                await lease.release()
@@ -0,0 +1,184 @@
+"""Hot/cold split of tasks: archiving long-completed tasks and restoring them.
+
+Tasks done and unchanged for longer than the retention move in batches from
+``tasks`` to ``archived_tasks``, keeping their ids. Task lists, lookups and
+the change feed read only the hot table unless archived tasks are asked
+for; a restore moves a task back with a new change sequence, so sync
+clients see it again.
+"""
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import DateTime, delete, insert, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.util import AliasedClass
+
+from app.models import ArchivedTask, Task, TaskStatus
+from app.utils.leases import Lease
+from app.utils.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+tasks_table = Task.__table__
+archive_table = ArchivedTask.__table__
+
+# Columns both tables share, in ``tasks`` order
+TASK_COLUMNS = tuple(column.name for column in tasks_table.c)
+
+
+def with_archived(owner_id: int) -> AliasedClass:
+    """
+    ``Task`` entity over an owner's hot and archived tasks.
+
+    Each side of the union is restricted to the owner, so both use their
+    owner index; query the returned entity like ``Task``.
+
+    Args:
+        owner_id: Owner of the tasks
+
+    Returns:
+        AliasedClass: Alias of ``Task`` selecting from both tables
+    """
+    hot = select(tasks_table).where(tasks_table.c.owner_id == owner_id)
+    cold = select(*(archive_table.c[name] for name in TASK_COLUMNS)).where(
+        archive_table.c.owner_id == owner_id
+    )
+    return aliased(Task, union_all(hot, cold).subquery("tasks"))
+
+
+async def archive_completed_tasks(
+    session_factory: Callable[[], AsyncSession],
+    older_than: timedelta,
+    batch_size: int = 1000,
+    cache: Optional[ResponseCache] = None,
+) -> int:
+    """
+    Move tasks done and unchanged for longer than ``older_than`` to the archive.
+
+    Each batch is copied and deleted in its own short transaction. The
+    selected rows are locked where the database supports it and both
+    statements repeat the age condition, so a task edited meanwhile stays
+    hot. Task ids are never reused (``tasks`` is ``AUTOINCREMENT`` on
+    SQLite), so new tasks cannot take an archived task's id.
+
+    Args:
+        session_factory: Callable returning a new session
+        older_than: How long tasks stay hot after completion and their last edit
+        batch_size: Tasks moved per transaction
+        cache: Response cache, invalidated for owners whose tasks moved
+
+    Returns:
+        int: Number of tasks archived
+    """
+    now = datetime.utcnow()
+    cutoff = now - older_than
+    expired = [
+        tasks_table.c.status == TaskStatus.DONE,
+        tasks_table.c.completed_at < cutoff,
+        tasks_table.c.updated_at < cutoff,
+    ]
+    archived, after = 0, 0
+    while True:
+        async with session_factory() as session:
+            rows = (await session.execute(
+                select(tasks_table.c.id, tasks_table.c.owner_id)
+                .where(*expired, tasks_table.c.id > after)
+                .order_by(tasks_table.c.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            await session.execute(
+                insert(archive_table).from_select(
+                    [*TASK_COLUMNS, "archived_at"],
+                    select(*(tasks_table.c[name] for name in TASK_COLUMNS), literal(now, DateTime))
+                    .where(tasks_table.c.id.in_(ids), *expired),
+                )
+            )
+            result = await session.execute(
+                delete(tasks_table).where(tasks_table.c.id.in_(ids), *expired)
+            )
+            await session.commit()
+        archived += result.rowcount
+        after = ids[-1]
+        if cache is not None:
+            for owner_id in {row.owner_id for row in rows}:
+                await cache.invalidate(owner_id)
+        if len(rows) < batch_size:
+            break
+    return archived
+
+
+async def run_task_archiver(
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+    older_than: timedelta,
+    batch_size: int = 1000,
+    cache: Optional[ResponseCache] = None,
+    lease: Optional[Lease] = None,
+) -> None:
+    """
+    Archive completed tasks every ``interval`` seconds until cancelled.
+
+    Args:
+        session_factory: Callable returning a new session
+        interval: Seconds between runs
+        older_than: How long tasks stay hot after completion and their last edit
+        batch_size: Tasks moved per transaction
+        cache: Response cache, invalidated for owners whose tasks moved
+        lease: Lease electing the one worker that runs, claimed before each run
+    """
+    try:
+        while True:
+            try:
+                if lease is None or await lease.acquire():
+                    archived = await archive_completed_tasks(
+                        session_factory, older_than, batch_size, cache
+                    )
+                    if archived:
+                        logger.info("Archived %d completed tasks", archived)
+            except Exception:
+                logger.exception("Task archiving failed")
+            await asyncio.sleep(interval)
+    finally:
+        if lease is not None:
+            with suppress(Exception):
+                await lease.release()
+
+
+async def restore_task(db: AsyncSession, task_id: int, owner_id: int) -> Optional[Task]:
+    """
+    Move an archived task back to the hot table under its own id.
+
+    The restored task counts as just updated, so it stays hot for another
+    full retention period. Not committed.
+
+    Args:
+        db: Session holding the owner's tasks
+        task_id: Task ID
+        owner_id: Owner of the task
+
+    Returns:
+        Optional[Task]: The restored task, or None if the owner has no such archived task
+
+    Raises:
+        IntegrityError: If a hot task already has the id
+    """
+    archived = (await db.execute(
+        select(ArchivedTask).where(ArchivedTask.id == task_id, ArchivedTask.owner_id == owner_id)
+    )).scalar_one_or_none()
+    if archived is None:
+        return None
+    values = {name: getattr(archived, name) for name in TASK_COLUMNS if name != "change_seq"}
+    values["updated_at"] = datetime.utcnow()
+    task = Task(**values)
+    await db.delete(archived)
+    db.add(task)
+    await db.flush()
+    return task
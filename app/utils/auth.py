@@ -2,7 +2,7 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -20,6 +20,9 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Request scope key of the user a batch authenticated once for its sub-requests
+BATCH_USER = "app.batch_user"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -76,13 +79,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Get the current authenticated user from JWT token.
     
+    Sub-requests of a batch reuse the user the batch authenticated,
+    without decoding the token or querying again.
+    
     Args:
+        request: Incoming request; the user id is noted for the access log
         token: JWT token from Authorization header
         db: Database session
         
@@ -92,6 +100,11 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
+    batch_user = request.scope.get(BATCH_USER)
+    if batch_user is not None and batch_user.deletion_requested_at is None:
+        request.state.user_id = batch_user.id
+        return batch_user
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -114,8 +127,10 @@ async def get_current_user(
     result = await db.execute(select(User).where(User.id == token_data.user_id))
     user = result.scalar_one_or_none()
     
-    if user is None:
+    # Closed accounts are gone as far as clients are concerned
+    if user is None or user.deletion_requested_at is not None:
         raise credentials_exception
+    request.state.user_id = user.id
         
     if not user.is_active:
         raise HTTPException(
@@ -149,6 +164,29 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_superuser(
+    current_user: User = Depends(get_current_active_user)
+) -> User:
+    """
+    Get the current user, requiring superuser privileges.
+    
+    Args:
+        current_user: Current active user
+        
+    Returns:
+        User: Current superuser
+        
+    Raises:
+        HTTPException: If user is not a superuser
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough privileges"
+        )
+    return current_user
+
+
 async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """
     Authenticate a user with username and password.
@@ -169,7 +207,7 @@ async def authenticate_user(db: AsyncSession, username: str, password: str) -> O
     )
     user = result.scalar_one_or_none()
     
-    if not user:
+    if not user or user.deletion_requested_at is not None:
         return None
         
     if not verify_password(password, user.hashed_password):
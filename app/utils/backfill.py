@@ -0,0 +1,232 @@
+"""Chunked, resumable data backfills for large tables.
+
+A backfill walks a table in primary-key order, one batch at a time, and
+commits after every batch together with a checkpoint row. An interrupted run
+resumes from the last checkpoint, so the batch function must be idempotent
+for the (at most one) batch that may be replayed.
+
+Inside an Alembic migration, leave the migration transaction with an
+autocommit block and give the backfill its own connection, so each batch
+commits on its own::
+
+    with op.get_context().autocommit_block():
+        with op.get_bind().engine.connect() as connection:
+            Backfill("tasks_title_lower", tasks, apply=fill_title_lower).run(connection)
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+checkpoint_metadata = MetaData()
+
+checkpoints = Table(
+    "data_migration_checkpoints",
+    checkpoint_metadata,
+    Column("name", String(100), primary_key=True),
+    Column("last_key", BigInteger, nullable=True),
+    Column("rows_done", BigInteger, nullable=False, default=0),
+    Column("completed_at", DateTime, nullable=True),
+    Column("updated_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+# apply(connection, lower_exclusive, upper_inclusive); the return value is ignored
+BatchFunction = Callable[[Connection, Optional[int], int], Any]
+
+
+@dataclass
+class BackfillProgress:
+    """Progress of a backfill after a batch (or at the end of a run)."""
+    name: str
+    batches: int
+    rows: int
+    total_rows: int
+    last_key: Optional[int]
+    max_key: Optional[int]
+    rows_per_second: float
+    eta_seconds: Optional[float]
+    completed: bool
+
+
+class Backfill:
+    """
+    Keyset-ordered, throttled, checkpointed batch processor.
+
+    Args:
+        name: Unique checkpoint name
+        table: Table to walk
+        apply: Batch function called with the exclusive lower and inclusive upper key
+        key: Integer key column to order by (must be indexed)
+        batch_size: Rows per batch
+        rows_per_second: Throttle target, or None for no throttling
+        on_progress: Called with a ``BackfillProgress`` after every batch
+        clock: Monotonic clock, injectable for tests
+        sleep: Sleep function, injectable for tests
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: Table,
+        apply: BatchFunction,
+        key: str = "id",
+        batch_size: int = 1000,
+        rows_per_second: Optional[float] = None,
+        on_progress: Optional[Callable[[BackfillProgress], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.name = name
+        self.table = table
+        self.apply = apply
+        self.key = table.c[key]
+        self.batch_size = batch_size
+        self.rows_per_second = rows_per_second
+        self.on_progress = on_progress
+        self.clock = clock
+        self.sleep = sleep
+
+    def _load_checkpoint(self, connection: Connection):
+        """Create the checkpoint table and row if needed and return the row."""
+        checkpoint_metadata.create_all(connection, checkfirst=True)
+        row = connection.execute(
+            select(checkpoints).where(checkpoints.c.name == self.name)
+        ).one_or_none()
+        if row is None:
+            connection.execute(insert(checkpoints).values(name=self.name, rows_done=0))
+            row = connection.execute(
+                select(checkpoints).where(checkpoints.c.name == self.name)
+            ).one()
+        connection.commit()
+        return row
+
+    def _save_checkpoint(
+        self,
+        connection: Connection,
+        last_key: Optional[int],
+        rows_done: int,
+        completed: bool = False,
+    ) -> None:
+        """Record progress; committed together with the batch."""
+        now = datetime.utcnow()
+        connection.execute(
+            update(checkpoints)
+            .where(checkpoints.c.name == self.name)
+            .values(
+                last_key=last_key,
+                rows_done=rows_done,
+                updated_at=now,
+                completed_at=now if completed else None,
+            )
+        )
+
+    def _throttle(self, rows: int, started: float) -> None:
+        """Sleep long enough to keep the run at the target rate."""
+        if not self.rows_per_second:
+            return
+        lag = rows / self.rows_per_second - (self.clock() - started)
+        if lag > 0:
+            self.sleep(lag)
+
+    def run(self, connection: Connection, max_batches: Optional[int] = None) -> BackfillProgress:
+        """
+        Process batches until the table is exhausted or ``max_batches`` is reached.
+
+        Args:
+            connection: Database connection; committed after every batch
+            max_batches: Optional cap on batches for this run
+
+        Returns:
+            BackfillProgress: Progress at the end of the run
+        """
+        checkpoint = self._load_checkpoint(connection)
+        last_key = checkpoint.last_key
+        total_rows = checkpoint.rows_done
+        max_key = connection.execute(select(func.max(self.key))).scalar()
+        start_key = last_key
+        if start_key is None:
+            min_key = connection.execute(select(func.min(self.key))).scalar()
+            start_key = min_key - 1 if min_key is not None else None
+
+        progress = BackfillProgress(
+            name=self.name,
+            batches=0,
+            rows=0,
+            total_rows=total_rows,
+            last_key=last_key,
+            max_key=max_key,
+            rows_per_second=0.0,
+            eta_seconds=None,
+            completed=checkpoint.completed_at is not None,
+        )
+        if progress.completed:
+            return progress
+
+        started = self.clock()
+        while max_batches is None or progress.batches < max_batches:
+            query = select(self.key).order_by(self.key).limit(self.batch_size)
+            if last_key is not None:
+                query = query.where(self.key > last_key)
+            keys = connection.execute(query).scalars().all()
+
+            if not keys:
+                self._save_checkpoint(connection, last_key, total_rows, completed=True)
+                connection.commit()
+                progress.completed = True
+                progress.eta_seconds = 0.0
+                break
+
+            upper = keys[-1]
+            self.apply(connection, last_key, upper)
+            total_rows += len(keys)
+            self._save_checkpoint(connection, upper, total_rows)
+            connection.commit()
+
+            last_key = upper
+            progress.batches += 1
+            progress.rows += len(keys)
+            progress.total_rows = total_rows
+            progress.last_key = last_key
+
+            self._throttle(progress.rows, started)
+            elapsed = self.clock() - started
+            progress.rows_per_second = round(progress.rows / elapsed, 2) if elapsed > 0 else 0.0
+            if elapsed > 0 and max_key is not None and start_key is not None:
+                key_rate = (last_key - start_key) / elapsed
+                if key_rate > 0:
+                    progress.eta_seconds = round(max(max_key - last_key, 0) / key_rate, 1)
+
+            logger.info(
+                "Backfill %s: %d rows, last key %s of %s, %.0f rows/s, ETA %ss",
+                self.name, total_rows, last_key, max_key,
+                progress.rows_per_second, progress.eta_seconds,
+            )
+            if self.on_progress:
+                self.on_progress(progress)
+
+        return progress
+
+
+def reset_checkpoint(connection: Connection, name: str) -> None:
+    """Forget a backfill's progress so it runs from the start again."""
+    checkpoint_metadata.create_all(connection, checkfirst=True)
+    connection.execute(checkpoints.delete().where(checkpoints.c.name == name))
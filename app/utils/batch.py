@@ -0,0 +1,200 @@
+"""In-process dispatch of the sub-requests of a batch.
+
+``POST /api/v1/batch`` runs each sub-request through the application's
+router directly: the batch itself went through the middleware once, and
+its sub-requests skip it. The scope of a sub-request carries the batch's
+user under ``BATCH_USER`` (so ``get_current_user`` neither decodes the
+token nor queries again) and, for sequential batches, the batch's session
+under ``BATCH_SESSION`` (so every sub-request runs on one session and at
+most one connection).
+
+Responses are collected in memory. Streaming responses, such as the task
+event stream, never end and are refused as soon as they start.
+"""
+import json
+import logging
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.exceptions import HTTPException
+from starlette.types import Message, Scope
+
+from app.database import BATCH_SESSION
+from app.models import User
+from app.utils.auth import BATCH_USER
+
+logger = logging.getLogger(__name__)
+
+# Scope entries a sub-request inherits from the batch; everything else is per request
+INHERITED_SCOPE_KEYS = (
+    "type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app",
+    "extensions", "starlette.exception_handlers",
+)
+# Headers of the batch that do not describe a sub-request
+BATCH_ONLY_HEADERS = {b"content-length", b"content-type", b"transfer-encoding"}
+# Headers a sub-request may not set: the batch decides who is calling
+FORBIDDEN_HEADERS = BATCH_ONLY_HEADERS | {b"authorization", b"cookie", b"host"}
+
+INTERNAL_ERROR = {"detail": "An internal server error occurred", "type": "internal_server_error"}
+
+
+class StreamingRefused(Exception):
+    """A sub-request started a streaming response."""
+
+
+@dataclass
+class SubResponse:
+    """Status, headers and body collected from one sub-request."""
+    status: int = 500
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @classmethod
+    def error(cls, status: int, detail: Any) -> "SubResponse":
+        """JSON error response, shaped like the application's own."""
+        content = detail if isinstance(detail, dict) else {"detail": detail}
+        return cls(status, {"content-type": "application/json"}, json.dumps(content).encode())
+
+    def render(self) -> bytes:
+        """
+        This response as an item of the batch response.
+
+        JSON bodies are spliced in as they are, without parsing them again.
+        """
+        if not self.body:
+            body = b"null"
+        elif self.headers.get("content-type", "").startswith("application/json"):
+            body = self.body
+        else:
+            body = json.dumps(self.body.decode("utf-8", "replace")).encode()
+        return b'{"status":%d,"headers":%s,"body":%s}' % (
+            self.status, json.dumps(self.headers).encode(), body
+        )
+
+
+def sub_request_scope(
+    request: Request,
+    method: str,
+    path: str,
+    headers: Dict[str, str],
+    body: bytes,
+) -> Scope:
+    """
+    Scope of one sub-request, based on the batch request's.
+
+    Args:
+        request: The batch request
+        method: HTTP method
+        path: Path with optional query string
+        headers: Headers of the sub-request, added to the batch's own
+        body: Request body
+
+    Returns:
+        Scope: ASGI scope to hand to the router
+    """
+    path, _, query = path.partition("?")
+    extra = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items()
+    ]
+    extra = [(name, value) for name, value in extra if name not in FORBIDDEN_HEADERS]
+    own = {name for name, _ in extra}
+    raw_headers = [
+        (name, value) for name, value in request.scope["headers"]
+        if name not in BATCH_ONLY_HEADERS and name not in own
+    ]
+    raw_headers += extra
+    if body:
+        raw_headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+    scope = {key: request.scope[key] for key in INHERITED_SCOPE_KEYS if key in request.scope}
+    scope.update(
+        method=method,
+        path=unquote(path),
+        raw_path=path.encode(),
+        query_string=query.encode(),
+        headers=raw_headers,
+        state={},
+    )
+    return scope
+
+
+async def dispatch(
+    request: Request,
+    method: str,
+    path: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: bytes = b"",
+    user: Optional[User] = None,
+    session: Optional[AsyncSession] = None,
+) -> SubResponse:
+    """
+    Run one sub-request through the application's router.
+
+    Args:
+        request: The batch request
+        method: HTTP method
+        path: Path with optional query string
+        headers: Extra headers of the sub-request
+        body: JSON request body
+        user: User authenticated by the batch
+        session: Session shared with the sub-request, if any
+
+    Returns:
+        SubResponse: What the endpoint responded, or the error it raised
+    """
+    scope = sub_request_scope(request, method, path, headers or {}, body)
+    if user is not None:
+        scope[BATCH_USER] = user
+    if session is not None:
+        scope[BATCH_SESSION] = session
+
+    response = SubResponse()
+    chunks: List[bytes] = []
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            response.status = message["status"]
+            response.headers = _decode_headers(message.get("headers", []))
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                raise StreamingRefused()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        # Stands in for FastAPI's exit stack middleware, which closes uploads
+        async with AsyncExitStack() as stack:
+            scope["fastapi_middleware_astack"] = stack
+            await request.app.router(scope, receive, send)
+    except HTTPException as exc:
+        # Raised by the router itself, e.g. no route or method not allowed
+        return SubResponse.error(exc.status_code, exc.detail)
+    except Exception:
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            return SubResponse.error(400, "Streaming responses cannot be batched")
+        logger.exception("Batched %s %s failed", method, path)
+        return SubResponse.error(500, INTERNAL_ERROR)
+    response.body = b"".join(chunks)
+    return response
+
+
+def _decode_headers(raw: List[Tuple[bytes, bytes]]) -> Dict[str, str]:
+    return {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in raw
+        if name != b"content-length"
+    }
@@ -0,0 +1,139 @@
+"""Incremental task change feed and tombstone compaction."""
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ChangeSequence, Task, TaskTombstone
+from app.schemas import TaskChanges, TaskResponse
+from app.utils.leases import Lease
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeTokenExpired(Exception):
+    """The token predates purged tombstones, so deletions may have been missed."""
+
+
+async def fetch_changes(db: AsyncSession, owner_id: int, since: int, limit: int) -> TaskChanges:
+    """
+    Get a user's task changes after a change token, oldest first.
+
+    Both queries are range scans on ``(owner_id, change_seq)`` indexes.
+
+    Args:
+        db: Database session
+        owner_id: Owner whose tasks are returned
+        since: Change token from a previous call (0 for a full sync)
+        limit: Maximum number of changes to return
+
+    Returns:
+        TaskChanges: Changed tasks, deleted task IDs and the next token
+
+    Raises:
+        ChangeTokenExpired: If tombstones after ``since`` have been purged
+    """
+    if since > 0:
+        compacted_through = (await db.execute(
+            select(ChangeSequence.compacted_through).where(ChangeSequence.id == 1)
+        )).scalar()
+        if compacted_through and since < compacted_through:
+            raise ChangeTokenExpired(since)
+
+    # Fetch one extra row from each side to know whether more changes follow
+    tasks = (await db.execute(
+        select(Task)
+        .where(Task.owner_id == owner_id, Task.change_seq > since)
+        .order_by(Task.change_seq)
+        .limit(limit + 1)
+    )).scalars().all()
+    tombstones = (await db.execute(
+        select(TaskTombstone.task_id, TaskTombstone.change_seq)
+        .where(TaskTombstone.owner_id == owner_id, TaskTombstone.change_seq > since)
+        .order_by(TaskTombstone.change_seq)
+        .limit(limit + 1)
+    )).all()
+
+    merged = sorted(
+        [(task.change_seq, task) for task in tasks]
+        + [(row.change_seq, row.task_id) for row in tombstones],
+        key=lambda change: change[0],
+    )
+    page = merged[:limit]
+    return TaskChanges(
+        changed=[
+            TaskResponse.model_validate(item) for _, item in page if isinstance(item, Task)
+        ],
+        deleted=[item for _, item in page if not isinstance(item, Task)],
+        next_token=page[-1][0] if page else since,
+        has_more=len(merged) > limit,
+    )
+
+
+async def purge_tombstones(db: AsyncSession, retention: timedelta) -> int:
+    """
+    Delete tombstones older than the retention period.
+
+    Records the highest purged sequence so that tokens older than it are
+    rejected instead of silently missing deletions.
+
+    Args:
+        db: Database session
+        retention: How long tombstones are kept
+
+    Returns:
+        int: Number of tombstones purged
+    """
+    cutoff = datetime.utcnow() - retention
+    purged_through = (await db.execute(
+        select(func.max(TaskTombstone.change_seq)).where(TaskTombstone.deleted_at < cutoff)
+    )).scalar()
+    if purged_through is None:
+        return 0
+
+    result = await db.execute(
+        delete(TaskTombstone).where(TaskTombstone.change_seq <= purged_through)
+    )
+    await db.execute(
+        update(ChangeSequence)
+        .where(ChangeSequence.id == 1, ChangeSequence.compacted_through < purged_through)
+        .values(compacted_through=purged_through)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def run_tombstone_compaction(
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+    retention: timedelta,
+    lease: Optional[Lease] = None,
+) -> None:
+    """
+    Purge old tombstones every ``interval`` seconds until cancelled.
+
+    Args:
+        session_factory: Callable returning a new session
+        interval: Seconds between runs
+        retention: How long tombstones are kept
+        lease: Lease electing the one worker that runs, claimed before each run
+    """
+    try:
+        while True:
+            try:
+                if lease is None or await lease.acquire():
+                    async with session_factory() as session:
+                        purged = await purge_tombstones(session, retention)
+                    if purged:
+                        logger.info("Purged %d task tombstones", purged)
+            except Exception:
+                logger.exception("Tombstone compaction failed")
+            await asyncio.sleep(interval)
+    finally:
+        if lease is not None:
+            with suppress(Exception):
+                await lease.release()
@@ -0,0 +1,388 @@
+"""Task change events: in-process pub/sub hub with pluggable cross-worker backends."""
+import abc
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.schemas import TaskResponse
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+Deliver = Callable[[Message], None]
+
+# Queued in place of events when a subscriber falls too far behind
+RESYNC = {"type": "resync"}
+# Queued into idle subscriptions so their connections see traffic
+HEARTBEAT = {"type": "heartbeat"}
+# Reconnect delay suggested to clients
+RETRY_MS = 3000
+
+
+class EventBackend(abc.ABC):
+    """
+    Transport carrying messages between the hubs of all workers.
+
+    ``publish`` sends a message to every hub attached to the transport,
+    including the publisher's own.
+    """
+
+    @abc.abstractmethod
+    async def start(self, deliver: Deliver) -> None:
+        """Start receiving; ``deliver`` is called for every message."""
+
+    @abc.abstractmethod
+    async def publish(self, message: Message) -> None:
+        """Send a message to every attached hub."""
+
+    async def close(self) -> None:
+        """Stop receiving and release resources."""
+
+
+class LocalBroker:
+    """In-memory message bus: one worker on its own, or several in tests."""
+
+    def __init__(self):
+        self.receivers: List[Deliver] = []
+
+    def publish(self, message: Message) -> None:
+        for deliver in list(self.receivers):
+            deliver(message)
+
+
+class LocalBackend(EventBackend):
+    """
+    Backend on a ``LocalBroker``.
+
+    With a private broker (the default) it reaches only this process. Hubs
+    sharing one broker behave like workers sharing a real broker.
+
+    Args:
+        broker: Broker shared with other backends
+    """
+
+    def __init__(self, broker: Optional[LocalBroker] = None):
+        self.broker = broker or LocalBroker()
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self.broker.receivers.append(deliver)
+
+    async def publish(self, message: Message) -> None:
+        self.broker.publish(message)
+
+    async def close(self) -> None:
+        if self._deliver in self.broker.receivers:
+            self.broker.receivers.remove(self._deliver)
+        self._deliver = None
+
+
+class PostgresBackend(EventBackend):
+    """
+    Backend on PostgreSQL LISTEN/NOTIFY, shared by every worker on the database.
+
+    NOTIFY payloads are capped at 8000 bytes; larger events are sent without
+    the task body and clients fetch it from the change feed.
+
+    Args:
+        url: SQLAlchemy or libpq database URL
+        channel: Notification channel
+    """
+
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, url: str, channel: str = "task_events"):
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.channel = channel
+        self._connection = None
+        self._lock = asyncio.Lock()
+
+    async def start(self, deliver: Deliver) -> None:
+        import asyncpg
+
+        def on_notify(connection, pid, channel, payload) -> None:
+            deliver(json.loads(payload))
+
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(self.channel, on_notify)
+
+    async def publish(self, message: Message) -> None:
+        payload = json.dumps(message)
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            payload = json.dumps({key: value for key, value in message.items() if key != "task"})
+        async with self._lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+class Subscription:
+    """One event stream connection: a bounded queue of messages for a user."""
+
+    __slots__ = ("user_id", "queue")
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+
+class EventHub:
+    """
+    Fan task events out to the subscriptions of their owner in this worker.
+
+    Subscriptions are plain queues and a single ticker sends heartbeats for
+    all of them, so an idle stream costs its queue and its parked request
+    coroutine and nothing else. A subscriber whose queue is full is dropped:
+    its queue is replaced by a single resync message and it receives nothing
+    more.
+
+    Args:
+        backend: Transport shared with other workers
+        queue_size: Messages buffered per subscription
+        max_subscribers: Subscriptions allowed in this worker
+        heartbeat: Seconds between heartbeats to idle subscriptions
+    """
+
+    def __init__(
+        self,
+        backend: Optional[EventBackend] = None,
+        queue_size: int = 100,
+        max_subscribers: int = 10_000,
+        heartbeat: float = 15.0,
+    ):
+        self.backend = backend or LocalBackend()
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self.subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        self.subscriber_count = 0
+        self.dropped = 0
+        self._started: Optional[asyncio.Future] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        # Called with every message, e.g. to invalidate per-worker caches
+        self.listeners: List[Deliver] = []
+
+    async def start(self) -> None:
+        """Attach to the backend and start heartbeats once; later calls wait for the first."""
+        if self._started is None:
+            self._started = asyncio.ensure_future(self.backend.start(self.deliver))
+            self._ticker = asyncio.create_task(self._send_heartbeats(), name="event-heartbeats")
+        await asyncio.shield(self._started)
+
+    async def close(self) -> None:
+        """Finish pending publishes, stop heartbeats and detach from the backend."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+        if self._started is not None:
+            self._started = None
+            await self.backend.close()
+
+    async def _send_heartbeats(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            for subscribers in list(self.subscriptions.values()):
+                for subscription in subscribers:
+                    if subscription.queue.empty():
+                        subscription.queue.put_nowait(HEARTBEAT)
+
+    @property
+    def full(self) -> bool:
+        """Whether this worker has reached its subscription limit."""
+        return self.subscriber_count >= self.max_subscribers
+
+    def subscribe(self, user_id: int) -> Optional[Subscription]:
+        """
+        Open a subscription to a user's events.
+
+        Returns:
+            Optional[Subscription]: The subscription, or None when the worker is full
+        """
+        if self.full:
+            return None
+        subscription = Subscription(user_id, self.queue_size)
+        self.subscriptions[user_id].add(subscription)
+        self.subscriber_count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Close a subscription; safe to call more than once."""
+        subscribers = self.subscriptions.get(subscription.user_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        self.subscriber_count -= 1
+        if not subscribers:
+            del self.subscriptions[subscription.user_id]
+
+    def deliver(self, message: Message) -> None:
+        """Pass a message to the listeners and queue it for the owner's subscriptions."""
+        for listener in self.listeners:
+            try:
+                listener(message)
+            except Exception:
+                logger.exception("Task event listener failed")
+        for subscription in list(self.subscriptions.get(message.get("owner_id"), ())):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(RESYNC)
+        self.dropped += 1
+        self.unsubscribe(subscription)
+
+    def publish(self, message: Message) -> None:
+        """Send a message to every worker without waiting (needs a running loop)."""
+        task = asyncio.get_running_loop().create_task(self._publish(message))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish(self, message: Message) -> None:
+        try:
+            await self.start()
+            await self.backend.publish(message)
+        except Exception:
+            logger.exception("Publishing task event failed")
+
+
+def build_backend(name: str) -> EventBackend:
+    """Backend for the ``EVENTS_BACKEND`` setting."""
+    if name == "postgres":
+        return PostgresBackend(settings.DATABASE_URL)
+    return LocalBackend()
+
+
+event_hub = EventHub(
+    build_backend(settings.EVENTS_BACKEND),
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    max_subscribers=settings.EVENTS_MAX_SUBSCRIBERS,
+    heartbeat=settings.EVENTS_HEARTBEAT_SECONDS,
+)
+
+
+def task_event(kind: str, task: Any) -> Message:
+    """
+    Build the message for a task change.
+
+    Args:
+        kind: ``created``, ``updated`` or ``deleted``
+        task: The task, or a ``(task_id, owner_id, change_seq)`` tuple for deletions
+
+    Returns:
+        Message: JSON-ready event
+    """
+    if kind == "deleted":
+        task_id, owner_id, change_seq = task
+        return {
+            "type": "task.deleted",
+            "owner_id": owner_id,
+            "task_id": task_id,
+            "change_seq": change_seq,
+        }
+    return {
+        "type": f"task.{kind}",
+        "owner_id": task.owner_id,
+        "task_id": task.id,
+        "change_seq": task.change_seq,
+        "task": TaskResponse.model_validate(task).model_dump(mode="json"),
+    }
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_task_events(session: Session) -> None:
+    """Publish the task changes recorded during the committed transaction."""
+    changes = session.info.pop("task_changes", None)
+    if not changes:
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return  # synchronous use (migrations, scripts): nobody to notify
+    for kind, task in changes:
+        try:
+            message = task_event(kind, task)
+        except Exception:
+            logger.exception("Could not build %s event", kind)
+            continue
+        event_hub.publish(message)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_task_events(session: Session) -> None:
+    session.info.pop("task_changes", None)
+
+
+def format_sse(event_name: Optional[str], data: Any, event_id: Optional[int] = None) -> str:
+    """Encode one Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event_name:
+        lines.append(f"event: {event_name}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(
+    hub: EventHub,
+    user_id: int,
+    last_event_id: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Subscribe to a user's events and render them as a Server-Sent Events stream.
+
+    Event ids are change sequence numbers, so a reconnecting client (which
+    sends ``Last-Event-ID``) and a dropped one are both told where to resume
+    with ``GET /tasks/changes?since=``. Subscribing inside the generator ties
+    the subscription's lifetime to the stream's.
+
+    Args:
+        hub: Hub to subscribe to
+        user_id: User whose events are streamed
+        last_event_id: Last event the client saw on a previous connection
+
+    Yields:
+        str: Encoded SSE messages
+    """
+    last_seq = last_event_id or 0
+    subscription = hub.subscribe(user_id)
+    if subscription is None:
+        yield format_sse("resync", {"since": last_seq})
+        return
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if last_event_id is not None:
+            yield format_sse("resync", {"since": last_seq})
+        while True:
+            message = await subscription.queue.get()
+            if message is HEARTBEAT:
+                yield ": heartbeat\n\n"
+                continue
+            if message is RESYNC:
+                yield format_sse("resync", {"since": last_seq})
+                return
+            last_seq = message.get("change_seq") or last_seq
+            payload = {key: value for key, value in message.items() if key != "type"}
+            yield format_sse(message["type"], payload, message.get("change_seq"))
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,116 @@
+"""Sparse fieldsets: load and serialize only the task fields a client asks for."""
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models import Task
+from app.schemas import PaginatedResponse, TaskBatch, TaskPage, TaskResponse
+
+# Selectable fields, in response order
+TASK_FIELDS: Tuple[str, ...] = tuple(TaskResponse.model_fields)
+
+
+class UnknownFields(ValueError):
+    """Raised when ``fields`` names something a task response does not have."""
+
+    def __init__(self, names: Sequence[str]):
+        super().__init__(", ".join(names))
+        self.names = list(names)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated ``fields`` parameter.
+
+    Args:
+        fields: Raw parameter, e.g. ``id,title,status``
+
+    Returns:
+        Optional[Tuple[str, ...]]: Requested fields in response order, or None
+        for the full response
+
+    Raises:
+        UnknownFields: If a name is not a task response field
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        return None
+    unknown = requested.difference(TASK_FIELDS)
+    if unknown:
+        raise UnknownFields(sorted(unknown))
+    return tuple(name for name in TASK_FIELDS if name in requested)
+
+
+def task_load_options(fields: Sequence[str], entity=Task) -> LoaderOption:
+    """Load only these columns of ``entity`` (and the primary key); the rest stay deferred."""
+    return load_only(*(getattr(entity, name) for name in fields))
+
+
+@lru_cache(maxsize=None)
+def sparse_task_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Response model with only the given ``TaskResponse`` fields.
+
+    Models are built once per fieldset; ``parse_fields`` returns fields in a
+    fixed order so equal fieldsets share a model.
+    """
+    return create_model(
+        "TaskFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (TaskResponse.model_fields[name].annotation, TaskResponse.model_fields[name])
+           for name in fields},
+    )
+
+
+@lru_cache(maxsize=None)
+def sparse_task_page_model(fields: Tuple[str, ...]) -> Type[PaginatedResponse]:
+    """Paginated envelope whose items have only the given fields."""
+    return create_model(
+        "TaskFieldsPage",
+        __base__=PaginatedResponse,
+        items=(List[sparse_task_model(fields)], ...),
+    )
+
+
+@lru_cache(maxsize=None)
+def sparse_task_batch_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Batch result whose items have only the given fields."""
+    return create_model(
+        "TaskFieldsBatch",
+        __base__=TaskBatch,
+        items=(List[sparse_task_model(fields)], ...),
+    )
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(fields: Optional[Tuple[str, ...]]) -> TypeAdapter:
+    return TypeAdapter(List[TaskResponse if fields is None else sparse_task_model(fields)])
+
+
+def render_task(task: Task, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialize one task to JSON, with only the given fields if any."""
+    model = TaskResponse if fields is None else sparse_task_model(fields)
+    return model.model_validate(task).model_dump_json().encode()
+
+
+def render_tasks(tasks: Sequence[Task], fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialize tasks to a JSON array, with only the given fields if any."""
+    adapter = _list_adapter(fields)
+    return adapter.dump_json(adapter.validate_python(tasks, from_attributes=True))
+
+
+def render_page(page: dict, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialize a ``paginate`` result, its items with only the given fields if any."""
+    model = TaskPage if fields is None else sparse_task_page_model(fields)
+    return model.model_validate(page, from_attributes=True).model_dump_json().encode()
+
+
+def render_batch(batch: dict, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialize a batch fetch result, its items with only the given fields if any."""
+    model = TaskBatch if fields is None else sparse_task_batch_model(fields)
+    return model.model_validate(batch, from_attributes=True).model_dump_json().encode()
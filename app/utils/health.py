@@ -0,0 +1,198 @@
+"""Liveness and readiness state kept fresh by a background monitor.
+
+Probes only read what the monitor last measured, so answering one never
+touches the database and takes microseconds. The monitor samples event
+loop lag and connection pool saturation every ``sample_interval`` seconds
+and pings the database every ``ping_interval`` seconds. A worker is ready
+when the last ping succeeded recently and the lag and saturation averaged
+over one ping interval stay below their thresholds.
+
+A ping waits for a pooled connection like any request, so an exhausted
+pool makes it time out and the worker reports not ready.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Any, Deque, Dict, List, Mapping, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+def pool_saturation(engine: AsyncEngine) -> Optional[float]:
+    """
+    Share of an engine's connections currently checked out.
+
+    Returns:
+        Optional[float]: 0.0 to 1.0, or None for pools without a fixed size
+    """
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return None
+    overflow = getattr(pool, "_max_overflow", 0)
+    if overflow < 0:
+        return None  # unlimited overflow never saturates
+    capacity = pool.size() + overflow
+    return min(pool.checkedout() / capacity, 1.0) if capacity else None
+
+
+class HealthMonitor:
+    """
+    Background measurements behind ``/health/ready``.
+
+    Args:
+        engines: Engines to watch by name; the first one is pinged, None entries are skipped
+        sample_interval: Seconds between lag and pool samples
+        ping_interval: Seconds between database pings
+        ping_timeout: Seconds a ping may take before it counts as failed
+        max_pool_saturation: Not ready at or above this average pool saturation
+        max_loop_lag_ms: Not ready at or above this average event loop lag
+    """
+
+    def __init__(
+        self,
+        engines: Mapping[str, Optional[AsyncEngine]],
+        sample_interval: float = 0.5,
+        ping_interval: float = 5.0,
+        ping_timeout: float = 2.0,
+        max_pool_saturation: float = 1.0,
+        max_loop_lag_ms: float = 250.0,
+    ):
+        self.engines = {name: engine for name, engine in engines.items() if engine is not None}
+        self.sample_interval = sample_interval
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.max_pool_saturation = max_pool_saturation
+        self.max_loop_lag_ms = max_loop_lag_ms
+        window = max(1, round(ping_interval / sample_interval))
+        self.lag_samples: Deque[float] = deque(maxlen=window)
+        self.pool_samples: Dict[str, Deque[float]] = {
+            name: deque(maxlen=window) for name in self.engines
+        }
+        self.last_ping_ok: Optional[float] = None
+        self.last_ping_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._ping: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start monitoring in the background; later calls do nothing."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def close(self) -> None:
+        """Stop monitoring; the worker reports not ready from then on."""
+        for task in (self._runner, self._ping):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._runner = self._ping = None
+        self.last_ping_ok = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_ping = loop.time()
+        while True:
+            if loop.time() >= next_ping and (self._ping is None or self._ping.done()):
+                self._ping = asyncio.create_task(self.ping(), name="health-ping")
+                next_ping = loop.time() + self.ping_interval
+            expected = loop.time() + self.sample_interval
+            await asyncio.sleep(self.sample_interval)
+            self.sample(max(loop.time() - expected, 0.0))
+
+    def sample(self, lag: float) -> None:
+        """
+        Record one event loop lag measurement and the current pool saturation.
+
+        Args:
+            lag: Seconds the monitor's last sleep overran
+        """
+        self.lag_samples.append(lag * 1000)
+        for name, engine in self.engines.items():
+            saturation = pool_saturation(engine)
+            if saturation is not None:
+                self.pool_samples[name].append(saturation)
+
+    async def ping(self) -> bool:
+        """
+        Run ``SELECT 1`` on the primary engine and record the outcome.
+
+        Returns:
+            bool: Whether the ping succeeded within the timeout
+        """
+        engine = next(iter(self.engines.values()))
+
+        async def select_one() -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(select_one(), self.ping_timeout)
+        except Exception as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            logger.warning("Database health ping failed: %s", self.last_error)
+            return False
+        self.last_ping_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.last_ping_ok = time.monotonic()
+        self.last_error = None
+        return True
+
+    @property
+    def database_ok(self) -> bool:
+        """Whether the last ping succeeded and is recent enough to trust."""
+        if self.last_ping_ok is None or self.last_error is not None:
+            return False
+        stale_after = 2 * self.ping_interval + self.ping_timeout
+        return time.monotonic() - self.last_ping_ok < stale_after
+
+    def loop_lag_ms(self) -> float:
+        """Average event loop lag over the last ping interval."""
+        samples = self.lag_samples
+        return round(sum(samples) / len(samples), 3) if samples else 0.0
+
+    def saturation(self) -> Dict[str, float]:
+        """Average pool saturation per engine over the last ping interval."""
+        return {
+            name: round(sum(samples) / len(samples), 3)
+            for name, samples in self.pool_samples.items()
+            if samples
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        The readiness verdict and the figures behind it.
+
+        Returns:
+            Dict[str, Any]: ``ready``, the failed checks in ``reasons``, and the measurements
+        """
+        reasons: List[str] = []
+        if self._runner is None:
+            reasons.append("monitor not running")
+        if self.last_error is not None:
+            reasons.append("database unavailable")
+        elif not self.database_ok:
+            reasons.append("database not checked recently")
+        lag = self.loop_lag_ms()
+        if lag >= self.max_loop_lag_ms:
+            reasons.append("event loop lagging")
+        saturation = self.saturation()
+        for name, value in saturation.items():
+            if value >= self.max_pool_saturation:
+                reasons.append(f"{name} pool saturated")
+        return {
+            "ready": not reasons,
+            "reasons": reasons,
+            "database": {
+                "ok": self.database_ok,
+                "ping_ms": self.last_ping_ms,
+                "error": self.last_error,
+            },
+            "loop_lag_ms": lag,
+            "pool_saturation": saturation,
+        }
@@ -0,0 +1,130 @@
+"""Database leases electing one worker to run a singleton background job."""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import JobLease
+
+lease_table = JobLease.__table__
+
+
+class Lease:
+    """
+    Time-limited claim on a ``job_leases`` row.
+
+    Whoever holds an unexpired lease runs the job; the holder renews it
+    well before it expires, and if the holder dies another worker takes
+    over once ``ttl`` has passed. Claims are conditional updates, so two
+    workers never both succeed. A checkpoint stored with the lease lets the
+    next holder resume where the last one stopped.
+
+    Args:
+        session_factory: Sessions on the database holding the lease
+        name: Job name
+        ttl: Seconds a claim lasts without renewal
+        holder: This worker's identity (default: host, pid and a random suffix)
+        clock: Current UTC time, injectable for tests
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        name: str,
+        ttl: float = 30.0,
+        holder: Optional[str] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.session_factory = session_factory
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.clock = clock
+        self.expires_at: Optional[datetime] = None
+        self.checkpoint: Optional[datetime] = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this worker's claim is still unexpired by its own clock."""
+        return self.expires_at is not None and self.clock() < self.expires_at
+
+    def renew_due(self) -> bool:
+        """Whether the claim is missing or past half its lifetime."""
+        if self.expires_at is None:
+            return True
+        return self.clock() >= self.expires_at - timedelta(seconds=self.ttl / 2)
+
+    async def acquire(self, checkpoint: Optional[datetime] = None) -> bool:
+        """
+        Claim or renew the lease.
+
+        Args:
+            checkpoint: Progress to store, kept only if this worker already held the lease
+
+        Returns:
+            bool: Whether this worker holds the lease; on a takeover
+            ``checkpoint`` is loaded from the previous holder
+        """
+        now = self.clock()
+        expires_at = now + timedelta(seconds=self.ttl)
+        async with self.session_factory() as session:
+            if self.expires_at is None:
+                await self._ensure_row(session)
+            values = {"holder": self.holder, "expires_at": expires_at}
+            if checkpoint is not None:
+                # A stale holder coming back must not rewind its successor's progress
+                values["checkpoint"] = case(
+                    (lease_table.c.holder == self.holder, checkpoint),
+                    else_=lease_table.c.checkpoint,
+                )
+            result = await session.execute(
+                update(lease_table)
+                .where(
+                    lease_table.c.name == self.name,
+                    or_(
+                        lease_table.c.holder == self.holder,
+                        lease_table.c.holder.is_(None),
+                        lease_table.c.expires_at < now,
+                    ),
+                )
+                .values(**values)
+            )
+            stored = (await session.execute(
+                select(lease_table.c.checkpoint).where(lease_table.c.name == self.name)
+            )).scalar()
+            await session.commit()
+        if result.rowcount != 1:
+            self.expires_at = None
+            return False
+        self.expires_at = expires_at
+        self.checkpoint = stored
+        return True
+
+    async def _ensure_row(self, session: AsyncSession) -> None:
+        exists = (await session.execute(
+            select(lease_table.c.name).where(lease_table.c.name == self.name)
+        )).first()
+        if exists is None:
+            try:
+                async with session.begin_nested():
+                    await session.execute(lease_table.insert().values(name=self.name))
+            except IntegrityError:
+                pass  # another worker created it first
+
+    async def release(self) -> None:
+        """Give the lease up so another worker can take over at once."""
+        if self.expires_at is None:
+            return
+        self.expires_at = None
+        async with self.session_factory() as session:
+            await session.execute(
+                update(lease_table)
+                .where(lease_table.c.name == self.name, lease_table.c.holder == self.holder)
+                .values(holder=None, expires_at=None)
+            )
+            await session.commit()
@@ -0,0 +1,67 @@
+"""Paginated envelopes whose total comes with the page in one query."""
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _count(query: Select, cap: Optional[int] = None) -> Select:
+    """Count the query's rows, stopping after ``cap`` if given."""
+    rows = query.with_only_columns(literal_column("1"), maintain_column_froms=True)
+    return select(func.count()).select_from(rows.order_by(None).limit(cap).subquery())
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    skip: int,
+    limit: int,
+    estimate_cap: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch one page of an ORM query together with its total.
+
+    ``has_more`` comes from fetching one row past the page. The total rides
+    along on every row as an uncorrelated count subquery, evaluated once
+    and answered from the filter's index. (A ``count(*) OVER ()`` window
+    would make the database materialize every matching row before the
+    limit.) With ``estimate_cap`` the count stops after that many rows,
+    which bounds its cost for very large accounts. Only a page past the
+    end, which has no rows to carry the total, needs a separate count.
+
+    Args:
+        db: Database session
+        query: Filtered, ordered query selecting one entity, without offset or limit
+        skip: Rows to skip
+        limit: Page size
+        estimate_cap: Count at most this many rows; the total is then a lower bound
+
+    Returns:
+        Dict[str, Any]: ``items``, ``total``, ``skip``, ``limit``, ``has_more``
+        and ``estimated``, ready for ``PaginatedResponse``
+    """
+    count = _count(query, estimate_cap)
+    rows = (await db.execute(
+        query.add_columns(count.scalar_subquery().label("total")).offset(skip).limit(limit + 1)
+    )).all()
+    items = [row[0] for row in rows[:limit]]
+    has_more = len(rows) > limit
+    if rows:
+        total = rows[0].total
+    elif skip:
+        total = (await db.execute(count)).scalar_one()
+    else:
+        total = 0
+
+    estimated = estimate_cap is not None and total >= estimate_cap
+    if estimated:
+        # A capped count can fall short of the rows already paged through
+        total = max(total, skip + len(items) + has_more)
+    return {
+        "items": items,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "has_more": has_more,
+        "estimated": estimated,
+    }
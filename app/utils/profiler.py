@@ -0,0 +1,76 @@
+"""Lightweight statistical profiler producing flamegraph-ready folded stacks."""
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+
+class StackSampler:
+    """
+    Sample the call stack of one thread from a background thread.
+
+    The output is in the "folded" format understood by flamegraph.pl,
+    speedscope and inferno: one ``frame;frame;frame count`` line per stack.
+
+    Args:
+        interval: Seconds between samples
+        thread_id: Thread to sample (defaults to the thread calling ``start``)
+    """
+
+    def __init__(self, interval: float = 0.001, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+    def _sample(self) -> None:
+        """Record the target thread's current stack, outermost frame first."""
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(self._frame_label(frame))
+            frame = frame.f_back
+        if stack:
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        """Start sampling in a daemon thread."""
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StackSampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def total(self) -> int:
+        """Number of samples taken."""
+        return sum(self.samples.values())
+
+    def folded(self) -> str:
+        """Samples in folded-stack format, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
@@ -0,0 +1,228 @@
+"""Bulk user provisioning with parallel password hashing."""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import ShardRouter
+from app.models import User
+from app.schemas import BulkUserFailure, BulkUserResult, UserCreate
+from app.utils.auth import get_password_hash
+
+# Process pool shared by all bulk runs; bcrypt is CPU bound and holds the GIL
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """
+    Get the process pool used for password hashing, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor: Pool sized by ``PASSWORD_HASH_WORKERS`` (all CPUs when 0)
+    """
+    global _hash_pool
+    if _hash_pool is None:
+        workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+        # Spawn rather than fork: the parent holds event loop and driver threads
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """Shut down the password hashing pool if it was started."""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True, cancel_futures=True)
+        _hash_pool = None
+
+
+async def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    """
+    Hash passwords across the process pool without blocking the event loop.
+
+    Args:
+        passwords: Plain text passwords
+
+    Returns:
+        List[str]: Hashed passwords in input order
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_hash_pool()
+    return list(await asyncio.gather(
+        *(loop.run_in_executor(pool, get_password_hash, password) for password in passwords)
+    ))
+
+
+def _row_username(row: Any) -> Optional[str]:
+    """Best-effort username of a raw row for failure reports."""
+    if isinstance(row, dict) and isinstance(row.get("username"), str):
+        return row["username"]
+    return None
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    """Flatten a pydantic validation error into a single message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+async def _place_users(db: AsyncSession, shards: ShardRouter, usernames: List[str]) -> None:
+    """Pin just inserted users to their hash ring shard, as registration does."""
+    ids = (await db.execute(
+        select(User.id).where(User.username.in_(usernames))
+    )).scalars().all()
+    await db.execute(
+        update(User), [{"id": user_id, "shard": shards.place(user_id)} for user_id in ids]
+    )
+
+
+async def provision_users(
+    db: AsyncSession,
+    rows: Sequence[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    shards: Optional[ShardRouter] = None,
+) -> BulkUserResult:
+    """
+    Validate, hash and insert a batch of users.
+
+    Collisions with existing accounts are found with one ``IN`` query per
+    unique field, passwords are hashed in parallel across processes and rows
+    are inserted in batches. Rows that fail at any stage are reported with
+    their index instead of failing the whole run.
+
+    Args:
+        db: Database session
+        rows: Raw user rows matching ``UserCreate``
+        batch_size: Rows per insert batch (defaults to ``BULK_PROVISION_BATCH_SIZE``)
+        shards: Task shard router, placing each new user when sharding is enabled
+
+    Returns:
+        BulkUserResult: Counts, per-row failures and throughput
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or settings.BULK_PROVISION_BATCH_SIZE
+    failures: List[BulkUserFailure] = []
+    candidates: List[tuple] = []
+    seen_usernames: set = set()
+    seen_emails: set = set()
+
+    # Validate rows and reject duplicates within the batch
+    for index, row in enumerate(rows):
+        try:
+            user = UserCreate.model_validate(row)
+        except ValidationError as exc:
+            failures.append(BulkUserFailure(
+                index=index, username=_row_username(row), detail=_validation_detail(exc)
+            ))
+            continue
+
+        if user.username in seen_usernames:
+            failures.append(BulkUserFailure(
+                index=index, username=user.username, detail="Duplicate username in batch"
+            ))
+            continue
+        if user.email in seen_emails:
+            failures.append(BulkUserFailure(
+                index=index, username=user.username, detail="Duplicate email in batch"
+            ))
+            continue
+
+        seen_usernames.add(user.username)
+        seen_emails.add(user.email)
+        candidates.append((index, user))
+
+    # Check collisions with existing users, one IN query per field
+    taken_usernames: set = set()
+    taken_emails: set = set()
+    if candidates:
+        result = await db.execute(
+            select(User.username).where(User.username.in_([u.username for _, u in candidates]))
+        )
+        taken_usernames = set(result.scalars().all())
+        result = await db.execute(
+            select(User.email).where(User.email.in_([u.email for _, u in candidates]))
+        )
+        taken_emails = set(result.scalars().all())
+
+    available = []
+    for index, user in candidates:
+        if user.username in taken_usernames:
+            failures.append(BulkUserFailure(
+                index=index, username=user.username, detail="Username already registered"
+            ))
+        elif user.email in taken_emails:
+            failures.append(BulkUserFailure(
+                index=index, username=user.username, detail="Email already registered"
+            ))
+        else:
+            available.append((index, user))
+
+    # Hash passwords in parallel
+    hash_started = time.perf_counter()
+    hashes = await hash_passwords([user.password for _, user in available]) if available else []
+    hash_seconds = time.perf_counter() - hash_started
+
+    # Insert in batches, falling back to row-by-row when a batch races a registration
+    place = shards is not None and shards.enabled
+    created = 0
+    for start in range(0, len(available), batch_size):
+        batch = [
+            (index, {
+                "email": user.email,
+                "username": user.username,
+                "full_name": user.full_name,
+                "hashed_password": hashed,
+            })
+            for (index, user), hashed in zip(
+                available[start:start + batch_size], hashes[start:start + batch_size]
+            )
+        ]
+        try:
+            await db.execute(insert(User), [values for _, values in batch])
+            if place:
+                await _place_users(db, shards, [values["username"] for _, values in batch])
+            await db.commit()
+            created += len(batch)
+            continue
+        except IntegrityError:
+            await db.rollback()
+
+        for index, values in batch:
+            try:
+                await db.execute(insert(User), [values])
+                if place:
+                    await _place_users(db, shards, [values["username"]])
+                await db.commit()
+                created += 1
+            except IntegrityError:
+                await db.rollback()
+                failures.append(BulkUserFailure(
+                    index=index,
+                    username=values["username"],
+                    detail="Username or email already registered",
+                ))
+
+    elapsed = time.perf_counter() - started
+    failures.sort(key=lambda failure: failure.index)
+
+    return BulkUserResult(
+        created=created,
+        failed=len(failures),
+        failures=failures,
+        hash_seconds=round(hash_seconds, 4),
+        elapsed_seconds=round(elapsed, 4),
+        users_per_second=round(created / elapsed, 2) if elapsed > 0 else 0.0,
+    )
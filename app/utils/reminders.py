@@ -0,0 +1,321 @@
+"""Due-date reminders from an in-memory heap instead of polling the task table.
+
+The worker holding the ``task_reminders`` lease loads the tasks due within
+the next ``window`` with a range scan on ``ix_tasks_due_date`` into a
+min-heap, then sleeps until the earliest one. Task events keep the heap
+exact in between: a created or rescheduled task due inside the window is
+pushed, a completed, deleted or rescheduled one is dropped. The heap is
+reloaded every half window, so the scan never covers more than one window
+of tasks.
+
+Reminders are sent through a pluggable sink when ``due_date - lead`` has
+passed. The time sent through is stored with the lease, so a worker taking
+over resumes there: a reminder is sent once, or twice if a worker dies
+between sending and storing its progress. A reminder the sink fails to take
+is retried, and progress stops short of it until it goes through. Reminders more than a window
+late, e.g. after every worker was down, are skipped, and tasks given a due
+date that has already passed get no reminder.
+
+With several workers, task events must reach the lease holder, so use an
+event backend shared by all workers (``EVENTS_BACKEND=postgres``).
+"""
+import abc
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task, TaskStatus
+from app.utils.events import EventHub, Message
+from app.utils.leases import Lease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "task_reminders"
+
+
+class ReminderSink(abc.ABC):
+    """Destination of reminder messages."""
+
+    @abc.abstractmethod
+    async def send(self, reminder: Message) -> None:
+        """Deliver one reminder."""
+
+
+class LogSink(ReminderSink):
+    """Sink writing reminders to the log, e.g. for a log-based notifier."""
+
+    async def send(self, reminder: Message) -> None:
+        logger.info("Task %s due at %s", reminder["task_id"], reminder["due_date"])
+
+
+class EventSink(ReminderSink):
+    """
+    Sink publishing reminders as ``task.reminder`` events to the owner's event streams.
+
+    Args:
+        hub: Event hub to publish on
+    """
+
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+
+    async def send(self, reminder: Message) -> None:
+        self.hub.publish(reminder)
+
+
+def build_sink(name: str, hub: EventHub) -> Optional[ReminderSink]:
+    """Sink for the ``REMINDER_SINK`` setting, or None when reminders are off."""
+    if name == "log":
+        return LogSink()
+    if name == "events":
+        return EventSink(hub)
+    return None
+
+
+class ReminderScheduler:
+    """
+    Send a reminder when each task's due date approaches.
+
+    Heap entries are ``[remind_at, order, task_id, owner_id, title,
+    due_date]``; an entry superseded by a task event has its task id
+    cleared and is skipped when it reaches the top.
+
+    Args:
+        session_factories: Sessions on every database holding tasks
+        sink: Destination of reminders
+        lease: Lease electing the worker that sends reminders
+        lead: Seconds before the due date to send the reminder
+        window: Seconds of upcoming reminders kept in memory
+        retry: Seconds to wait before resending a reminder the sink failed to take
+        clock: Current UTC time, injectable for tests
+        sleep: Async sleep, injectable for tests
+    """
+
+    def __init__(
+        self,
+        session_factories: Sequence[Callable[[], AsyncSession]],
+        sink: ReminderSink,
+        lease: Lease,
+        lead: float = 0.0,
+        window: float = 300.0,
+        retry: float = 5.0,
+        clock: Callable[[], datetime] = datetime.utcnow,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.session_factories = list(session_factories)
+        self.sink = sink
+        self.lease = lease
+        self.lead = timedelta(seconds=lead)
+        self.window = timedelta(seconds=window)
+        self.retry = timedelta(seconds=retry)
+        self.clock = clock
+        self.sleep = sleep
+        self.heap: List[list] = []
+        self.entries: Dict[int, list] = {}
+        self.sent_through: Optional[datetime] = None
+        self.loaded_through: Optional[datetime] = None
+        self.reload_at: Optional[datetime] = None
+        self.retry_at: Optional[datetime] = None
+        self.sent = 0
+        self._order = itertools.count()
+        self._loading: Optional[List[Message]] = None
+        self._wake = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start scheduling in the background; later calls do nothing."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run(), name="task-reminders")
+
+    async def close(self) -> None:
+        """Stop scheduling and hand the lease to another worker."""
+        if self._runner is not None:
+            self._runner.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._runner
+            self._runner = None
+        with suppress(Exception):
+            await self.lease.release()
+        self._reset()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delay = await self.step()
+            except Exception:
+                logger.exception("Reminder scheduling failed")
+                delay = self.lease.ttl / 2
+            self._wake.clear()
+            sleeper = asyncio.ensure_future(self.sleep(delay))
+            waker = asyncio.ensure_future(self._wake.wait())
+            try:
+                await asyncio.wait({sleeper, waker}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                sleeper.cancel()
+                waker.cancel()
+
+    def _reset(self) -> None:
+        self.heap, self.entries = [], {}
+        self.sent_through = self.loaded_through = self.reload_at = self.retry_at = None
+
+    async def step(self) -> float:
+        """
+        Renew the lease, reload the window when due and send what is due.
+
+        Returns:
+            float: Seconds until the next thing to do
+        """
+        if self.lease.renew_due():
+            was_held = self.lease.held
+            if not await self.lease.acquire(self.sent_through if was_held else None):
+                self._reset()
+                return self.lease.ttl / 2
+            if not was_held:
+                # New or resumed leadership: start from the stored progress
+                self._reset()
+                now = self.clock()
+                self.sent_through = max(self.lease.checkpoint or now, now - self.window)
+
+        now = self.clock()
+        if self.reload_at is None or now >= self.reload_at:
+            await self.load(now)
+        if await self.send_due(now) and not await self.lease.acquire(self.sent_through):
+            self._reset()
+            return self.lease.ttl / 2
+
+        wake_at = [self.reload_at, self.lease.expires_at - timedelta(seconds=self.lease.ttl / 2)]
+        if self.heap:
+            wake_at.append(max(self.heap[0][0], self.retry_at or datetime.min))
+        return max((min(wake_at) - self.clock()).total_seconds(), 0.0)
+
+    def due_tasks(self, after: datetime, through: datetime) -> Select:
+        """Open tasks to remind of after ``after`` up to ``through``, as one due date range."""
+        return (
+            select(Task.id, Task.owner_id, Task.title, Task.due_date)
+            .where(
+                Task.due_date > after + self.lead,
+                Task.due_date <= through + self.lead,
+                Task.status != TaskStatus.DONE,
+            )
+            .order_by(Task.due_date)
+        )
+
+    async def load(self, now: datetime) -> int:
+        """
+        Replace the heap with the reminders due from the last one sent to ``now + window``.
+
+        Task events arriving during the scan are applied afterwards.
+
+        Returns:
+            int: Reminders loaded
+        """
+        through = now + self.window
+        self._loading = []
+        try:
+            rows = []
+            for factory in self.session_factories:
+                async with factory() as session:
+                    query = self.due_tasks(self.sent_through, through)
+                    rows += (await session.execute(query)).all()
+        finally:
+            pending, self._loading = self._loading, None
+        self.heap = [
+            [row.due_date - self.lead, next(self._order), row.id, row.owner_id, row.title,
+             row.due_date]
+            for row in rows
+        ]
+        heapq.heapify(self.heap)
+        self.entries = {entry[2]: entry for entry in self.heap}
+        self.loaded_through = through
+        self.reload_at = now + self.window / 2
+        for message in pending:
+            self.on_task_event(message)
+        return len(rows)
+
+    async def send_due(self, now: datetime) -> int:
+        """
+        Send every reminder due at or before ``now``.
+
+        Sending stops at the first reminder the sink fails to take: it stays
+        at the top of the heap to be retried, and ``sent_through`` stays just
+        before it, so a worker taking over sends it too.
+
+        Returns:
+            int: Reminders sent
+        """
+        if self.sent_through is None or (self.retry_at is not None and now < self.retry_at):
+            return 0
+        self.retry_at = None
+        sent = 0
+        through = now
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            remind_at, _, task_id, owner_id, title, due_date = entry
+            if task_id is None:
+                continue
+            del self.entries[task_id]
+            try:
+                await self.sink.send({
+                    "type": "task.reminder",
+                    "owner_id": owner_id,
+                    "task_id": task_id,
+                    "title": title,
+                    "due_date": due_date.isoformat(),
+                })
+                sent += 1
+            except Exception:
+                logger.exception("Sending reminder for task %d failed, retrying", task_id)
+                self.entries[task_id] = entry
+                heapq.heappush(self.heap, entry)
+                self.retry_at = now + self.retry
+                # Reloads only pick up reminders after sent_through
+                through = remind_at - timedelta(microseconds=1)
+                break
+        self.sent_through = max(self.sent_through, through)
+        self.sent += sent
+        return sent
+
+    def on_task_event(self, message: Message) -> None:
+        """
+        Keep the heap in step with a task change.
+
+        Registered on the event hub; ignores every other message.
+        """
+        if not message.get("type", "").startswith("task.") or "task_id" not in message:
+            return
+        if message["type"] == "task.reminder":
+            return
+        if self._loading is not None:
+            # Applied once the scan, which may predate this change, is done
+            self._loading.append(message)
+            return
+        if self.loaded_through is None:
+            return
+        entry = self.entries.pop(message["task_id"], None)
+        if entry is not None:
+            entry[2] = None
+        task = message.get("task")
+        if message["type"] == "task.deleted" or not task or not task.get("due_date"):
+            return
+        if task.get("status") == TaskStatus.DONE.value:
+            return
+        due_date = datetime.fromisoformat(task["due_date"])
+        if due_date.tzinfo is not None:
+            due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+        remind_at = due_date - self.lead
+        if not self.sent_through < remind_at <= self.loaded_through:
+            return
+        entry = [
+            remind_at, next(self._order), task["id"], task["owner_id"], task["title"], due_date
+        ]
+        self.entries[task["id"]] = entry
+        heapq.heappush(self.heap, entry)
+        if self.heap[0] is entry:
+            self._wake.set()
@@ -0,0 +1,194 @@
+"""On-demand request profiling with stack samples and the SQL each request issued.
+
+A request is profiled when it carries ``X-Profile-Token`` matching
+``PROFILING_TOKEN`` (the profile replaces the response as a download) or
+when it is picked at ``PROFILING_SAMPLE_RATE`` (the profile is written to
+``PROFILING_DIR``, keeping the newest ``PROFILING_MAX_FILES``). The
+middleware and SQL hooks are only installed when one of the two is
+configured, so a disabled profiler costs nothing.
+
+Samples are taken from the event loop thread, so requests running
+concurrently with a profiled one show up in its stacks; profile on a quiet
+worker, or read the SQL timings, when that matters.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.access_log import route_template
+from app.utils.profiler import StackSampler
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = "X-Profile-Token"
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Stack samples and SQL statements recorded for one request."""
+
+    def __init__(self, request: Request, interval: float):
+        self.method = request.method
+        self.path = request.url.path
+        self.sampler = StackSampler(interval=interval)
+        self.queries: List[Dict[str, Any]] = []
+        self.started_at = datetime.utcnow()
+        self.elapsed = 0.0
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        self.queries.append({"statement": statement, "duration_ms": round(seconds * 1000, 3)})
+
+    def to_dict(self, route: str, status_code: int) -> Dict[str, Any]:
+        """The profile as a JSON-ready document; ``folded`` feeds flamegraph tools."""
+        return {
+            "route": f"{self.method} {route}",
+            "path": self.path,
+            "status_code": status_code,
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "duration_ms": round(self.elapsed * 1000, 3),
+            "interval_ms": self.sampler.interval * 1000,
+            "samples": self.sampler.total,
+            "sql_count": len(self.queries),
+            "sql_ms": round(sum(query["duration_ms"] for query in self.queries), 3),
+            "sql": self.queries,
+            "folded": self.sampler.folded(),
+        }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("profile_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current.get()
+    if profile is not None and conn.info.get("profile_query_started"):
+        started = conn.info["profile_query_started"].pop()
+        profile.record_query(statement, time.perf_counter() - started)
+
+
+def install_sql_hooks() -> None:
+    """Time the statements of profiled requests on every engine (idempotent)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _profile_name(profile: RequestProfile, route: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    return f"{profile.started_at:%Y%m%dT%H%M%S%f}-{profile.method}-{slug}.json"
+
+
+def write_profile(directory: Path, name: str, document: Dict[str, Any], keep: int) -> Path:
+    """
+    Write a profile and delete the oldest beyond ``keep``.
+
+    Args:
+        directory: Profile directory (created if missing)
+        name: File name; names sort in creation order
+        document: Profile document
+        keep: Profiles kept
+
+    Returns:
+        Path: The written file
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    path.write_text(json.dumps(document), encoding="utf-8")
+    for stale in sorted(directory.glob("*.json"))[:-keep]:
+        stale.unlink(missing_ok=True)
+    return path
+
+
+class RequestProfiler:
+    """
+    HTTP middleware profiling requests on demand or by sampling.
+
+    Args:
+        token: Secret that enables profiling through ``X-Profile-Token`` ("" to disable)
+        sample_rate: Fraction of requests profiled into ``directory``
+        directory: Where sampled profiles are written
+        max_files: Sampled profiles kept
+        interval: Seconds between stack samples
+    """
+
+    def __init__(
+        self,
+        token: str = "",
+        sample_rate: float = 0.0,
+        directory: Path = Path("profiles"),
+        max_files: int = 100,
+        interval: float = 0.001,
+    ):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.interval = interval
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token) or self.sample_rate > 0
+
+    def _requested(self, request: Request) -> bool:
+        given = request.headers.get(TOKEN_HEADER)
+        return bool(self.token and given) and hmac.compare_digest(
+            given.encode(), self.token.encode()
+        )
+
+    async def __call__(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        download = self._requested(request)
+        if not download and not (self.sample_rate and random.random() < self.sample_rate):
+            return await call_next(request)
+
+        profile = RequestProfile(request, self.interval)
+        reset = _current.set(profile)
+        started = time.perf_counter()
+        profile.sampler.start()
+        try:
+            response = await call_next(request)
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                return response  # endless stream: nothing to profile
+            # Include the response body in the profile, then hand it on unchanged
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        finally:
+            profile.sampler.stop()
+            profile.elapsed = time.perf_counter() - started
+            _current.reset(reset)
+
+        route = route_template(request.scope) or request.url.path
+        document = profile.to_dict(route, response.status_code)
+        name = _profile_name(profile, route)
+        if download:
+            return Response(
+                json.dumps(document),
+                media_type="application/json",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{name}"',
+                    "X-Profiled-Status": str(response.status_code),
+                },
+            )
+        try:
+            await asyncio.to_thread(
+                write_profile, self.directory, name, document, self.max_files
+            )
+        except OSError:
+            logger.exception("Could not write request profile")
+        sampled = Response(body, status_code=response.status_code, background=response.background)
+        sampled.raw_headers = response.raw_headers
+        return sampled
@@ -0,0 +1,254 @@
+"""Per-user cache of serialized task read responses, invalidated by version bumps."""
+import abc
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(abc.ABC):
+    """
+    Storage for cached responses and per-user versions.
+
+    A user's entries are keyed by their current version; bumping it makes
+    every older entry unreachable, and eviction reclaims them.
+    """
+
+    # Whether the storage belongs to this process only
+    local = False
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return a live entry, or None."""
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store an entry for ``ttl`` seconds."""
+
+    @abc.abstractmethod
+    async def version(self, scope: str) -> int:
+        """Current version of a scope (0 if never bumped)."""
+
+    @abc.abstractmethod
+    async def bump(self, scope: str) -> None:
+        """Advance a scope's version, invalidating its entries."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend-specific figures for the metrics endpoint."""
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU with per-entry expiry and a memory cap.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+        max_bytes: Total size of keys and values kept before evicting
+    """
+
+    local = True
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.versions: Dict[str, int] = {}
+        self.bytes = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    async def version(self, scope: str) -> int:
+        return self.versions.get(scope, 0)
+
+    async def bump(self, scope: str) -> None:
+        self.versions[scope] = self.versions.get(scope, 0) + 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self.entries.pop(key)
+        self.bytes -= len(key) + len(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self.entries), "bytes": self.bytes, "evictions": self.evictions}
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend shared by all workers on a Redis-protocol server.
+
+    Expiry uses Redis TTLs; configure the server with an LRU
+    ``maxmemory-policy`` to bound memory.
+
+    Args:
+        url: Server URL, used when no client is given
+        client: Async client with ``get``, ``set(..., px=)`` and ``incr``
+        prefix: Key namespace
+    """
+
+    def __init__(self, url: str = "", client: Any = None, prefix: str = "taskcache:"):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def version(self, scope: str) -> int:
+        value = await self.client.get(f"{self.prefix}version:{scope}")
+        return int(value) if value is not None else 0
+
+    async def bump(self, scope: str) -> None:
+        await self.client.incr(f"{self.prefix}version:{scope}")
+
+
+class ResponseCache:
+    """
+    Cache serialized responses per user, route and query parameters.
+
+    Keys embed the user's version, read before the database is queried, and
+    writers bump the version after committing. A response built from data
+    older than a write is therefore stored under a version nobody reads any
+    more. Backend failures count as misses so the cache never fails a request.
+
+    Args:
+        backend: Storage, or None to disable caching
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def key(self, user_id: int, request: Request) -> Optional[str]:
+        """Cache key for a read request, or None when caching is off or unavailable."""
+        if self.backend is None:
+            return None
+        try:
+            version = await self.backend.version(str(user_id))
+        except Exception:
+            logger.exception("Response cache unavailable")
+            return None
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{user_id}:{version}:{request.url.path}?{query}"
+
+    async def get(self, key: Optional[str]) -> Optional[bytes]:
+        """Cached body for a key from ``key``, counting the hit or miss."""
+        if key is None:
+            return None
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            logger.exception("Response cache read failed")
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_served += len(value)
+        return value
+
+    async def set(self, key: Optional[str], body: bytes) -> None:
+        """Store a response body under a key from ``key``."""
+        if key is None:
+            return
+        try:
+            await self.backend.set(key, body, self.ttl)
+        except Exception:
+            logger.exception("Response cache write failed")
+
+    async def invalidate(self, user_id: int) -> None:
+        """Drop a user's cached responses; call after committing a write."""
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.bump(str(user_id))
+        except Exception:
+            logger.exception("Response cache invalidation failed")
+
+    def on_task_event(self, message: Dict[str, Any]) -> None:
+        """
+        Invalidate from a task event.
+
+        Registered on the event hub for in-process backends, so writes made
+        by other workers (with a shared event backend) reach this cache too.
+        """
+        owner_id = message.get("owner_id")
+        if owner_id is not None and message.get("type") != "task.reminder":
+            asyncio.get_running_loop().create_task(self.invalidate(owner_id))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, bytes and backend figures."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bytes_served": self.bytes_served,
+            "invalidations": self.invalidations,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+
+def build_backend(name: str) -> Optional[CacheBackend]:
+    """Backend for the ``RESPONSE_CACHE_BACKEND`` setting."""
+    if name == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES)
+    if name == "redis":
+        return RedisBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(
+    build_backend(settings.RESPONSE_CACHE_BACKEND), ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+def get_response_cache() -> ResponseCache:
+    """Dependency returning the response cache (overridable in tests)."""
+    return response_cache
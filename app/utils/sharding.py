@@ -0,0 +1,351 @@
+"""Task shard sessions, shard schema and moving users between shards.
+
+Users, authentication and everything else stay in the main database; only
+``tasks``, ``archived_tasks``, ``task_tombstones`` and ``change_sequence``
+live on the shards (see ``ShardRouter``). Shard tables have no foreign key to ``users``, which
+lives elsewhere.
+
+Moving a user copies their tasks and tombstones in change sequence order,
+repeats until the copy has caught up, points the user at the new shard,
+waits ``grace`` seconds for requests already routed to the old shard, copies
+what they wrote and archived tasks, and only then deletes the old rows.
+Copies get fresh change sequence numbers above every number the old shard
+handed out, so sync clients see the moved tasks as changes instead of
+missing them.
+"""
+import asyncio
+import logging
+from typing import AsyncGenerator, Callable, List, Tuple
+
+from fastapi import Depends
+from sqlalchemy import (
+    BigInteger,
+    Connection,
+    case,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.database import (
+    ShardRouter,
+    get_db,
+    get_read_db,
+    get_shard_router,
+    session_scope,
+)
+from app.models import (
+    ArchivedTask,
+    ChangeSequence,
+    Task,
+    TaskTombstone,
+    User,
+    allocate_change_seqs,
+)
+from app.utils.auth import get_current_active_user
+
+logger = logging.getLogger(__name__)
+
+tasks_table = Task.__table__
+archive_table = ArchivedTask.__table__
+tombstones_table = TaskTombstone.__table__
+sequence_table = ChangeSequence.__table__
+
+SHARD_TABLES = (tasks_table, archive_table, tombstones_table, sequence_table)
+# Columns holding task ids, which need 64 bits past shard 0
+TASK_ID_COLUMNS = ((tasks_table, "id"), (archive_table, "id"), (tombstones_table, "task_id"))
+
+
+async def get_task_db(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    shards: ShardRouter = Depends(get_shard_router),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for the session holding the current user's tasks.
+
+    Without shards this is the request's own session.
+
+    Args:
+        current_user: Current authenticated user
+        db: The request's session
+        shards: Task shard router
+
+    Yields:
+        AsyncSession: Session on the user's task shard
+    """
+    if not shards.enabled:
+        yield db
+        return
+    async with session_scope(shards.session_factory(shards.shard_for(current_user))) as session:
+        yield session
+
+
+async def get_task_read_db(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    shards: ShardRouter = Depends(get_shard_router),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for a read-only session holding the current user's tasks.
+
+    Args:
+        current_user: Current authenticated user
+        db: The request's read-only session
+        shards: Task shard router
+
+    Yields:
+        AsyncSession: Read-only session on the user's task shard
+    """
+    if not shards.enabled:
+        yield db
+        return
+    factory = shards.session_factory(shards.shard_for(current_user), read_only=True)
+    async with session_scope(factory, read_only=True) as session:
+        yield session
+
+
+def _create_shard_tables(connection: Connection, shard: int) -> None:
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    for table in SHARD_TABLES:
+        if table.name not in existing:
+            connection.execute(CreateTable(table, include_foreign_key_constraints=[]))
+            for index in table.indexes:
+                connection.execute(CreateIndex(index))
+    if connection.dialect.name == "postgresql":
+        # Shard tables created while task ids were 32-bit cannot hold the shard's range
+        for table, name in TASK_ID_COLUMNS:
+            if table.name not in existing:
+                continue
+            types = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+            if not isinstance(types[name], BigInteger):
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {name} TYPE BIGINT"
+                ))
+    if connection.execute(select(sequence_table.c.id)).first() is None:
+        connection.execute(insert(sequence_table).values(id=1, value=0, compacted_through=0))
+
+    # Seed the task id counter above the ids already in the shard's range
+    low, high = shard * ShardRouter.ID_RANGE, (shard + 1) * ShardRouter.ID_RANGE
+    highest = connection.execute(
+        select(func.max(tasks_table.c.id)).where(tasks_table.c.id >= low, tasks_table.c.id < high)
+    ).scalar()
+    connection.execute(
+        update(sequence_table)
+        .where(sequence_table.c.id == 1, sequence_table.c.next_task_id.is_(None))
+        .values(next_task_id=max(highest or low, low) + 1)
+    )
+
+
+async def create_shard_schema(shards: ShardRouter) -> None:
+    """
+    Create the task tables on every shard that lacks them and seed its id counter.
+
+    Args:
+        shards: Task shard router
+    """
+    for shard, (writer, _) in enumerate(shards.engines):
+        async with writer.begin() as conn:
+            await conn.run_sync(_create_shard_tables, shard)
+
+
+async def _copy_changes(
+    source: Callable[[], AsyncSession],
+    target: Callable[[], AsyncSession],
+    user_id: int,
+    since: int,
+    batch_size: int,
+) -> Tuple[int, int]:
+    """
+    Copy a user's task changes after ``since`` from one shard to another.
+
+    Returns:
+        Tuple[int, int]: Source change sequence copied through, and tasks copied
+    """
+    copied = 0
+    while True:
+        async with source() as session:
+            rows = (await session.execute(
+                select(tasks_table)
+                .where(tasks_table.c.owner_id == user_id, tasks_table.c.change_seq > since)
+                .order_by(tasks_table.c.change_seq)
+                .limit(batch_size)
+            )).mappings().all()
+            tombstones = (await session.execute(
+                select(tombstones_table)
+                .where(
+                    tombstones_table.c.owner_id == user_id,
+                    tombstones_table.c.change_seq > since,
+                )
+                .order_by(tombstones_table.c.change_seq)
+                .limit(batch_size)
+            )).mappings().all()
+            source_seq = (await session.execute(select(sequence_table.c.value))).scalar()
+
+        # Apply in change order, up to the first batch's end on either side
+        changes = sorted([*rows, *tombstones], key=lambda row: row["change_seq"])[:batch_size]
+        if not changes:
+            return since, copied
+        through = changes[-1]["change_seq"]
+
+        async with target() as session:
+            await session.execute(
+                update(sequence_table)
+                .where(sequence_table.c.id == 1)
+                .values(value=case(
+                    (sequence_table.c.value < source_seq, source_seq),
+                    else_=sequence_table.c.value,
+                ))
+            )
+            seq = await session.run_sync(allocate_change_seqs, len(changes))
+            task_ids = [row.get("task_id", row["id"]) for row in changes]
+            await session.execute(delete(tasks_table).where(tasks_table.c.id.in_(task_ids)))
+            tasks, deleted = [], []
+            for offset, row in enumerate(changes):
+                values = {**row, "change_seq": seq + offset}
+                if "task_id" in row:
+                    del values["id"]
+                    deleted.append(values)
+                else:
+                    tasks.append(values)
+            if tasks:
+                await session.execute(insert(tasks_table), tasks)
+            if deleted:
+                await session.execute(insert(tombstones_table), deleted)
+            await session.commit()
+        since = through
+        copied += len(tasks)
+
+
+async def _copy_archive(
+    source: Callable[[], AsyncSession],
+    target: Callable[[], AsyncSession],
+    user_id: int,
+    batch_size: int,
+) -> None:
+    """Copy a user's archived tasks, replacing any hot or archived copy on the target."""
+    after = 0
+    while True:
+        async with source() as session:
+            rows = (await session.execute(
+                select(archive_table)
+                .where(archive_table.c.owner_id == user_id, archive_table.c.id > after)
+                .order_by(archive_table.c.id)
+                .limit(batch_size)
+            )).mappings().all()
+        if not rows:
+            return
+        ids = [row["id"] for row in rows]
+        async with target() as session:
+            await session.execute(delete(tasks_table).where(tasks_table.c.id.in_(ids)))
+            await session.execute(delete(archive_table).where(archive_table.c.id.in_(ids)))
+            await session.execute(insert(archive_table), [dict(row) for row in rows])
+            await session.commit()
+        after = ids[-1]
+
+
+async def _delete_user_rows(
+    factory: Callable[[], AsyncSession], user_id: int, batch_size: int
+) -> None:
+    """Delete a user's tasks and archived tasks in batches, then their tombstones."""
+    for table in (tasks_table, archive_table):
+        while True:
+            async with factory() as session:
+                batch = (
+                    select(table.c.id)
+                    .where(table.c.owner_id == user_id)
+                    .limit(batch_size)
+                    .scalar_subquery()
+                )
+                result = await session.execute(delete(table).where(table.c.id.in_(batch)))
+                await session.commit()
+            if result.rowcount < batch_size:
+                break
+    async with factory() as session:
+        await session.execute(
+            delete(tombstones_table).where(tombstones_table.c.owner_id == user_id)
+        )
+        await session.commit()
+
+
+async def move_user(
+    shards: ShardRouter,
+    directory: Callable[[], AsyncSession],
+    user_id: int,
+    target: int,
+    batch_size: int = 500,
+    grace: float = 0.0,
+) -> int:
+    """
+    Move a user's tasks, archived tasks and tombstones to another shard.
+
+    Tasks keep their ids. Writes that reach the old shard after the final
+    copy are lost, so ``grace`` should exceed the longest request.
+
+    Args:
+        shards: Task shard router
+        directory: Session factory of the main database
+        user_id: User to move
+        target: Destination shard
+        batch_size: Rows copied or deleted per transaction
+        grace: Seconds to wait after switching for requests routed to the old shard
+
+    Returns:
+        int: Tasks the user has on the target shard (0 if already there)
+
+    Raises:
+        ValueError: If the user or the shard does not exist
+    """
+    if not 0 <= target < len(shards.engines):
+        raise ValueError(f"No shard {target}")
+    async with directory() as session:
+        user = await session.get(User, user_id)
+        if user is None:
+            raise ValueError(f"No user {user_id}")
+        source = shards.shard_for(user)
+    if source == target:
+        return 0
+
+    source_factory, target_factory = shards.session_factory(source), shards.session_factory(target)
+    since, _ = await _copy_changes(source_factory, target_factory, user_id, 0, batch_size)
+    async with directory() as session:
+        await session.execute(update(User.__table__).where(User.id == user_id).values(shard=target))
+        await session.commit()
+    if grace:
+        await asyncio.sleep(grace)
+    await _copy_changes(source_factory, target_factory, user_id, since, batch_size)
+    await _copy_archive(source_factory, target_factory, user_id, batch_size)
+    await _delete_user_rows(source_factory, user_id, batch_size)
+
+    async with target_factory() as session:
+        moved = (await session.execute(
+            select(func.count()).where(tasks_table.c.owner_id == user_id)
+        )).scalar()
+    logger.info("Moved user %d from shard %d to %d (%d tasks)", user_id, source, target, moved)
+    return moved
+
+
+async def plan_rebalance(
+    shards: ShardRouter, directory: Callable[[], AsyncSession]
+) -> List[Tuple[int, int, int]]:
+    """
+    Users whose shard differs from their place on the hash ring.
+
+    Returns:
+        List[Tuple[int, int, int]]: ``(user_id, current shard, ring shard)`` per user to move
+    """
+    async with directory() as session:
+        users = (await session.execute(select(User.id, User.shard).order_by(User.id))).all()
+    moves = []
+    for user in users:
+        current, placed = shards.shard_for(user), shards.place(user.id)
+        if current != placed:
+            moves.append((user.id, current, placed))
+    return moves
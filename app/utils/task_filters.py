@@ -0,0 +1,126 @@
+"""Filters and sort keys for the task list, each backed by an index on ``tasks``."""
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Select, and_, or_
+
+from app.models import PRIORITY_RANKS, Task, TaskPriority, TaskStatus
+
+# Sort keys accepted by ``sort`` (a leading ``-`` sorts descending) and the
+# columns they order by, matching the column order of their index
+SORT_COLUMNS = {
+    "created_at": (Task.created_at,),
+    "updated_at": (Task.updated_at,),
+    "due_date": (Task.due_date,),
+    "priority": (Task.priority_rank, Task.created_at),
+}
+SORT_PATTERN = "^-?(" + "|".join(SORT_COLUMNS) + ")$"
+DEFAULT_SORT = "-created_at"
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert to the naive UTC timestamps tasks are stored with."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string above every string starting with ``prefix``."""
+    while prefix and ord(prefix[-1]) == sys.maxunicode:
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        following = 0xE000  # surrogates cannot be encoded
+    return prefix[:-1] + chr(following)
+
+
+def filter_tasks(
+    query: Select,
+    *,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    overdue: Optional[bool] = None,
+    completed_since: Optional[datetime] = None,
+    title_prefix: Optional[str] = None,
+    now: Optional[datetime] = None,
+    entity=Task,
+) -> Select:
+    """
+    Apply task list filters to a query.
+
+    Every condition is a plain comparison or range on an indexed column, so
+    the database can seek instead of scanning: the title prefix is a range on
+    ``title_lower`` rather than ``LIKE``, and priority compares the rank.
+
+    Args:
+        query: Task query already restricted to one owner
+        status: Only tasks with this status
+        priority: Only tasks with this priority
+        due_after: Only tasks due at or after this time
+        due_before: Only tasks due before this time
+        overdue: Only tasks past their due date and not done (False: the others)
+        completed_since: Only tasks completed at or after this time
+        title_prefix: Only tasks whose title starts with this, ignoring case
+        now: Reference time for ``overdue`` (default: current UTC time)
+        entity: ``Task``, or the alias of it the query selects
+
+    Returns:
+        Select: The filtered query
+    """
+    due_after, due_before = _naive_utc(due_after), _naive_utc(due_before)
+    completed_since = _naive_utc(completed_since)
+    if status is not None:
+        query = query.where(entity.status == status)
+    if priority is not None:
+        query = query.where(entity.priority_rank == PRIORITY_RANKS[priority])
+    if due_after is not None:
+        query = query.where(entity.due_date >= due_after)
+    if due_before is not None:
+        query = query.where(entity.due_date < due_before)
+    if overdue is not None:
+        is_overdue = and_(
+            entity.due_date < (now or datetime.utcnow()), entity.status != TaskStatus.DONE
+        )
+        if overdue:
+            query = query.where(is_overdue)
+        else:
+            query = query.where(or_(entity.due_date.is_(None), ~is_overdue))
+    if completed_since is not None:
+        query = query.where(entity.completed_at >= completed_since)
+    if title_prefix:
+        prefix = title_prefix.lower()
+        query = query.where(entity.title_lower >= prefix)
+        upper = _prefix_upper_bound(prefix)
+        if upper is not None:
+            query = query.where(entity.title_lower < upper)
+    return query
+
+
+def sort_tasks(query: Select, sort: str = DEFAULT_SORT, entity=Task) -> Select:
+    """
+    Order a task query by a whitelisted key, with the id as final tie-breaker.
+
+    Args:
+        query: Task query
+        sort: Key from ``SORT_COLUMNS``, prefixed with ``-`` for descending
+        entity: ``Task``, or the alias of it the query selects
+
+    Returns:
+        Select: The ordered query
+
+    Raises:
+        ValueError: If the key is not whitelisted
+    """
+    columns = SORT_COLUMNS.get(sort.lstrip("-"))
+    if columns is None:
+        raise ValueError(f"Unknown sort key: {sort}")
+    columns = tuple(getattr(entity, column.key) for column in columns) + (entity.id,)
+    if sort.startswith("-"):
+        return query.order_by(*(column.desc() for column in columns))
+    return query.order_by(*(column.asc() for column in columns))
@@ -0,0 +1,175 @@
+"""Group commit: coalesce concurrent writes into shared transactions."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal, shard_router
+
+logger = logging.getLogger(__name__)
+
+# A write operation runs inside the batch session and must not commit
+WriteOperation = Callable[[AsyncSession], Awaitable[Any]]
+_Item = Tuple[WriteOperation, asyncio.Future]
+
+
+class WriteBatcher:
+    """
+    Queue write operations and commit them in batches.
+
+    A background task collects queued operations until ``max_batch_size`` are
+    waiting or the oldest has waited ``max_latency_ms``, runs them in one
+    session and commits once. If any operation in a batch fails, the batch is
+    rolled back and its operations are retried one transaction each, so every
+    caller gets its own result or its own exception.
+
+    Args:
+        session_factory: Callable returning a new ``AsyncSession``
+        max_batch_size: Operations committed together at most
+        max_latency_ms: Longest an operation waits for its batch to fill
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch_size: int = 64,
+        max_latency_ms: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.batches = 0
+        self.operations = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(self._queue), name="write-batcher")
+        return self._queue
+
+    async def submit(self, operation: WriteOperation) -> Any:
+        """
+        Queue a write and wait until its batch has committed.
+
+        Args:
+            operation: Coroutine function taking the batch session; it may
+                flush but must not commit
+
+        Returns:
+            Any: The operation's return value
+
+        Raises:
+            Exception: Whatever the operation (or its commit) raised
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_started().put_nowait((operation, future))
+        return await future
+
+    async def close(self) -> None:
+        """Commit everything already queued and stop the background task."""
+        if self._task is None:
+            return
+        if not self._task.done():
+            self._queue.put_nowait(None)
+            await self._task
+        self._task = None
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of operations per committed batch."""
+        return self.operations / self.batches if self.batches else 0.0
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self._flush(batch)
+            except Exception as exc:  # keep serving later batches
+                logger.exception("Write batch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        """Run a batch in one transaction, falling back to one per operation."""
+        pending = [(operation, future) for operation, future in batch if not future.cancelled()]
+        if not pending:
+            return
+
+        async with self.session_factory() as session:
+            try:
+                results = [await operation(session) for operation, _ in pending]
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                results = None
+
+        if results is not None:
+            self.batches += 1
+            self.operations += len(pending)
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+            return
+
+        for operation, future in pending:
+            async with self.session_factory() as session:
+                try:
+                    result = await operation(session)
+                    await session.commit()
+                except Exception as exc:
+                    await session.rollback()
+                    if not future.done():
+                        future.set_exception(exc)
+                    continue
+            self.batches += 1
+            self.operations += 1
+            if not future.done():
+                future.set_result(result)
+
+
+write_batcher = WriteBatcher(
+    AsyncSessionLocal,
+    max_batch_size=settings.WRITE_BATCH_MAX_SIZE,
+    max_latency_ms=settings.WRITE_BATCH_MAX_LATENCY_MS,
+)
+
+
+def get_write_batcher() -> Optional[WriteBatcher]:
+    """
+    Dependency returning the write batcher when group commit is enabled.
+
+    Batches commit to the main database, so group commit is off when tasks
+    are sharded.
+
+    Returns:
+        Optional[WriteBatcher]: Shared batcher, or None for per-request commits
+    """
+    if settings.WRITE_BATCHING_ENABLED and not shard_router.enabled:
+        return write_batcher
+    return None
@@ -0,0 +1,135 @@
+"""Time and memory to delete an account with many tasks.
+
+Each strategy runs against a fresh SQLite file seeded with one user owning
+``--tasks`` tasks:
+
+- ``orm_load_and_delete``: the ORM loads every task and deletes it, which is
+  what the relationship cascade did before ``passive_deletes``
+- ``orm_db_cascade``: ``session.delete(user)`` leaving tasks to ON DELETE CASCADE
+- ``close_account``: what ``DELETE /users/me`` does before responding
+- ``batched_purge``: the background purge that follows
+
+Usage:
+    python -m benchmarks.account_deletion
+    python -m benchmarks.account_deletion --tasks 100000 --batch-size 5000
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from app.database import Base, create_engines, create_session_factory
+from app.models import Task, User
+from app.utils.account_purge import close_account, purge_account
+from benchmarks.common import environment, save_results
+
+
+async def orm_load_and_delete(sessions, user_id: int, batch_size: int) -> None:
+    async with sessions() as session:
+        tasks = (await session.execute(select(Task).where(Task.owner_id == user_id))).scalars()
+        for task in tasks.all():
+            await session.delete(task)
+        await session.delete(await session.get(User, user_id))
+        await session.commit()
+
+
+async def orm_db_cascade(sessions, user_id: int, batch_size: int) -> None:
+    async with sessions() as session:
+        await session.delete(await session.get(User, user_id))
+        await session.commit()
+
+
+async def close_only(sessions, user_id: int, batch_size: int) -> None:
+    async with sessions() as session:
+        await close_account(session, await session.get(User, user_id))
+
+
+async def batched_purge(sessions, user_id: int, batch_size: int) -> None:
+    await purge_account(sessions, user_id, batch_size)
+
+
+STRATEGIES: Dict[str, Callable[..., Awaitable[None]]] = {
+    "orm_load_and_delete": orm_load_and_delete,
+    "orm_db_cascade": orm_db_cascade,
+    "close_account": close_only,
+    "batched_purge": batched_purge,
+}
+
+
+async def run_strategy(name: str, tasks: int, batch_size: int) -> Dict:
+    """Seed a fresh database, then time one strategy and trace its peak memory."""
+    engine, reader = create_engines(
+        f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'deletion.db'}"
+    )
+    sessions = create_session_factory(engine, reader)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        user_id = (await conn.execute(
+            insert(User).values(
+                email="heavy@example.com",
+                username="heavy",
+                hashed_password="x",
+                is_active=True,
+                is_superuser=False,
+            ).returning(User.id)
+        )).scalar_one()
+        for start in range(0, tasks, 10_000):
+            await conn.execute(insert(Task), [
+                {"title": f"Task {n}", "owner_id": user_id}
+                for n in range(start, min(start + 10_000, tasks))
+            ])
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    await STRATEGIES[name](sessions, user_id, batch_size)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    async with sessions() as session:
+        remaining = (await session.execute(select(func.count(Task.id)))).scalar()
+    await engine.dispose()
+    if reader is not None:
+        await reader.dispose()
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "peak_mb": round(peak / 2**20, 2),
+        "tasks_remaining": remaining,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run every strategy and print a comparison."""
+    parser = argparse.ArgumentParser(description="Account deletion time and memory")
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--strategy", choices=["all", *STRATEGIES], default="all")
+    parser.add_argument("--save", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    names = list(STRATEGIES) if args.strategy == "all" else [args.strategy]
+    results = {
+        "meta": {**environment(), "tasks": args.tasks, "batch_size": args.batch_size},
+        "cases": {},
+    }
+    print(f"{'strategy':<22}{'seconds':>10}{'peak MB':>10}{'tasks left':>12}")
+    for name in names:
+        stats = asyncio.run(run_strategy(name, args.tasks, args.batch_size))
+        results["cases"][name] = stats
+        print(
+            f"{name:<22}{stats['elapsed_s']:>10.3f}{stats['peak_mb']:>10.2f}"
+            f"{stats['tasks_remaining']:>12}"
+        )
+    if args.save:
+        save_results(args.save, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
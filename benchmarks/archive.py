@@ -0,0 +1,203 @@
+"""Index size and task list latency before and after archiving completed tasks.
+
+Seeds a SQLite file with ``--users`` users owning ``--tasks`` tasks in
+total, ``--done`` of them completed long ago, then measures:
+
+- the pages held by ``tasks``, its indexes and ``archived_tasks`` (from
+  SQLite's ``dbstat``, so freed pages do not count)
+- latency of the task list queries ``GET /tasks`` runs: the default page,
+  a status filter, the overdue filter and a title prefix search
+
+It archives with ``archive_completed_tasks`` and measures again, adding the
+same list read with ``include_archived``.
+
+Usage:
+    python -m benchmarks.archive
+    python -m benchmarks.archive --tasks 500000 --done 0.9 --save results/archive.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, select, text
+
+from app.database import Base, create_engines, create_session_factory
+from app.models import PRIORITY_RANKS, Task, TaskPriority, TaskStatus, User
+from app.utils.archive import archive_completed_tasks, with_archived
+from app.utils.task_filters import filter_tasks, sort_tasks
+from benchmarks.common import environment, save_results, summarize_latencies
+
+QUERIES = {
+    "list": {},
+    "status_todo": {"status": TaskStatus.TODO},
+    "overdue": {"overdue": True},
+    "title_prefix": {"title_prefix": "task 1"},
+}
+
+
+async def seed(conn, users: int, tasks: int, done: float) -> List[int]:
+    """Insert users and tasks spread over the last two years."""
+    now = datetime.utcnow()
+    rng = random.Random(7)
+    user_ids = []
+    for n in range(users):
+        user_ids.append((await conn.execute(
+            insert(User).values(
+                email=f"user{n}@example.com",
+                username=f"user{n}",
+                hashed_password="x",
+                is_active=True,
+                is_superuser=False,
+            ).returning(User.id)
+        )).scalar_one())
+    priorities = list(TaskPriority)
+    rows = []
+    for n in range(tasks):
+        is_done = rng.random() < done
+        age = timedelta(days=rng.uniform(100, 700) if is_done else rng.uniform(0, 60))
+        priority = rng.choice(priorities)
+        rows.append({
+            "title": f"Task {n}",
+            "title_lower": f"task {n}",
+            "owner_id": user_ids[n % users],
+            "status": TaskStatus.DONE if is_done else TaskStatus.TODO,
+            "priority": priority,
+            "priority_rank": PRIORITY_RANKS[priority],
+            "due_date": now - age + timedelta(days=rng.uniform(-10, 30)),
+            "completed_at": now - age if is_done else None,
+            "created_at": now - age - timedelta(days=5),
+            "updated_at": now - age,
+            "change_seq": n + 1,
+        })
+        if len(rows) == 10_000:
+            await conn.execute(insert(Task), rows)
+            rows = []
+    if rows:
+        await conn.execute(insert(Task), rows)
+    return user_ids
+
+
+async def index_sizes(conn) -> Dict[str, int]:
+    """Bytes in use by each table and index holding tasks."""
+    result = await conn.execute(text(
+        "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ("
+        "SELECT name FROM sqlite_master WHERE tbl_name IN ('tasks', 'archived_tasks')"
+        ") GROUP BY name"
+    ))
+    return dict(result.all())
+
+
+async def time_queries(
+    sessions, user_ids: List[int], count: int, include_archived: bool = False
+) -> Dict[str, Any]:
+    """Run each list query ``count`` times for random users."""
+    rng = random.Random(11)
+    cases = {}
+    async with sessions() as session:
+        for name, filters in QUERIES.items():
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(count):
+                owner_id = rng.choice(user_ids)
+                if include_archived:
+                    tasks = with_archived(owner_id)
+                    query = select(tasks)
+                else:
+                    tasks = Task
+                    query = select(Task).where(Task.owner_id == owner_id)
+                query = sort_tasks(filter_tasks(query, entity=tasks, **filters), entity=tasks)
+                began = time.perf_counter()
+                (await session.execute(query.limit(20))).scalars().all()
+                latencies.append(time.perf_counter() - began)
+                session.expunge_all()
+            cases[name] = summarize_latencies(latencies, time.perf_counter() - started)
+    return cases
+
+
+async def run(users: int, tasks: int, done: float, count: int, batch_size: int) -> Dict:
+    """Seed, measure, archive and measure again."""
+    engine, reader = create_engines(
+        f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'archive.db'}"
+    )
+    sessions = create_session_factory(engine, reader)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        user_ids = await seed(conn, users, tasks, done)
+        await conn.execute(text("ANALYZE"))
+
+    results: Dict[str, Any] = {}
+    async with engine.connect() as conn:
+        results["before_bytes"] = await index_sizes(conn)
+    results["before"] = await time_queries(sessions, user_ids, count)
+
+    started = time.perf_counter()
+    results["archived"] = await archive_completed_tasks(
+        sessions, timedelta(days=90), batch_size
+    )
+    results["archive_s"] = round(time.perf_counter() - started, 3)
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+        results["after_bytes"] = await index_sizes(conn)
+    results["after"] = await time_queries(sessions, user_ids, count)
+    results["after_include_archived"] = await time_queries(
+        sessions, user_ids, count, include_archived=True
+    )
+    await engine.dispose()
+    if reader is not None:
+        await reader.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and print sizes and latencies."""
+    parser = argparse.ArgumentParser(description="Task archiving index size and list latency")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--done", type=float, default=0.8, help="Share of old completed tasks")
+    parser.add_argument("--queries", type=int, default=300, help="Runs per list query")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--save", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.users, args.tasks, args.done, args.queries, args.batch_size))
+
+    print(f"archived {results['archived']} tasks in {results['archive_s']:.2f}s")
+    print(f"{'table/index':<48}{'before KB':>12}{'after KB':>12}")
+    names = sorted(set(results["before_bytes"]) | set(results["after_bytes"]))
+    for name in names:
+        before = results["before_bytes"].get(name, 0) / 1024
+        after = results["after_bytes"].get(name, 0) / 1024
+        print(f"{name:<48}{before:>12.0f}{after:>12.0f}")
+    print(f"{'query':<16}{'before p50':>12}{'p95':>10}{'after p50':>12}{'p95':>10}"
+          f"{'archived p50':>14}{'p95':>10}")
+    for name in QUERIES:
+        before, after = results["before"][name], results["after"][name]
+        union = results["after_include_archived"][name]
+        print(
+            f"{name:<16}{before['p50_ms']:>12.3f}{before['p95_ms']:>10.3f}"
+            f"{after['p50_ms']:>12.3f}{after['p95_ms']:>10.3f}"
+            f"{union['p50_ms']:>14.3f}{union['p95_ms']:>10.3f}"
+        )
+    if args.save:
+        save_results(args.save, {
+            "meta": {
+                **environment(),
+                "users": args.users,
+                "tasks": args.tasks,
+                "done": args.done,
+                "batch_size": args.batch_size,
+            },
+            "cases": results,
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
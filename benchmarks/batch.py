@@ -0,0 +1,169 @@
+"""App launch latency: separate API calls versus one ``POST /api/v1/batch``.
+
+A mobile app launch loads the profile, the task stats and the first
+``--pages`` pages of the task list. Each launch is timed as:
+
+- ``sequential``: one call after the other
+- ``concurrent``: all calls at once (one connection each, as over HTTP/2)
+- ``batch``: one batch running the calls in order on one session
+- ``batch_parallel``: one batch running the calls concurrently
+
+The app runs in-process through httpx's ASGI transport on a throwaway
+SQLite database, or against a running server with ``--url``. In-process,
+``--rtt-ms`` adds a simulated network round trip to every HTTP request,
+which is what a batch saves most of on a mobile connection; database
+connection checkouts per launch are reported too.
+
+Usage:
+    python -m benchmarks.batch
+    python -m benchmarks.batch --rtt-ms 80 --pages 6 --save results/batch.json
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import environment, save_results, summarize_latencies
+from benchmarks.load import API, count_checkouts, seed
+
+CASES = ("sequential", "concurrent", "batch", "batch_parallel")
+
+
+class DelayedTransport(httpx.AsyncBaseTransport):
+    """Transport adding a fixed round trip time to every request."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, rtt: float = 0.0):
+        self.transport = transport
+        self.rtt = rtt
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+        return await self.transport.handle_async_request(request)
+
+
+@asynccontextmanager
+async def launch_client(url: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+    """Client for a live server, or for the app in-process with its lifespan running."""
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            yield client
+        return
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = DelayedTransport(httpx.ASGITransport(app=app))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://localhost", timeout=30
+        ) as client:
+            yield client
+
+
+def launch_calls(pages: int, page_size: int) -> List[str]:
+    """Paths an app loads at launch."""
+    return [
+        f"{API}/users/me",
+        f"{API}/tasks/stats/summary",
+        *(f"{API}/tasks/?limit={page_size}&skip={page * page_size}" for page in range(pages)),
+    ]
+
+
+async def launch(client: httpx.AsyncClient, case: str, paths: List[str], headers: Dict) -> bool:
+    """Load every path once the way ``case`` does; returns whether all calls succeeded."""
+    if case == "sequential":
+        responses = [await client.get(path, headers=headers) for path in paths]
+        return all(response.status_code == 200 for response in responses)
+    if case == "concurrent":
+        responses = await asyncio.gather(*(client.get(path, headers=headers) for path in paths))
+        return all(response.status_code == 200 for response in responses)
+    response = await client.post(f"{API}/batch", headers=headers, json={
+        "requests": [{"path": path} for path in paths],
+        "parallel": case == "batch_parallel",
+    })
+    return response.status_code == 200 and all(
+        item["status"] == 200 for item in response.json()["responses"]
+    )
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Seed one user, then time launches for every case."""
+    paths = launch_calls(args.pages, args.page_size)
+    results: Dict = {}
+    async with launch_client(args.url) as client:
+        counts = None if args.url else count_checkouts()
+        ctx = await seed(client, users=1, tasks_per_user=args.tasks)
+        headers = ctx.headers[0]
+        if not args.url:
+            client._transport.rtt = args.rtt_ms / 1000
+        for case in CASES:
+            for _ in range(min(args.launches, 10)):
+                await launch(client, case, paths, headers)
+            if counts is not None:
+                counts["checkouts"] = 0
+            latencies, errors = [], 0
+            started = time.perf_counter()
+            for _ in range(args.launches):
+                began = time.perf_counter()
+                errors += not await launch(client, case, paths, headers)
+                latencies.append(time.perf_counter() - began)
+            results[case] = summarize_latencies(latencies, time.perf_counter() - started, errors)
+            results[case]["calls"] = 1 if case.startswith("batch") else len(paths)
+            if counts is not None:
+                results[case]["checkouts_per_launch"] = round(
+                    counts["checkouts"] / args.launches, 2
+                )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and print launch latencies."""
+    parser = argparse.ArgumentParser(description="App launch latency with and without batching")
+    parser.add_argument("--launches", type=int, default=200, help="Launches timed per case")
+    parser.add_argument("--pages", type=int, default=3, help="Task list pages loaded at launch")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=100, help="Tasks seeded for the user")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="Simulated round trip time")
+    parser.add_argument("--url", default=None, help="Target server instead of in-process")
+    parser.add_argument("--save", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    if not args.url:
+        os.environ.setdefault(
+            "DATABASE_URL",
+            f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'batch.db'}",
+        )
+
+    results = asyncio.run(run(args))
+
+    print(f"{'case':<16}{'calls':>7}{'errs':>6}{'p50 ms':>10}{'p95 ms':>10}{'checkouts':>11}")
+    for case, result in results.items():
+        print(
+            f"{case:<16}{result['calls']:>7}{result['errors']:>6}"
+            f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result.get('checkouts_per_launch', '-'):>11}"
+        )
+    if args.save:
+        save_results(args.save, {
+            "meta": {
+                **environment(),
+                "target": args.url or "in-process",
+                "pages": args.pages,
+                "page_size": args.page_size,
+                "tasks": args.tasks,
+                "rtt_ms": args.rtt_ms,
+            },
+            "cases": results,
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
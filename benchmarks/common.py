@@ -0,0 +1,121 @@
+"""Shared helpers for benchmarks: latency statistics and JSON baselines."""
+import json
+import math
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values: Values in ascending order
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, or 0.0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(
+    latencies: Sequence[float],
+    elapsed: float,
+    errors: int = 0,
+) -> Dict[str, Any]:
+    """
+    Summarize request latencies (in seconds) measured over ``elapsed`` seconds.
+
+    Returns:
+        Dict[str, Any]: Request count, errors, RPS and latency percentiles in ms
+    """
+    ordered = sorted(latencies)
+    to_ms = 1000.0
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * to_ms, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * to_ms, 3),
+        "p95_ms": round(percentile(ordered, 95) * to_ms, 3),
+        "p99_ms": round(percentile(ordered, 99) * to_ms, 3),
+        "max_ms": round(ordered[-1] * to_ms, 3) if ordered else 0.0,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine a benchmark ran on."""
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+
+
+def save_results(path: Path, results: Dict[str, Any]) -> None:
+    """Write results as a JSON baseline."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Read a JSON baseline."""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# Metric name -> True when higher is better
+DEFAULT_METRICS = {
+    "rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "checkouts_per_request": False,
+}
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    metrics: Optional[Dict[str, bool]] = None,
+) -> List[str]:
+    """
+    Compare two result sets case by case.
+
+    Args:
+        baseline: Results with a ``cases`` mapping
+        current: Results with a ``cases`` mapping
+        threshold: Allowed relative change, e.g. 0.1 for 10%
+        metrics: Metric name -> whether higher is better
+
+    Returns:
+        List[str]: One message per regressed metric (empty when none)
+    """
+    metrics = metrics or DEFAULT_METRICS
+    regressions = []
+    for name, current_case in current.get("cases", {}).items():
+        base_case = baseline.get("cases", {}).get(name)
+        if not base_case:
+            continue
+        for metric, higher_is_better in metrics.items():
+            before = base_case.get(metric)
+            after = current_case.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (higher_is_better and change < -threshold) or (
+                not higher_is_better and change > threshold
+            ):
+                regressions.append(
+                    f"{name}: {metric} {before} -> {after} "
+                    f"({change:+.1%}, threshold {threshold:.0%})"
+                )
+    return regressions
@@ -0,0 +1,308 @@
+"""HTTP load generator with latency percentiles and JSON baselines.
+
+Drives the application in-process through httpx's ASGI transport (against a
+throwaway SQLite database) or a running server with ``--url``.
+
+Usage:
+    python -m benchmarks.load
+    python -m benchmarks.load --scenario list_paging --requests 2000 --concurrency 50
+    python -m benchmarks.load --url http://127.0.0.1:8000 --save benchmarks/results/local.json
+    python -m benchmarks.load --compare benchmarks/results/local.json --threshold 0.15
+
+In-process runs also report database connection pool checkouts per request.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import (
+    compare_results,
+    environment,
+    load_results,
+    save_results,
+    summarize_latencies,
+)
+
+API = "/api/v1"
+PASSWORD = "LoadTest123!"
+
+
+@dataclass
+class LoadContext:
+    """Users, tokens and task ids created for a run."""
+    credentials: List[Dict[str, str]] = field(default_factory=list)
+    headers: List[Dict[str, str]] = field(default_factory=list)
+    task_ids: List[List[int]] = field(default_factory=list)
+    created: List[List[int]] = field(default_factory=list)
+
+    def user(self, i: int) -> int:
+        """Spread request ``i`` across users."""
+        return i % len(self.headers)
+
+
+async def seed(client: httpx.AsyncClient, users: int, tasks_per_user: int) -> LoadContext:
+    """
+    Register users, log them in and seed tasks through the API.
+
+    Args:
+        client: HTTP client bound to the target
+        users: Number of users to create
+        tasks_per_user: Tasks seeded per user
+
+    Returns:
+        LoadContext: Credentials, auth headers and task ids
+    """
+    ctx = LoadContext()
+    run_id = uuid.uuid4().hex[:8]
+    for n in range(users):
+        credentials = {"username": f"load_{run_id}_{n}", "password": PASSWORD}
+        response = await client.post(f"{API}/auth/register", json={
+            **credentials, "email": f"load_{run_id}_{n}@example.com",
+        })
+        response.raise_for_status()
+        response = await client.post(f"{API}/auth/login", json=credentials)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        ids = []
+        for t in range(tasks_per_user):
+            response = await client.post(f"{API}/tasks/", headers=headers, json={
+                "title": f"Load task {t}",
+                "description": "Seeded by the load generator " * 4,
+                "priority": ("low", "medium", "high")[t % 3],
+            })
+            response.raise_for_status()
+            ids.append(response.json()["id"])
+
+        ctx.credentials.append(credentials)
+        ctx.headers.append(headers)
+        ctx.task_ids.append(ids)
+        ctx.created.append([])
+    return ctx
+
+
+Scenario = Callable[[httpx.AsyncClient, LoadContext, int], Awaitable[httpx.Response]]
+
+
+async def login_storm(client: httpx.AsyncClient, ctx: LoadContext, i: int) -> httpx.Response:
+    """Repeated password logins (bcrypt bound)."""
+    return await client.post(f"{API}/auth/login", json=ctx.credentials[ctx.user(i)])
+
+
+async def list_paging(client: httpx.AsyncClient, ctx: LoadContext, i: int) -> httpx.Response:
+    """Walk the first pages of the task list."""
+    return await client.get(
+        f"{API}/tasks/",
+        params={"skip": (i % 3) * 20, "limit": 20},
+        headers=ctx.headers[ctx.user(i)],
+    )
+
+
+async def stats_polling(client: httpx.AsyncClient, ctx: LoadContext, i: int) -> httpx.Response:
+    """Dashboard polling of the stats summary."""
+    return await client.get(f"{API}/tasks/stats/summary", headers=ctx.headers[ctx.user(i)])
+
+
+async def mixed_crud(client: httpx.AsyncClient, ctx: LoadContext, i: int) -> httpx.Response:
+    """40% reads by id, 20% list, 20% create, 10% update, 10% delete."""
+    user = ctx.user(i)
+    headers = ctx.headers[user]
+    ids = ctx.task_ids[user]
+    slot = i % 10
+
+    if slot in (6, 7):
+        response = await client.post(
+            f"{API}/tasks/", headers=headers, json={"title": f"Mixed task {i}"}
+        )
+        if response.status_code == 201:
+            ctx.created[user].append(response.json()["id"])
+        return response
+    if slot == 8:
+        return await client.put(
+            f"{API}/tasks/{ids[i % len(ids)]}",
+            headers=headers,
+            json={"status": ("todo", "in_progress", "done")[i % 3]},
+        )
+    if slot == 9 and ctx.created[user]:
+        return await client.delete(f"{API}/tasks/{ctx.created[user].pop()}", headers=headers)
+    if slot in (4, 5):
+        return await client.get(f"{API}/tasks/", headers=headers)
+    return await client.get(f"{API}/tasks/{ids[i % len(ids)]}", headers=headers)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login_storm": login_storm,
+    "list_paging": list_paging,
+    "mixed_crud": mixed_crud,
+    "stats_polling": stats_polling,
+}
+
+# Logins are bcrypt bound, so they get a smaller default request count
+DEFAULT_REQUESTS = {"login_storm": 50}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: LoadContext,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    """
+    Issue ``requests`` calls from ``concurrency`` workers and summarize them.
+
+    Returns:
+        Dict[str, float]: RPS, error count and latency percentiles
+    """
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx, i)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize_latencies(latencies, time.perf_counter() - started, errors)
+
+
+def count_checkouts() -> Dict[str, int]:
+    """Count pool checkouts of the in-process app's engines under ``"checkouts"``."""
+    from sqlalchemy import event
+
+    from app.database import engine, read_engine
+
+    counts = {"checkouts": 0}
+
+    def on_checkout(*args) -> None:
+        counts["checkouts"] += 1
+
+    for pool_engine in filter(None, (engine, read_engine)):
+        event.listen(pool_engine.sync_engine.pool, "checkout", on_checkout)
+    return counts
+
+
+@asynccontextmanager
+async def target_client(url: Optional[str], concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Client for a live server, or for the app in-process with its lifespan running."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+            yield client
+        return
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://localhost", timeout=30
+        ) as client:
+            yield client
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Set up data and run the selected scenarios."""
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    results = {
+        "meta": {
+            **environment(),
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "tasks_per_user": args.tasks,
+        },
+        "cases": {},
+    }
+
+    async with target_client(args.url, args.concurrency) as client:
+        counts = None if args.url else count_checkouts()
+        ctx = await seed(client, args.users, args.tasks)
+        for name in names:
+            requests = args.requests or DEFAULT_REQUESTS.get(name, 500)
+            # Warm up connections and caches before measuring
+            await run_scenario(client, ctx, SCENARIOS[name], min(requests, 20), args.concurrency)
+            if counts is not None:
+                counts["checkouts"] = 0
+            results["cases"][name] = case = await run_scenario(
+                client, ctx, SCENARIOS[name], requests, args.concurrency
+            )
+            if counts is not None:
+                case["checkouts_per_request"] = round(counts["checkouts"] / requests, 3)
+    return results
+
+
+def print_table(results: Dict) -> None:
+    """Print results as a table."""
+    print(
+        f"{'scenario':<16}{'reqs':>7}{'errs':>6}{'rps':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'checkouts':>11}"
+    )
+    for name, case in results["cases"].items():
+        print(
+            f"{name:<16}{case['requests']:>7}{case['errors']:>6}{case['rps']:>10.1f}"
+            f"{case['p50_ms']:>10.2f}{case['p95_ms']:>10.2f}{case['p99_ms']:>10.2f}"
+            f"{case.get('checkouts_per_request', '-'):>11}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments, run the load test and handle baselines."""
+    parser = argparse.ArgumentParser(description="HTTP load generator")
+    parser.add_argument("--scenario", choices=["all", *SCENARIOS], default="all")
+    parser.add_argument("--requests", type=int, default=None, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=50, help="Tasks seeded per user")
+    parser.add_argument("--url", default=None, help="Target server instead of in-process")
+    parser.add_argument("--save", type=Path, default=None, help="Write results as a baseline")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression")
+    args = parser.parse_args(argv)
+
+    if not args.url:
+        # In-process runs get their own database unless one is configured explicitly
+        os.environ.setdefault(
+            "DATABASE_URL",
+            f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'load.db'}",
+        )
+
+    results = asyncio.run(run(args))
+    print_table(results)
+
+    if args.save:
+        save_results(args.save, results)
+        print(f"saved baseline to {args.save}")
+
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
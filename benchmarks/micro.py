@@ -0,0 +1,335 @@
+"""Micro-benchmarks for the work every request pays for.
+
+Each case is calibrated to run for roughly ``--target`` seconds per round,
+timed over several rounds with the garbage collector disabled, and reported
+as per-operation time. ``--profile DIR`` additionally writes a folded-stack
+file (for flamegraph.pl, speedscope or inferno) and a cProfile dump per case.
+
+Usage:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter serialize --rounds 10
+    python -m benchmarks.micro --save benchmarks/results/micro.json
+    python -m benchmarks.micro --compare benchmarks/results/micro.json --threshold 0.15
+    python -m benchmarks.micro --filter jwt --profile profiles/
+"""
+import argparse
+import asyncio
+import cProfile
+import gc
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fastapi import FastAPI
+from jose import jwt
+from pydantic import TypeAdapter
+from sqlalchemy import and_, func, select
+
+from app.config import settings
+from app.database import engine
+from app.main import app
+from app.models import Task, TaskPriority, TaskStatus
+from app.schemas import TaskCreate, TaskResponse, TaskUpdate
+from app.utils.auth import create_access_token
+from app.utils.fieldsets import parse_fields, render_tasks
+from app.utils.profiler import StackSampler
+from benchmarks.common import compare_results, environment, load_results, save_results
+
+# A case factory returns run(n), which performs n operations
+Runner = Callable[[int], None]
+CASES: Dict[str, Callable[[], Runner]] = {}
+
+
+def case(name: str):
+    """Register a benchmark case factory."""
+    def register(factory: Callable[[], Runner]) -> Callable[[], Runner]:
+        CASES[name] = factory
+        return factory
+    return register
+
+
+@case("jwt_decode")
+def jwt_decode() -> Runner:
+    """Token decode as done by get_current_user."""
+    token = create_access_token({"sub": "42", "username": "bench"})
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return run
+
+
+@case("validate_task_create")
+def validate_task_create() -> Runner:
+    """Request body validation for POST /tasks/."""
+    payload = {
+        "title": "Write quarterly report",
+        "description": "Collect numbers from every team and summarize them",
+        "status": "in_progress",
+        "priority": "high",
+        "due_date": "2026-12-31T17:00:00",
+    }
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            TaskCreate.model_validate(payload)
+    return run
+
+
+@case("validate_task_update")
+def validate_task_update() -> Runner:
+    """Request body validation for PUT /tasks/{id}."""
+    payload = {"status": "done", "priority": "low"}
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            TaskUpdate.model_validate(payload)
+    return run
+
+
+def _tasks(count: int) -> List[Task]:
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    return [
+        Task(
+            id=i,
+            title=f"Task {i}",
+            description="Some description text " * 5,
+            status=TaskStatus.TODO,
+            priority=TaskPriority.MEDIUM,
+            due_date=now + timedelta(days=i),
+            owner_id=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def _serialize(count: int) -> Runner:
+    """Response validation, serialization and JSON rendering like FastAPI does."""
+    adapter = TypeAdapter(List[TaskResponse])
+    tasks = _tasks(count)
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            items = adapter.validate_python(tasks, from_attributes=True)
+            json.dumps(adapter.dump_python(items, mode="json")).encode()
+    return run
+
+
+for _count in (1, 20, 100):
+    case(f"serialize_task_response_{_count}")(lambda count=_count: _serialize(count))
+
+
+def _serialize_fields(count: int) -> Runner:
+    """Sparse fieldset rendering as done by get_tasks with ?fields=."""
+    fields = parse_fields("id,title,status,due_date")
+    tasks = _tasks(count)
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            render_tasks(tasks, fields)
+    return run
+
+
+for _count in (20, 100):
+    case(f"serialize_task_fields_{_count}")(lambda count=_count: _serialize_fields(count))
+
+
+def _compile(build: Callable[[], object]) -> Runner:
+    """Build a statement and compile it for the configured dialect."""
+    dialect = engine.dialect
+
+    def run(n: int) -> None:
+        for _ in range(n):
+            build().compile(dialect=dialect)
+    return run
+
+
+@case("compile_list_tasks")
+def compile_list_tasks() -> Runner:
+    """Statement from get_tasks with a status filter."""
+    return _compile(lambda: (
+        select(Task)
+        .where(Task.owner_id == 1)
+        .where(Task.status == TaskStatus.TODO)
+        .offset(0)
+        .limit(20)
+        .order_by(Task.created_at.desc())
+    ))
+
+
+@case("compile_get_task")
+def compile_get_task() -> Runner:
+    """Statement from get_task / update_task / delete_task."""
+    return _compile(lambda: select(Task).where(and_(Task.id == 1, Task.owner_id == 1)))
+
+
+@case("compile_task_stats")
+def compile_task_stats() -> Runner:
+    """Statement from get_task_stats."""
+    return _compile(lambda: (
+        select(Task.status, func.count(Task.id)).where(Task.owner_id == 1).group_by(Task.status)
+    ))
+
+
+def _asgi_get(asgi_app: FastAPI, path: str) -> Runner:
+    """Drive an ASGI app directly, without any HTTP client overhead."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"origin", b"http://localhost:3000")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    async def many(n: int) -> None:
+        for _ in range(n):
+            await asgi_app(dict(scope), receive, send)
+
+    loop = asyncio.new_event_loop()
+    return lambda n: loop.run_until_complete(many(n))
+
+
+@case("asgi_root_full_stack")
+def asgi_root_full_stack() -> Runner:
+    """GET / through the application's middleware stack."""
+    return _asgi_get(app, "/")
+
+
+def _root_endpoint():
+    """Endpoint of the application's GET / route."""
+    for route in app.routes:
+        if getattr(route, "path", None) == "/" and "GET" in getattr(route, "methods", ()):
+            return route.endpoint
+    raise LookupError("GET / route not found")
+
+
+@case("asgi_root_no_middleware")
+def asgi_root_no_middleware() -> Runner:
+    """The same route on a bare app; the difference is middleware cost."""
+    bare = FastAPI()
+    bare.get("/")(_root_endpoint())
+    return _asgi_get(bare, "/")
+
+
+def calibrate(run: Runner, target: float) -> int:
+    """Find an iteration count that takes roughly ``target`` seconds."""
+    n = 1
+    while True:
+        started = time.perf_counter()
+        run(n)
+        elapsed = time.perf_counter() - started
+        if elapsed >= target / 10 or n >= 1_000_000:
+            return max(int(n * target / max(elapsed, 1e-9)), 1)
+        n *= 10
+
+
+def measure(run: Runner, rounds: int, target: float) -> Dict[str, float]:
+    """
+    Time ``run`` over several rounds with the garbage collector disabled.
+
+    Returns:
+        Dict[str, float]: Per-operation min/median/stdev in microseconds
+    """
+    iterations = calibrate(run, target)
+    run(iterations)  # warm-up round
+    per_op = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            run(iterations)
+            per_op.append((time.perf_counter() - started) / iterations)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    median = statistics.median(per_op)
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "min_us": round(min(per_op) * 1e6, 3),
+        "median_us": round(median * 1e6, 3),
+        "stdev_us": round(statistics.stdev(per_op) * 1e6, 3) if rounds > 1 else 0.0,
+        "ops_per_sec": round(1 / median, 1),
+    }
+
+
+def profile(name: str, run: Runner, seconds: float, directory: Path) -> None:
+    """Write folded stacks and a cProfile dump for one case."""
+    directory.mkdir(parents=True, exist_ok=True)
+    iterations = calibrate(run, seconds)
+
+    with StackSampler(interval=0.0005) as sampler:
+        run(iterations)
+    (directory / f"{name}.folded").write_text(sampler.folded(), encoding="utf-8")
+
+    profiler = cProfile.Profile()
+    profiler.runcall(run, iterations)
+    profiler.dump_stats(directory / f"{name}.prof")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments, run the selected cases and handle baselines."""
+    parser = argparse.ArgumentParser(description="Hot path micro-benchmarks")
+    parser.add_argument("--filter", default="", help="Only run cases containing this text")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--target", type=float, default=0.1, help="Seconds per round")
+    parser.add_argument("--profile", type=Path, default=None, help="Write profiles to DIR")
+    parser.add_argument("--save", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if args.filter in name]
+    results = {"meta": environment(), "cases": {}}
+    print(f"{'case':<32}{'median us':>12}{'min us':>12}{'stdev us':>12}{'ops/s':>14}")
+    for name in names:
+        run = CASES[name]()
+        stats = measure(run, args.rounds, args.target)
+        results["cases"][name] = stats
+        print(
+            f"{name:<32}{stats['median_us']:>12.2f}{stats['min_us']:>12.2f}"
+            f"{stats['stdev_us']:>12.2f}{stats['ops_per_sec']:>14.1f}"
+        )
+        if args.profile:
+            profile(name, run, 1.0, args.profile)
+
+    if args.profile:
+        print(f"profiles written to {args.profile}")
+    if args.save:
+        save_results(args.save, results)
+        print(f"saved baseline to {args.save}")
+    if args.compare:
+        regressions = compare_results(
+            load_results(args.compare), results, args.threshold, metrics={"median_us": False}
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Cost of a task list page with and without a sparse fieldset.
+
+Seeds a SQLite file with ``--tasks`` tasks whose descriptions are
+``--description-bytes`` long, then runs the ``get_tasks`` query and
+serialization for pages of ``--page-size`` tasks:
+
+- ``full_response``: the default list, every column and field
+- ``fields``: ``?fields=id,title,status,due_date``
+
+Usage:
+    python -m benchmarks.sparse_fields
+    python -m benchmarks.sparse_fields --tasks 20000 --description-bytes 8000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+
+from app.database import Base, create_engines, create_session_factory
+from app.models import Task, User
+from app.schemas import TaskResponse
+from app.utils.fieldsets import parse_fields, render_tasks, task_load_options
+from benchmarks.common import environment, save_results, summarize_latencies
+
+FIELDS = "id,title,status,due_date"
+full_adapter = TypeAdapter(List[TaskResponse])
+
+
+def render_full(tasks) -> bytes:
+    """Response validation and rendering as FastAPI does for ``response_model``."""
+    items = full_adapter.validate_python(tasks, from_attributes=True)
+    return json.dumps(full_adapter.dump_python(items, mode="json")).encode()
+
+
+CASES = {
+    "full_response": (None, render_full),
+    "fields": (
+        task_load_options(parse_fields(FIELDS)),
+        lambda tasks: render_tasks(tasks, parse_fields(FIELDS)),
+    ),
+}
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Seed the database, then page through it once per case."""
+    engine, reader = create_engines(
+        f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'fields.db'}"
+    )
+    sessions = create_session_factory(engine, reader)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        user_id = (await conn.execute(
+            insert(User).values(
+                email="lists@example.com",
+                username="lists",
+                hashed_password="x",
+                is_active=True,
+                is_superuser=False,
+            ).returning(User.id)
+        )).scalar_one()
+        description = "d" * args.description_bytes
+        for start in range(0, args.tasks, 5000):
+            await conn.execute(insert(Task), [
+                {"title": f"Task {n}", "description": description, "owner_id": user_id}
+                for n in range(start, min(start + 5000, args.tasks))
+            ])
+
+    async def page(options, render, skip: int) -> int:
+        query = select(Task).where(Task.owner_id == user_id)
+        if options is not None:
+            query = query.options(options)
+        query = query.offset(skip).limit(args.page_size).order_by(Task.created_at.desc())
+        async with sessions() as session:
+            tasks = (await session.execute(query)).scalars().all()
+            return len(render(tasks))
+
+    results = {}
+    for name, (options, render) in CASES.items():
+        latencies = []
+        payload = 0
+        started = time.perf_counter()
+        for skip in range(0, args.tasks, args.page_size):
+            began = time.perf_counter()
+            payload += await page(options, render, skip)
+            latencies.append(time.perf_counter() - began)
+        elapsed = time.perf_counter() - started
+
+        # Memory is traced on a separate page: tracing distorts the timings
+        tracemalloc.start()
+        await page(options, render, 0)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {
+            **summarize_latencies(latencies, elapsed),
+            "bytes_per_page": round(payload / len(latencies)),
+            "peak_kb": round(peak / 2**10),
+        }
+
+    await engine.dispose()
+    if reader is not None:
+        await reader.dispose()
+    return {
+        "meta": {**environment(), **{k: v for k, v in vars(args).items() if k != "save"}},
+        "cases": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run every case and print a comparison."""
+    parser = argparse.ArgumentParser(description="Task list pages with and without fieldsets")
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--description-bytes", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--save", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    print(f"{'case':<16}{'p50 ms':>10}{'p99 ms':>10}{'bytes/page':>12}{'peak KB':>10}")
+    for name, stats in results["cases"].items():
+        print(
+            f"{name:<16}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            f"{stats['bytes_per_page']:>12}{stats['peak_kb']:>10}"
+        )
+    if args.save:
+        save_results(args.save, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Concurrent mixed read/write workload against SQLite, default vs concurrent mode.
+
+Each mode gets a fresh database file shared by several processes, the way
+multiple server workers share it. Writers insert a task and commit; readers
+list a user's tasks, all through the application's session factory.
+
+Usage:
+    python -m benchmarks.sqlite_concurrency
+    python -m benchmarks.sqlite_concurrency --writers 16 --readers 32 --duration 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import settings
+from app.database import Base, create_engines, create_session_factory
+from app.models import Task, User
+from benchmarks.common import environment, save_results, summarize_latencies
+
+
+async def prepare(path: Path, concurrent: bool) -> int:
+    """Create the schema and a task owner; returns the owner's id."""
+    settings.SQLITE_CONCURRENT_MODE = concurrent
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{path}")
+    sessions = create_session_factory(writer, reader)
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessions() as session:
+        session.add(User(email="bench@example.com", username="bench", hashed_password="x"))
+        await session.commit()
+        user_id = (await session.execute(select(User.id))).scalar_one()
+    await writer.dispose()
+    if reader is not None:
+        await reader.dispose()
+    return user_id
+
+
+async def workload(
+    path: Path, concurrent: bool, user_id: int, writers: int, readers: int, duration: float
+) -> Dict:
+    """Run writers and readers in this process until the deadline."""
+    settings.SQLITE_CONCURRENT_MODE = concurrent
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{path}")
+    sessions = create_session_factory(writer, reader)
+    latencies: Dict[str, List[float]] = {"write": [], "read": []}
+    errors = {"write": 0, "read": 0}
+    deadline = time.perf_counter() + duration
+
+    async def write() -> None:
+        async with sessions() as session:
+            session.add(Task(title="Concurrent task", owner_id=user_id))
+            await session.commit()
+
+    async def read() -> None:
+        async with sessions() as session:
+            result = await session.execute(
+                select(Task).where(Task.owner_id == user_id).order_by(Task.id.desc()).limit(20)
+            )
+            result.scalars().all()
+
+    async def worker(kind: str, operation) -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await operation()
+            except (OperationalError, PoolTimeoutError):
+                errors[kind] += 1
+            latencies[kind].append(time.perf_counter() - started)
+
+    await asyncio.gather(
+        *(worker("write", write) for _ in range(writers)),
+        *(worker("read", read) for _ in range(readers)),
+    )
+    await writer.dispose()
+    if reader is not None:
+        await reader.dispose()
+    return {"latencies": latencies, "errors": errors}
+
+
+def run_process(*args) -> Dict:
+    """Process entry point: one event loop running ``workload``."""
+    return asyncio.run(workload(*args))
+
+
+def run_mode(concurrent: bool, processes: int, writers: int, readers: int, duration: float) -> Dict:
+    """
+    Run the workload in one mode across ``processes`` worker processes.
+
+    Returns:
+        Dict: Write and read summaries
+    """
+    path = Path(tempfile.mkdtemp()) / "concurrency.db"
+    user_id = asyncio.run(prepare(path, concurrent))
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        futures = [
+            pool.submit(run_process, path, concurrent, user_id, writers, readers, duration)
+            for _ in range(processes)
+        ]
+        outcomes = [future.result() for future in futures]
+
+    return {
+        kind: summarize_latencies(
+            [value for outcome in outcomes for value in outcome["latencies"][kind]],
+            duration,
+            sum(outcome["errors"][kind] for outcome in outcomes),
+        )
+        for kind in ("write", "read")
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run both modes and print a comparison."""
+    parser = argparse.ArgumentParser(description="SQLite concurrent mixed workload")
+    parser.add_argument("--processes", type=int, default=2, help="Simulated server workers")
+    parser.add_argument("--writers", type=int, default=8, help="Writers per process")
+    parser.add_argument("--readers", type=int, default=16, help="Readers per process")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument("--save", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    results = {"meta": {**environment(), **vars(args), "save": None}, "cases": {}}
+    for mode, concurrent in (("default", False), ("concurrent", True)):
+        summary = run_mode(
+            concurrent, args.processes, args.writers, args.readers, args.duration
+        )
+        for kind, stats in summary.items():
+            results["cases"][f"{mode}_{kind}"] = stats
+
+    print(f"{'case':<20}{'ops':>8}{'errors':>8}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, stats in results["cases"].items():
+        print(
+            f"{name:<20}{stats['requests']:>8}{stats['errors']:>8}{stats['rps']:>10.1f}"
+            f"{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+    if args.save:
+        save_results(args.save, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Cost of idle event stream subscribers and of fanning events out to them.
+
+Opens ``--subscribers`` SSE streams on one hub (each a consumer task
+rendering ``event_stream``, as a worker holds them), reports the memory per
+idle stream, then publishes events to a user with ``--per-user`` open
+connections and measures publish-to-render latency.
+
+Usage:
+    python -m benchmarks.sse_fanout
+    python -m benchmarks.sse_fanout --subscribers 20000 --per-user 50 --events 500
+"""
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.utils.events import EventHub, event_stream
+from benchmarks.common import environment, save_results, summarize_latencies
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Open the streams, measure memory, then measure fan-out latency."""
+    hub = EventHub(queue_size=100, max_subscribers=args.subscribers, heartbeat=args.heartbeat)
+    await hub.start()
+    received: List[float] = []
+    hot_user = 0
+
+    async def consume(user_id: int) -> None:
+        async for chunk in event_stream(hub, user_id):
+            if chunk.startswith("id:"):
+                received.append(time.perf_counter())
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    consumers = [
+        asyncio.create_task(consume(hot_user if n < args.per_user else n))
+        for n in range(args.subscribers)
+    ]
+    await asyncio.sleep(0.1)  # let every stream subscribe and park on its queue
+    gc.collect()
+    per_stream = (tracemalloc.get_traced_memory()[0] - before) / args.subscribers
+    tracemalloc.stop()
+
+    latencies = []
+    for seq in range(1, args.events + 1):
+        received.clear()
+        started = time.perf_counter()
+        hub.publish({"type": "task.updated", "owner_id": hot_user, "task_id": 1, "change_seq": seq})
+        while len(received) < args.per_user:
+            await asyncio.sleep(0)
+        latencies.append(max(received) - started)
+
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    await hub.close()
+
+    fanout = summarize_latencies(latencies, sum(latencies))
+    return {
+        "meta": {**environment(), **{k: v for k, v in vars(args).items() if k != "save"}},
+        "cases": {
+            "idle_streams": {
+                "subscribers": args.subscribers,
+                "bytes_per_stream": round(per_stream),
+                "total_mb": round(per_stream * args.subscribers / 2**20, 1),
+            },
+            "fanout": fanout,
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments, run the benchmark and print it."""
+    parser = argparse.ArgumentParser(description="SSE subscriber cost and fan-out latency")
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--per-user", type=int, default=20, help="Connections of the hot user")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--heartbeat", type=float, default=15.0)
+    parser.add_argument("--save", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    idle = results["cases"]["idle_streams"]
+    fanout = results["cases"]["fanout"]
+    print(
+        f"{idle['subscribers']} idle streams: {idle['bytes_per_stream']} bytes each, "
+        f"{idle['total_mb']} MB total"
+    )
+    print(
+        f"fan-out to {args.per_user} connections: p50 {fanout['p50_ms']:.3f} ms, "
+        f"p99 {fanout['p99_ms']:.3f} ms"
+    )
+    if args.save:
+        save_results(args.save, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
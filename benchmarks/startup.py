@@ -0,0 +1,101 @@
+"""Cold start to first-request-ready benchmark.
+
+Each run starts a fresh interpreter, imports the application, runs the
+lifespan startup and serves one request in-process. The median cold start
+is checked against ``STARTUP_BUDGET_SECONDS``.
+
+Usage:
+    python -m benchmarks.startup --runs 10
+    DB_STARTUP_MODE=migrations DB_POOL_WARMUP=5 python -m benchmarks.startup
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+CHILD = """
+import asyncio
+import json
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+# Harness imports above are excluded from the measurement
+started = time.perf_counter()
+
+from app.main import app
+
+
+async def main():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://localhost") as client:
+            response = await client.get("/health")
+            response.raise_for_status()
+        served = time.perf_counter()
+        timings = dict(app.state.startup_timings)
+        timings["ready"] = round((ready - started) * 1000, 2)
+        timings["first_request"] = round((served - ready) * 1000, 2)
+        timings["cold_start"] = round((served - started) * 1000, 2)
+        print(json.dumps(timings))
+
+
+asyncio.run(main())
+"""
+
+
+def run_once() -> Dict[str, float]:
+    """Start a fresh interpreter and return its timing breakdown in ms."""
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Median and max of every phase across runs."""
+    return {
+        phase: {
+            "median": round(statistics.median(run[phase] for run in runs), 2),
+            "max": round(max(run[phase] for run in runs), 2),
+        }
+        for phase in runs[0]
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and compare against the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=settings.STARTUP_BUDGET_SECONDS,
+        help="Cold start budget in seconds",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize([run_once() for _ in range(args.runs)])
+    cold_start = summary["cold_start"]["median"]
+    within_budget = cold_start <= args.budget * 1000
+
+    if args.json:
+        print(json.dumps({"summary": summary, "budget_ms": args.budget * 1000}, indent=2))
+    else:
+        print(f"{'phase':<16}{'median ms':>12}{'max ms':>12}")
+        for phase, stats in summary.items():
+            print(f"{phase:<16}{stats['median']:>12.2f}{stats['max']:>12.2f}")
+        verdict = "within" if within_budget else "OVER"
+        print(f"cold start {cold_start:.2f} ms is {verdict} the {args.budget * 1000:.0f} ms budget")
+
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,67 @@
-"""Pytest configuration and fixtures."""
+"""Pytest configuration and fixtures.
+
+The schema is created once per test session (one in-memory database per
+xdist worker) and every test runs inside a transaction that is rolled back
+afterwards. Application code calling ``commit()`` only releases a SAVEPOINT,
+so tests stay isolated without recreating tables.
+"""
 import asyncio
+import os
+import tempfile
+
+# Keep the application's own engine off the shared ./test.db, one file per worker
+_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), f'task-manager-{_WORKER}.db')}",
+)
+# Log every request through the application's access log middleware (off by default)
+os.environ.setdefault("ACCESS_LOG_ENABLED", "true")
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "1.0")
+
 import pytest
 from typing import AsyncGenerator, Generator
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import Base, get_db
-from app.config import settings
+from app.database import Base, get_db, get_session_factory
 from app.models import User
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash, pwd_context
+from app.utils.response_cache import MemoryBackend, ResponseCache, get_response_cache
 
-# Test database URL
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+# Minimum bcrypt cost: hashing strength is irrelevant in tests and dominates runtime
+pwd_context.update(bcrypt__rounds=4)
 
-# Create test engine
-test_engine = create_async_engine(
-    TEST_DATABASE_URL,
-    echo=False,
-    future=True,
-)
+# Test database URL: private in-memory database per worker process
+TEST_DATABASE_URL = "sqlite+aiosqlite://"
 
-# Create test session factory
+# Sessions join the per-test transaction and turn commits into SAVEPOINTs
 TestSessionLocal = async_sessionmaker(
-    test_engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
+    join_transaction_mode="create_savepoint",
 )
 
 
+def _enable_savepoints(engine: AsyncEngine) -> None:
+    """Let SQLAlchemy emit BEGIN so SAVEPOINTs work; enforce foreign keys like the app does."""
+    @event.listens_for(engine.sync_engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
     """Create an event loop for the test session."""
@@ -39,30 +70,56 @@ def event_loop() -> Generator:
     loop.close()
 
 
-@pytest.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session."""
-    # Create tables
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+@pytest.fixture(scope="session")
+async def test_engine(event_loop) -> AsyncGenerator[AsyncEngine, None]:
+    """Create the test engine and schema once per session."""
+    # Requesting event_loop guarantees the loop outlives this fixture's teardown
+    engine = create_async_engine(TEST_DATABASE_URL, echo=False, poolclass=StaticPool)
+    _enable_savepoints(engine)
+    
+    async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
-    # Create session
-    async with TestSessionLocal() as session:
-        yield session
+    yield engine
     
-    # Drop tables
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture(scope="function")
+async def db_session(test_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create a test database session whose changes are rolled back after the test."""
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        session = TestSessionLocal(bind=conn)
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+@pytest.fixture
+def response_cache() -> ResponseCache:
+    """Empty response cache; ids are reused across rolled-back tests."""
+    return ResponseCache(MemoryBackend())
 
 
 @pytest.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(
+    db_session: AsyncSession, response_cache: ResponseCache
+) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client."""
     async def override_get_db():
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+    # Sessions opened by background work join the test transaction too
+    app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker(
+        db_session.bind,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
     
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -101,3 +158,31 @@ async def auth_token(client: AsyncClient, test_user: User) -> str:
 def auth_headers(auth_token: str) -> dict:
     """Get authentication headers."""
     return {"Authorization": f"Bearer {auth_token}"}
+
+
+@pytest.fixture
+async def test_superuser(db_session: AsyncSession) -> User:
+    """Create a test superuser."""
+    user = User(
+        email="admin@example.com",
+        username="adminuser",
+        full_name="Admin User",
+        hashed_password=get_password_hash("AdminPassword123!"),
+        is_active=True,
+        is_superuser=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+async def superuser_headers(client: AsyncClient, test_superuser: User) -> dict:
+    """Get authentication headers for the test superuser."""
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"username": "adminuser", "password": "AdminPassword123!"}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,124 @@
+"""Tests for the structured access log."""
+import json
+import logging
+import queue
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+
+from app.config import Settings
+from app.models import Task, User
+from app.utils.access_log import (
+    AccessLogMiddleware,
+    DroppingQueueHandler,
+    configure_access_log,
+    logger as access_logger,
+)
+
+
+def access_records(caplog) -> list:
+    return [record.access for record in caplog.records if record.name == "app.access"]
+
+
+@pytest.fixture
+def restore_access_logger():
+    """Undo configure_access_log's changes to the shared logger."""
+    handlers, propagate = list(access_logger.handlers), access_logger.propagate
+    yield
+    access_logger.handlers[:] = handlers
+    access_logger.propagate = propagate
+
+
+def sampled_app(sample_rate: float, slow_ms: float = 500.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Not here")
+
+    app.add_middleware(AccessLogMiddleware, sample_rate=sample_rate, slow_ms=slow_ms)
+    return app
+
+
+class TestAccessLog:
+    """Test cases for access log records."""
+
+    @pytest.mark.asyncio
+    async def test_record_fields(
+        self, client: AsyncClient, auth_headers: dict, db_session, test_user: User, caplog
+    ):
+        """Test a request is logged with its route template, user and database time."""
+        task = Task(title="Logged", owner_id=test_user.id)
+        db_session.add(task)
+        await db_session.commit()
+        caplog.set_level(logging.INFO, logger="app.access")
+
+        response = await client.get(f"/api/v1/tasks/{task.id}", headers=auth_headers)
+
+        record = access_records(caplog)[-1]
+        assert record["method"] == "GET"
+        assert record["route"] == "/api/v1/tasks/{task_id}"
+        assert record["path"] == f"/api/v1/tasks/{task.id}"
+        assert record["status"] == 200
+        assert record["user_id"] == test_user.id
+        assert record["db_queries"] >= 2 and record["db_ms"] > 0
+        assert record["bytes"] == len(response.content)
+        assert record["latency_ms"] >= record["db_ms"]
+
+    @pytest.mark.asyncio
+    async def test_successes_sampled_errors_kept(self, caplog):
+        """Test sampling skips successes but never errors."""
+        caplog.set_level(logging.INFO, logger="app.access")
+        async with AsyncClient(app=sampled_app(sample_rate=0), base_url="http://test") as client:
+            await client.get("/ok")
+            await client.get("/missing")
+
+        assert [record["status"] for record in access_records(caplog)] == [404]
+
+    @pytest.mark.asyncio
+    async def test_slow_requests_kept(self, caplog):
+        """Test requests over the slow threshold are always logged."""
+        caplog.set_level(logging.INFO, logger="app.access")
+        app = sampled_app(sample_rate=0, slow_ms=0)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/ok")
+
+        assert [record["route"] for record in access_records(caplog)] == ["/ok"]
+
+    def test_off_by_default(self):
+        """Test the access log is opt-in and samples sparingly once enabled."""
+        assert Settings.model_fields["ACCESS_LOG_ENABLED"].default is False
+        assert Settings.model_fields["ACCESS_LOG_SAMPLE_RATE"].default == 0.01
+
+
+class TestAccessLogWriter:
+    """Test cases for the background writer."""
+
+    def test_json_lines_written_by_listener(self, tmp_path, restore_access_logger):
+        """Test records reach the file as JSON lines once the writer has run."""
+        path = tmp_path / "access.log"
+        writer = configure_access_log(str(path))
+        writer.start()
+        access_logger.info("access", extra={"access": {"route": "/x", "status": 200}})
+        writer.stop()
+
+        line = json.loads(path.read_text().strip())
+        assert (line["route"], line["status"], line["level"]) == ("/x", 200, "info")
+        assert "time" in line
+
+    def test_full_queue_drops(self):
+        """Test a full queue drops records instead of blocking the caller."""
+        handler = DroppingQueueHandler(queue.Queue(1))
+        record = logging.makeLogRecord({"msg": "access"})
+
+        handler.handle(record)
+        handler.handle(record)
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
@@ -0,0 +1,132 @@
+"""Tests for account closure and batched purging."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import Task, TaskTombstone, User
+from app.utils.account_purge import close_account, purge_account, purge_closed_accounts
+
+
+@pytest.fixture
+def sessions(db_session: AsyncSession) -> async_sessionmaker:
+    """Session factory joining the test transaction."""
+    return async_sessionmaker(
+        db_session.bind, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+
+async def add_tasks(db: AsyncSession, owner_id: int, count: int) -> None:
+    await db.execute(insert(Task), [
+        {"title": f"Task {i}", "owner_id": owner_id} for i in range(count)
+    ])
+    await db.commit()
+
+
+async def count(db: AsyncSession, query) -> int:
+    return (await db.execute(query)).scalar()
+
+
+class TestAccountPurge:
+    """Test cases for account deletion."""
+    
+    @pytest.mark.asyncio
+    async def test_delete_me_purges_tasks(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test closing an account removes the user and every task."""
+        await add_tasks(db_session, test_user.id, 25)
+        
+        response = await client.delete("/api/v1/users/me", headers=auth_headers)
+        assert response.status_code == 204
+        
+        assert await count(db_session, select(func.count(User.id))) == 0
+        assert await count(db_session, select(func.count(Task.id))) == 0
+    
+    @pytest.mark.asyncio
+    async def test_closed_account_locked_out_before_purge(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test a closed account cannot log in or use its token while awaiting purge."""
+        await close_account(db_session, test_user)
+        assert test_user.is_active is False
+        
+        response = await client.get("/api/v1/users/me", headers=auth_headers)
+        assert response.status_code == 401
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"username": "testuser", "password": "TestPassword123!"}
+        )
+        assert response.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_purge_in_batches(self, sessions, db_session: AsyncSession, test_user: User):
+        """Test tasks are deleted in batch-sized transactions along with tombstones."""
+        await add_tasks(db_session, test_user.id, 25)
+        db_session.add(TaskTombstone(task_id=999, owner_id=test_user.id, change_seq=1))
+        await db_session.commit()
+        
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            deleted = await purge_account(sessions, test_user.id, batch_size=10)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        
+        assert len([s for s in statements if s.startswith("DELETE FROM tasks")]) == 3
+        assert deleted == 25
+        assert await count(db_session, select(func.count(Task.id))) == 0
+        assert await count(db_session, select(func.count(TaskTombstone.id))) == 0
+        assert await count(db_session, select(func.count(User.id))) == 0
+    
+    @pytest.mark.asyncio
+    async def test_sweep_finishes_interrupted_purges(
+        self,
+        sessions,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test the sweep purges accounts closed but never purged."""
+        await add_tasks(db_session, test_user.id, 5)
+        await close_account(db_session, test_user)
+        
+        assert await purge_closed_accounts(sessions) == 1
+        assert await count(db_session, select(func.count(Task.id))) == 0
+        assert await purge_closed_accounts(sessions) == 0
+    
+    @pytest.mark.asyncio
+    async def test_orm_delete_relies_on_database_cascade(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test deleting a user through the ORM does not load its tasks."""
+        await add_tasks(db_session, test_user.id, 10)
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            await db_session.delete(test_user)
+            await db_session.commit()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        
+        assert not any(s.startswith("SELECT") and "FROM tasks" in s for s in statements)
+        assert await count(db_session, select(func.count(Task.id))) == 0
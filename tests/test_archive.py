@@ -0,0 +1,193 @@
+"""Tests for archiving completed tasks and restoring them."""
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import ArchivedTask, Task, TaskStatus, User
+from app.utils.account_purge import purge_account
+from app.utils.archive import archive_completed_tasks
+from app.utils.response_cache import ResponseCache
+
+RETENTION = timedelta(days=90)
+
+
+@pytest.fixture
+def sessions(db_session: AsyncSession) -> async_sessionmaker:
+    """Session factory joining the test transaction."""
+    return async_sessionmaker(
+        db_session.bind, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+
+async def add_task(db: AsyncSession, owner_id: int, title: str, days_ago: int = 0,
+                   done: bool = False, edited_days_ago: int = None) -> int:
+    """Insert a task completed and last edited the given number of days ago."""
+    now = datetime.utcnow()
+    result = await db.execute(insert(Task).values(
+        title=title,
+        title_lower=title.lower(),
+        owner_id=owner_id,
+        status=TaskStatus.DONE if done else TaskStatus.TODO,
+        completed_at=now - timedelta(days=days_ago) if done else None,
+        created_at=now - timedelta(days=days_ago + 1),
+        updated_at=now - timedelta(days=days_ago if edited_days_ago is None else edited_days_ago),
+    ))
+    await db.commit()
+    return result.inserted_primary_key[0]
+
+
+async def ids(db: AsyncSession, entity) -> list:
+    return (await db.execute(select(entity.id).order_by(entity.id))).scalars().all()
+
+
+class TestArchiver:
+    """Test cases for the background archiver."""
+
+    @pytest.mark.asyncio
+    async def test_moves_only_expired_done_tasks(
+        self, db_session: AsyncSession, sessions: async_sessionmaker, test_user: User
+    ):
+        """Test old done tasks move in batches with their ids; everything else stays hot."""
+        old = [await add_task(db_session, test_user.id, f"Old {n}", 100, done=True)
+               for n in range(5)]
+        recent = await add_task(db_session, test_user.id, "Recent", 10, done=True)
+        edited = await add_task(db_session, test_user.id, "Edited", 100, done=True,
+                                edited_days_ago=1)
+        todo = await add_task(db_session, test_user.id, "Todo", 100)
+
+        assert await archive_completed_tasks(sessions, RETENTION, batch_size=2) == 5
+
+        assert await ids(db_session, Task) == [recent, edited, todo]
+        assert await ids(db_session, ArchivedTask) == old
+        archived = await db_session.get(ArchivedTask, old[0])
+        assert archived.title == "Old 0" and archived.archived_at is not None
+        assert await archive_completed_tasks(sessions, RETENTION) == 0
+
+    @pytest.mark.asyncio
+    async def test_archived_ids_not_reused(
+        self, db_session: AsyncSession, sessions: async_sessionmaker, test_user: User
+    ):
+        """Test new tasks never take the id of an archived task, even the highest one."""
+        first = await add_task(db_session, test_user.id, "First", 100, done=True)
+        last = await add_task(db_session, test_user.id, "Last", 100, done=True)
+
+        assert await archive_completed_tasks(sessions, RETENTION) == 2
+        created = await add_task(db_session, test_user.id, "Created")
+        assert await ids(db_session, ArchivedTask) == [first, last]
+        assert await ids(db_session, Task) == [created]
+        assert created > last
+
+    @pytest.mark.asyncio
+    async def test_purge_deletes_archived_tasks(
+        self, db_session: AsyncSession, sessions: async_sessionmaker, test_user: User
+    ):
+        """Test closing an account purges its archive too."""
+        await add_task(db_session, test_user.id, "Old", 100, done=True)
+        await add_task(db_session, test_user.id, "Todo")
+        await archive_completed_tasks(sessions, RETENTION)
+
+        assert await purge_account(sessions, test_user.id, batch_size=1) == 2
+        assert await ids(db_session, ArchivedTask) == []
+
+
+class TestArchivedReads:
+    """Test cases for reading and restoring archived tasks."""
+
+    @pytest.mark.asyncio
+    async def test_lists_hot_tasks_unless_asked(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        sessions: async_sessionmaker,
+        response_cache: ResponseCache,
+        test_user: User,
+    ):
+        """Test lists, search and lookups skip the archive without include_archived."""
+        old = await add_task(db_session, test_user.id, "Report 2025", 200, done=True)
+        older = await add_task(db_session, test_user.id, "Report 2024", 300, done=True)
+        active = await add_task(db_session, test_user.id, "Report draft")
+        assert (await client.get("/api/v1/tasks/", headers=auth_headers)).status_code == 200
+
+        assert await archive_completed_tasks(sessions, RETENTION, cache=response_cache) == 2
+
+        response = await client.get("/api/v1/tasks/", headers=auth_headers)
+        assert response.headers["X-Cache"] == "MISS"
+        assert [task["id"] for task in response.json()] == [active]
+
+        response = await client.get(
+            "/api/v1/tasks/?include_archived=true&title_prefix=report&sort=created_at"
+            "&envelope=true&fields=id,title",
+            headers=auth_headers,
+        )
+        page = response.json()
+        assert page["total"] == 3
+        assert page["items"] == [
+            {"id": older, "title": "Report 2024"},
+            {"id": old, "title": "Report 2025"},
+            {"id": active, "title": "Report draft"},
+        ]
+        response = await client.get(
+            "/api/v1/tasks/?include_archived=true&status=done", headers=auth_headers
+        )
+        assert [task["id"] for task in response.json()] == [old, older]
+
+        assert (await client.get(f"/api/v1/tasks/{old}", headers=auth_headers)).status_code == 404
+        response = await client.get(
+            f"/api/v1/tasks/{old}?include_archived=true", headers=auth_headers
+        )
+        assert response.json()["status"] == "done"
+
+    @pytest.mark.asyncio
+    async def test_restore(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        sessions: async_sessionmaker,
+        test_user: User,
+    ):
+        """Test a restored task is hot again, reaches sync clients and is not re-archived."""
+        task_id = await add_task(db_session, test_user.id, "Old", 100, done=True)
+        await add_task(db_session, test_user.id, "Todo")
+        await archive_completed_tasks(sessions, RETENTION)
+        token = (await client.get("/api/v1/tasks/changes", headers=auth_headers)).json()
+
+        response = await client.post(f"/api/v1/tasks/{task_id}/restore", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["id"] == task_id and response.json()["title"] == "Old"
+        assert await ids(db_session, ArchivedTask) == []
+        changes = (await client.get(
+            f"/api/v1/tasks/changes?since={token['next_token']}", headers=auth_headers
+        )).json()
+        assert [task["id"] for task in changes["changed"]] == [task_id]
+
+        assert await archive_completed_tasks(sessions, RETENTION) == 0
+        response = await client.post(f"/api/v1/tasks/{task_id}/restore", headers=auth_headers)
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_restore_other_users_task(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        sessions: async_sessionmaker,
+        test_user: User,
+    ):
+        """Test another user's archived task cannot be restored."""
+        other = User(email="other@example.com", username="other", hashed_password="x")
+        db_session.add(other)
+        await db_session.commit()
+        task_id = await add_task(db_session, other.id, "Theirs", 100, done=True)
+        await add_task(db_session, other.id, "Todo")
+        await archive_completed_tasks(sessions, RETENTION)
+
+        response = await client.post(f"/api/v1/tasks/{task_id}/restore", headers=auth_headers)
+
+        assert response.status_code == 404
+        assert (await db_session.execute(select(func.count(ArchivedTask.id)))).scalar() == 1
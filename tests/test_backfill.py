@@ -0,0 +1,230 @@
+"""Tests for chunked, resumable backfills."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    inspect,
+    select,
+    text,
+)
+
+from app.config import settings
+from app.models import Task, TaskPriority
+from app.utils.backfill import Backfill, checkpoints
+
+metadata = MetaData()
+
+items = Table(
+    "items",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(50)),
+    Column("name_upper", String(50)),
+)
+
+
+@pytest.fixture
+def connection(tmp_path):
+    """Connection to a SQLite file holding 95 items."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'backfill.db'}")
+    metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.execute(items.insert(), [{"id": i, "name": f"item{i}"} for i in range(1, 96)])
+        conn.commit()
+        yield conn
+    engine.dispose()
+
+
+def fill_upper(connection, lower, upper):
+    """Uppercase names in the key range."""
+    query = items.update().where(items.c.id <= upper).values(name_upper=items.c.name + "!")
+    if lower is not None:
+        query = query.where(items.c.id > lower)
+    connection.execute(query)
+
+
+class FakeClock:
+    """Clock that only moves when slept on or ticked."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestBackfill:
+    """Test cases for the backfill helper."""
+    
+    def test_processes_all_rows_in_batches(self, connection):
+        """Test every row is filled and the checkpoint is completed."""
+        seen = []
+        progress = Backfill(
+            "items_upper", items, apply=fill_upper, batch_size=10, on_progress=seen.append
+        ).run(connection)
+        
+        assert progress.completed
+        assert progress.batches == 10
+        assert progress.total_rows == 95
+        assert len(seen) == 10
+        missing = connection.execute(
+            select(items.c.id).where(items.c.name_upper.is_(None))
+        ).all()
+        assert missing == []
+        checkpoint = connection.execute(select(checkpoints)).one()
+        assert checkpoint.last_key == 95
+        assert checkpoint.completed_at is not None
+    
+    def test_resumes_after_interruption(self, connection):
+        """Test a failed run resumes from the last committed batch."""
+        calls = []
+        
+        def flaky(conn, lower, upper):
+            calls.append((lower, upper))
+            if len(calls) == 3:
+                raise RuntimeError("connection lost")
+            fill_upper(conn, lower, upper)
+        
+        with pytest.raises(RuntimeError):
+            Backfill("items_upper", items, apply=flaky, batch_size=10).run(connection)
+        connection.rollback()
+        assert connection.execute(select(checkpoints.c.last_key)).scalar() == 20
+        
+        progress = Backfill("items_upper", items, apply=fill_upper, batch_size=10).run(connection)
+        assert progress.completed
+        assert progress.rows == 75
+        assert progress.total_rows == 95
+        
+        # A completed backfill is a no-op
+        again = Backfill("items_upper", items, apply=flaky, batch_size=10).run(connection)
+        assert again.completed and again.batches == 0
+    
+    def test_throttle_and_eta(self, connection):
+        """Test the run is held to the target rate and reports an ETA."""
+        clock = FakeClock()
+        progress = Backfill(
+            "items_upper",
+            items,
+            apply=fill_upper,
+            batch_size=10,
+            rows_per_second=100,
+            clock=clock,
+            sleep=clock.sleep,
+        ).run(connection, max_batches=5)
+        
+        assert not progress.completed
+        assert clock.now == pytest.approx(0.5)
+        assert progress.rows_per_second == pytest.approx(100)
+        assert progress.eta_seconds == pytest.approx(0.4, abs=0.1)
+    
+    def test_invalid_batch_size(self):
+        """Test a zero batch size is rejected."""
+        with pytest.raises(ValueError):
+            Backfill("items_upper", items, apply=fill_upper, batch_size=0)
+
+
+def test_task_title_lower_tracks_title():
+    """Test the model keeps title_lower in step with title."""
+    task = Task(title="Write REPORT", owner_id=1)
+    assert task.title_lower == "write report"
+    task.title = "Ship It"
+    assert task.title_lower == "ship it"
+
+
+def test_task_priority_rank_tracks_priority():
+    """Test the model keeps priority_rank in step with priority."""
+    task = Task(title="Rank", priority=TaskPriority.HIGH, owner_id=1)
+    assert task.priority_rank == 3
+    task.priority = "low"
+    assert task.priority_rank == 1
+
+
+def run_alembic(command, *args):
+    """Run an Alembic command off the test event loop (env.py calls asyncio.run)."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(command, *args).result()
+
+
+def test_migrations_backfill_sqlite(tmp_path, monkeypatch):
+    """Test the sample migration adds and backfills tasks.title_lower."""
+    from alembic import command
+    from alembic.config import Config
+    
+    db_file = tmp_path / "migrated.db"
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite+aiosqlite:///{db_file}")
+    config = Config("alembic.ini")
+    
+    run_alembic(command.upgrade, config, "3b1f8c2d9a41")
+    engine = create_engine(f"sqlite:///{db_file}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users VALUES (1, 'a@example.com', 'a', 'x', NULL, 1, 0, "
+            "'2026-01-01', '2026-01-01')"
+        ))
+        for i in range(25):
+            conn.execute(text(
+                "INSERT INTO tasks (title, status, priority, created_at, updated_at, owner_id) "
+                "VALUES (:title, 'TODO', 'LOW', '2026-01-01', '2026-01-01', 1)"
+            ), {"title": f"Task ÄB {i}"})
+    
+    run_alembic(command.upgrade, config, "d7a3c9e1f5b2")
+    old_version_insert = text(
+        "INSERT INTO tasks (title, title_lower, status, priority, created_at, updated_at, "
+        "owner_id) VALUES ('Old worker', 'old worker', 'TODO', 'LOW', '2026-01-01', "
+        "'2026-01-01', 1)"
+    )
+    with engine.begin() as conn:
+        # Written by a worker still running the version before the change feed
+        conn.execute(old_version_insert)
+    
+        # The newest task was archived; its id must not be handed out again
+        conn.execute(text(
+            "INSERT INTO archived_tasks (id, title, status, priority, created_at, updated_at, "
+            "owner_id, archived_at) VALUES (100, 'Archived', 'DONE', 'LOW', '2026-01-01', "
+            "'2026-01-01', 1, '2026-01-01')"
+        ))
+    
+    run_alembic(command.upgrade, config, "head")
+    with engine.begin() as conn:
+        conn.execute(old_version_insert)
+    with engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT count(*) FROM tasks WHERE title_lower IS NULL"
+        )).scalar() == 0
+        assert conn.execute(text("SELECT title_lower FROM tasks WHERE id = 1")).scalar() == (
+            "task äb 0"
+        )
+        # The change feed migration numbers existing rows in insertion order
+        assert conn.execute(text(
+            "SELECT count(*) FROM tasks WHERE change_seq = id AND id <= 25"
+        )).scalar() == 25
+        # Rows written without a sequence are numbered after the backfilled ones
+        assert conn.execute(text(
+            "SELECT change_seq FROM tasks WHERE title = 'Old worker' ORDER BY id"
+        )).scalars().all() == [26, 27]
+        assert conn.execute(text("SELECT value FROM change_sequence")).scalar() == 27
+        assert conn.execute(text(
+            "SELECT id FROM tasks WHERE title = 'Old worker' ORDER BY id"
+        )).scalars().all() == [26, 101]
+        assert conn.execute(text(
+            "SELECT count(*) FROM tasks WHERE priority_rank = 1"
+        )).scalar() == 25
+    indexes = {index["name"] for index in inspect(engine).get_indexes("tasks")}
+    assert {
+        "ix_tasks_title_lower",
+        "ix_tasks_owner_id_change_seq",
+        "ix_tasks_owner_id_priority_rank_created_at",
+    } <= indexes
+    
+    run_alembic(command.downgrade, config, "base")
+    assert "tasks" not in inspect(engine).get_table_names()
+    engine.dispose()
@@ -0,0 +1,170 @@
+"""Tests for the request batching endpoint."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app import database
+from app.config import settings
+from app.database import Base, create_engines, create_read_session_factory, create_session_factory
+from app.main import app
+from app.models import User
+from app.utils import auth
+from app.utils.auth import create_access_token
+from app.utils.response_cache import MemoryBackend, ResponseCache, get_response_cache
+
+LAUNCH = [
+    {"path": "/api/v1/users/me"},
+    {"path": "/api/v1/tasks/stats/summary"},
+    {"path": "/api/v1/tasks/?limit=2"},
+    {"path": "/api/v1/tasks/?limit=2&skip=2"},
+]
+
+
+def statuses(response) -> list:
+    return [item["status"] for item in response.json()["responses"]]
+
+
+class TestBatch:
+    """Test cases for running API calls in one batch."""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_in_order_with_one_auth(
+        self, client: AsyncClient, auth_headers: dict, monkeypatch
+    ):
+        """Test calls are answered in order, see earlier writes and share one token decode."""
+        decode = auth.jwt.decode
+        decoded = []
+        monkeypatch.setattr(
+            auth.jwt, "decode", lambda *args, **kw: decoded.append(1) or decode(*args, **kw)
+        )
+
+        response = await client.post("/api/v1/batch", headers=auth_headers, json={"requests": [
+            {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Batched"}},
+            *LAUNCH,
+            {"path": "/api/v1/tasks/999999"},
+        ]})
+
+        assert response.status_code == 200
+        assert len(decoded) == 1
+        created, me, stats, page, _, missing = response.json()["responses"]
+        assert statuses(response) == [201, 200, 200, 200, 200, 404]
+        assert created["body"]["title"] == "Batched"
+        assert me["body"]["username"] == "testuser"
+        assert stats["body"]["total_tasks"] == 1
+        assert [task["title"] for task in page["body"]] == ["Batched"]
+        assert page["headers"]["content-type"] == "application/json"
+        assert missing["body"] == {"detail": "Task not found"}
+
+    @pytest.mark.asyncio
+    async def test_failing_calls_do_not_fail_the_batch(
+        self, client: AsyncClient, auth_headers: dict
+    ):
+        """Test unknown paths, bad methods, invalid bodies, nesting and streams fail alone."""
+        response = await client.post("/api/v1/batch", headers=auth_headers, json={"requests": [
+            {"path": "/api/v1/nothing"},
+            {"method": "PATCH", "path": "/api/v1/users/me"},
+            {"method": "POST", "path": "/api/v1/tasks/", "body": {}},
+            {"method": "POST", "path": "/api/v1/batch", "body": {"requests": LAUNCH}},
+            {"method": "POST", "path": "/api/v1/%62atch", "body": {"requests": LAUNCH}},
+            {"path": "/api/v1/tasks/events"},
+            {"path": "/api/v1/users/me", "headers": {"Authorization": "Bearer other"}},
+        ]})
+
+        assert response.status_code == 200
+        assert statuses(response) == [404, 405, 422, 400, 400, 400, 200]
+        assert response.json()["responses"][4]["body"] == {"detail": "Batches cannot be nested"}
+
+    @pytest.mark.asyncio
+    async def test_limits(self, client: AsyncClient, auth_headers: dict, monkeypatch):
+        """Test oversized batches, parallel writes and anonymous callers are refused."""
+        monkeypatch.setattr(settings, "BATCH_MAX_REQUESTS", 3)
+
+        too_many = await client.post(
+            "/api/v1/batch", headers=auth_headers, json={"requests": LAUNCH}
+        )
+        parallel_write = await client.post("/api/v1/batch", headers=auth_headers, json={
+            "requests": [{"method": "DELETE", "path": "/api/v1/tasks/1"}], "parallel": True,
+        })
+        anonymous = await client.post("/api/v1/batch", json={"requests": LAUNCH[:1]})
+        empty = await client.post("/api/v1/batch", headers=auth_headers, json={"requests": []})
+
+        assert too_many.status_code == 400
+        assert "maximum of 3 requests" in too_many.json()["detail"]
+        assert parallel_write.status_code == 400
+        assert anonymous.status_code == 401
+        assert empty.status_code == 422
+
+
+class TestBatchSessions:
+    """Test cases for the sessions batched calls run on."""
+
+    @pytest.fixture
+    async def batch_client(self, tmp_path, monkeypatch):
+        """The app on a throwaway database with real sessions, counting checkouts."""
+        monkeypatch.setattr(settings, "SQLITE_CONCURRENT_MODE", True)
+        writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'batch.db'}")
+        async with writer.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            user_id = (await conn.execute(User.__table__.insert().values(
+                email="batch@example.com", username="batch", hashed_password="x",
+                is_active=True, is_superuser=False,
+            ))).inserted_primary_key[0]
+        monkeypatch.setattr(database, "AsyncSessionLocal", create_session_factory(writer, reader))
+        monkeypatch.setattr(
+            database, "ReadSessionLocal", create_read_session_factory(writer, reader)
+        )
+        checkouts = []
+        for engine in (writer, reader):
+            event.listen(engine.sync_engine.pool, "checkout", lambda *args: checkouts.append(1))
+        app.dependency_overrides[get_response_cache] = lambda: ResponseCache(MemoryBackend())
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+        async with AsyncClient(app=app, base_url="http://test", headers=headers) as client:
+            yield client, checkouts
+        app.dependency_overrides.clear()
+        await writer.dispose()
+        await reader.dispose()
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_share_one_connection(self, batch_client):
+        """Test authentication and every read in a sequential batch use one checkout."""
+        client, checkouts = batch_client
+
+        response = await client.post("/api/v1/batch", json={"requests": LAUNCH})
+
+        assert statuses(response) == [200, 200, 200, 200]
+        assert len(checkouts) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_call_rolls_back_alone(self, batch_client):
+        """Test a failing write is rolled back and the calls after it still run."""
+        client, _ = batch_client
+
+        response = await client.post("/api/v1/batch", json={"requests": [
+            {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Kept"}},
+            {"method": "DELETE", "path": "/api/v1/tasks/999999"},
+            {"method": "PUT", "path": "/api/v1/users/me", "body": {"full_name": "Renamed"}},
+            {"path": "/api/v1/tasks/"},
+        ]})
+
+        _, _, renamed, tasks = response.json()["responses"]
+        assert statuses(response) == [201, 404, 200, 200]
+        assert renamed["body"]["full_name"] == "Renamed"
+        assert [task["title"] for task in tasks["body"]] == ["Kept"]
+
+    @pytest.mark.asyncio
+    async def test_parallel_calls(self, batch_client):
+        """Test a parallel batch answers like a sequential one."""
+        client, _ = batch_client
+        created = await client.post("/api/v1/batch", json={"requests": [
+            {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": f"Task {n}"}}
+            for n in range(3)
+        ]})
+
+        sequential = await client.post("/api/v1/batch", json={"requests": LAUNCH})
+        parallel = await client.post(
+            "/api/v1/batch", json={"requests": LAUNCH, "parallel": True}
+        )
+
+        assert statuses(created) == [201, 201, 201]
+        assert statuses(parallel) == [200, 200, 200, 200]
+        assert parallel.json() == sequential.json()
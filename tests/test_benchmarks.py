@@ -0,0 +1,131 @@
+"""Tests for the benchmark harness."""
+import argparse
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import _stamp_task_changes
+from app.utils.profiler import StackSampler
+from benchmarks import change_seq, group_commit
+from benchmarks.batch import launch, launch_calls
+from benchmarks.common import compare_results, percentile, summarize_latencies
+from benchmarks.load import SCENARIOS, run_scenario, seed
+from benchmarks.micro import CASES, measure
+
+
+class TestBenchmarkStats:
+    """Test cases for latency statistics and baseline comparison."""
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 99) == 0.0
+    
+    def test_summarize_latencies(self):
+        """Test the summary reports RPS and millisecond percentiles."""
+        summary = summarize_latencies([0.01] * 50, elapsed=0.5, errors=2)
+        assert summary["requests"] == 50
+        assert summary["errors"] == 2
+        assert summary["rps"] == 100.0
+        assert summary["p99_ms"] == 10.0
+    
+    def test_compare_flags_regressions(self):
+        """Test slower latency and lower throughput beyond the threshold are flagged."""
+        baseline = {"cases": {"list": {"rps": 100.0, "p95_ms": 10.0}, "stats": {"rps": 50.0}}}
+        current = {"cases": {"list": {"rps": 85.0, "p95_ms": 10.5}, "stats": {"rps": 49.0}}}
+        regressions = compare_results(baseline, current, threshold=0.1)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("list: rps")
+        assert compare_results(baseline, current, threshold=0.2) == []
+
+
+class TestLoadScenarios:
+    """Smoke test the load scenarios against the test client."""
+    
+    @pytest.mark.asyncio
+    async def test_scenarios_run_without_errors(self, client: AsyncClient):
+        """Test each scenario completes against the in-process app."""
+        ctx = await seed(client, users=1, tasks_per_user=3)
+        for name, scenario in SCENARIOS.items():
+            # The test client shares one session, so keep it to one worker
+            result = await run_scenario(client, ctx, scenario, requests=10, concurrency=1)
+            assert result["requests"] == 10, name
+            assert result["errors"] == 0, name
+
+
+class TestGroupCommitBenchmark:
+    """Smoke test the group commit benchmark."""
+    
+    @pytest.mark.asyncio
+    async def test_both_modes_insert_every_write(self):
+        """Test both modes complete every write on a throwaway database."""
+        args = argparse.Namespace(
+            url=None, writes=20, concurrency=5, batch_size=8, latency_ms=1.0
+        )
+        results = await group_commit.run(args)
+        assert results["cases"]["per_request_commit"]["requests"] == 20
+        assert results["cases"]["group_commit"]["requests"] == 20
+        assert results["cases"]["group_commit"]["mean_batch_size"] > 1
+
+
+class TestChangeSeqBenchmark:
+    """Smoke test the change sequence benchmark."""
+
+    @pytest.mark.asyncio
+    async def test_both_modes_insert_every_write(self):
+        """Test both modes complete every write and leave the listener in place."""
+        args = argparse.Namespace(url=None, writes=10, concurrency=3, hold_ms=0.0)
+        results = await change_seq.run(args)
+        assert results["cases"]["stamped"]["requests"] == 10
+        assert results["cases"]["unstamped"]["requests"] == 10
+        assert event.contains(Session, "before_flush", _stamp_task_changes)
+
+
+class TestBatchBenchmark:
+    """Smoke test the app launch benchmark."""
+    
+    @pytest.mark.asyncio
+    async def test_launch_cases_succeed(self, client: AsyncClient, auth_headers: dict):
+        """Test separate and batched launches load every call."""
+        paths = launch_calls(pages=2, page_size=5)
+        # The test client shares one session, so leave out the concurrent cases
+        for case in ("sequential", "batch"):
+            assert await launch(client, case, paths, auth_headers), case
+
+
+class TestMicroBenchmarks:
+    """Test cases for the micro-benchmark harness."""
+    
+    def test_cases_run(self):
+        """Test every registered case executes."""
+        assert {"jwt_decode", "serialize_task_response_100", "asgi_root_full_stack"} <= set(CASES)
+        for name, factory in CASES.items():
+            factory()(2)
+    
+    def test_measure_reports_per_op_time(self):
+        """Test measurement returns stable per-operation statistics."""
+        stats = measure(lambda n: sum(range(n)), rounds=3, target=0.01)
+        assert stats["rounds"] == 3
+        assert 0 < stats["min_us"] <= stats["median_us"]
+    
+    def test_stack_sampler_folded_output(self):
+        """Test the sampler records folded stacks of the calling thread."""
+        def busy():
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+        
+        with StackSampler(interval=0.001) as sampler:
+            busy()
+        
+        assert sampler.total > 0
+        line = sampler.folded().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert "busy (" in stack
@@ -0,0 +1,142 @@
+"""Tests for the task change feed."""
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task, TaskTombstone, User
+from app.utils.changes import purge_tombstones
+
+CHANGES = "/api/v1/tasks/changes"
+
+
+async def create(client: AsyncClient, headers: dict, title: str) -> int:
+    response = await client.post("/api/v1/tasks/", headers=headers, json={"title": title})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+class TestChangeFeed:
+    """Test cases for incremental task sync."""
+    
+    @pytest.mark.asyncio
+    async def test_full_then_incremental_sync(self, client: AsyncClient, auth_headers: dict):
+        """Test a sync returns changes after the token, deletions included."""
+        first = await create(client, auth_headers, "First")
+        second = await create(client, auth_headers, "Second")
+        
+        response = await client.get(CHANGES, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [task["id"] for task in data["changed"]] == [first, second]
+        assert data["deleted"] == []
+        assert data["has_more"] is False
+        token = data["next_token"]
+        
+        await client.put(f"/api/v1/tasks/{first}", headers=auth_headers, json={"status": "done"})
+        await client.delete(f"/api/v1/tasks/{second}", headers=auth_headers)
+        third = await create(client, auth_headers, "Third")
+        
+        data = (await client.get(CHANGES, headers=auth_headers, params={"since": token})).json()
+        assert [task["id"] for task in data["changed"]] == [first, third]
+        assert data["changed"][0]["status"] == "done"
+        assert data["deleted"] == [second]
+        assert data["next_token"] > token
+        
+        # Nothing new: same token back
+        token = data["next_token"]
+        again = await client.get(CHANGES, headers=auth_headers, params={"since": token})
+        assert again.json() == {
+            "changed": [], "deleted": [], "next_token": token, "has_more": False
+        }
+    
+    @pytest.mark.asyncio
+    async def test_rows_written_without_sequence_are_numbered(
+        self, client: AsyncClient, auth_headers: dict, db_session: AsyncSession, test_user: User
+    ):
+        """Test a task inserted without a change sequence, as an older version would, syncs."""
+        await create(client, auth_headers, "First")
+        token = (await client.get(CHANGES, headers=auth_headers)).json()["next_token"]
+        
+        await db_session.execute(insert(Task.__table__).values(
+            title="Old worker", owner_id=test_user.id, status="TODO", priority="MEDIUM",
+            created_at=datetime.utcnow(), updated_at=datetime.utcnow(),
+        ))
+        await create(client, auth_headers, "Second")
+        
+        data = (await client.get(CHANGES, headers=auth_headers, params={"since": token})).json()
+        assert [task["title"] for task in data["changed"]] == ["Old worker", "Second"]
+    
+    @pytest.mark.asyncio
+    async def test_paging(self, client: AsyncClient, auth_headers: dict):
+        """Test pages chain through next_token without gaps."""
+        ids = [await create(client, auth_headers, f"Task {i}") for i in range(5)]
+        await client.delete(f"/api/v1/tasks/{ids[0]}", headers=auth_headers)
+        
+        seen, deleted, token, has_more = [], [], 0, True
+        while has_more:
+            data = (await client.get(
+                CHANGES, headers=auth_headers, params={"since": token, "limit": 2}
+            )).json()
+            seen += [task["id"] for task in data["changed"]]
+            deleted += data["deleted"]
+            token, has_more = data["next_token"], data["has_more"]
+        assert seen == ids[1:]
+        assert deleted == [ids[0]]
+    
+    @pytest.mark.asyncio
+    async def test_other_users_changes_hidden(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test only the caller's changes are returned."""
+        other = User(email="other@example.com", username="other", hashed_password="x")
+        db_session.add(other)
+        await db_session.flush()
+        db_session.add(Task(title="Not mine", owner_id=other.id))
+        await db_session.commit()
+        
+        data = (await client.get(CHANGES, headers=auth_headers)).json()
+        assert data["changed"] == []
+    
+    @pytest.mark.asyncio
+    async def test_compaction_expires_old_tokens(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test purging old tombstones makes older tokens resync."""
+        task_id = await create(client, auth_headers, "Short lived")
+        token = (await client.get(CHANGES, headers=auth_headers)).json()["next_token"]
+        await client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+        await db_session.execute(
+            update(TaskTombstone).values(deleted_at=datetime.utcnow() - timedelta(days=60))
+        )
+        
+        assert await purge_tombstones(db_session, timedelta(days=30)) == 1
+        assert (await db_session.execute(select(TaskTombstone))).first() is None
+        
+        response = await client.get(CHANGES, headers=auth_headers, params={"since": token})
+        assert response.status_code == 410
+        # Full syncs are always allowed
+        response = await client.get(CHANGES, headers=auth_headers)
+        assert response.status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_since_query_uses_range_index(self, db_session: AsyncSession):
+        """Test the feed query is a range scan on (owner_id, change_seq)."""
+        query = (
+            select(Task).where(Task.owner_id == 1, Task.change_seq > 10).order_by(Task.change_seq)
+        )
+        compiled = query.compile(compile_kwargs={"literal_binds": True})
+        connection = await db_session.connection()
+        rows = (await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")).all()
+        detail = " ".join(row[-1] for row in rows)
+        assert "ix_tasks_owner_id_change_seq" in detail
+        assert "change_seq>" in detail.replace(" ", "")
+        assert "TEMP B-TREE" not in detail
@@ -0,0 +1,218 @@
+"""Tests for engine and session configuration."""
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.config import settings
+from app.database import (
+    Base,
+    RoutingSession,
+    create_engines,
+    create_read_session_factory,
+    create_session_factory,
+    get_db,
+    get_read_db,
+    use_writer,
+)
+from app.models import Task, User
+
+
+@pytest.fixture
+async def concurrent_engines(tmp_path, monkeypatch):
+    """Writer and reader engines in SQLite concurrent mode on a throwaway file."""
+    monkeypatch.setattr(settings, "SQLITE_CONCURRENT_MODE", True)
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'concurrent.db'}")
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield writer, reader
+    await writer.dispose()
+    await reader.dispose()
+
+
+class TestSQLiteConcurrentMode:
+    """Test cases for the SQLite concurrent deployment mode."""
+    
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, tmp_path):
+        """Test the default mode creates a single engine."""
+        engine, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'default.db'}")
+        assert reader is None
+        await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_in_memory_database_ignored(self, monkeypatch):
+        """Test concurrent mode does not split an in-memory database."""
+        monkeypatch.setattr(settings, "SQLITE_CONCURRENT_MODE", True)
+        engine, reader = create_engines("sqlite+aiosqlite://")
+        assert reader is None
+        await engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_pragmas_applied(self, concurrent_engines):
+        """Test connections are opened in WAL mode with a busy timeout."""
+        writer, reader = concurrent_engines
+        async with writer.connect() as conn:
+            assert (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar() == "wal"
+            busy_timeout = (await conn.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+            assert busy_timeout == settings.SQLITE_BUSY_TIMEOUT_MS
+            assert (await conn.exec_driver_sql("PRAGMA query_only")).scalar() == 0
+        async with reader.connect() as conn:
+            assert (await conn.exec_driver_sql("PRAGMA query_only")).scalar() == 1
+    
+    @pytest.mark.asyncio
+    async def test_reader_refuses_writes(self, concurrent_engines):
+        """Test the read-only engine cannot write."""
+        _, reader = concurrent_engines
+        async with reader.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("DELETE FROM tasks"))
+    
+    @pytest.mark.asyncio
+    async def test_session_routing(self, concurrent_engines):
+        """Test reads go to the reader until the transaction writes."""
+        writer, reader = concurrent_engines
+        factory = create_session_factory(writer, reader)
+        async with factory() as session:
+            sync_session = session.sync_session
+            assert isinstance(sync_session, RoutingSession)
+            assert sync_session.get_bind(clause=select(User)) is reader.sync_engine
+            assert sync_session.get_bind(clause=insert(User)) is writer.sync_engine
+            # Reads after a write stay on the writer until commit
+            assert sync_session.get_bind(clause=select(User)) is writer.sync_engine
+            await session.commit()
+            assert sync_session.get_bind(clause=select(User)) is reader.sync_engine
+            # A pinned session reads from the writer across commits
+            use_writer(session)
+            assert sync_session.get_bind(clause=select(User)) is writer.sync_engine
+            await session.commit()
+            assert sync_session.get_bind(clause=select(User)) is writer.sync_engine
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_and_reads(self, concurrent_engines):
+        """Test concurrent writers and readers all succeed."""
+        factory = create_session_factory(*concurrent_engines)
+        async with factory() as session:
+            user = User(email="wal@example.com", username="waluser", hashed_password="x")
+            session.add(user)
+            await session.commit()
+            owner_id = user.id
+        
+        async def write(n: int) -> None:
+            async with factory() as session:
+                session.add(Task(title=f"Task {n}", owner_id=owner_id))
+                await session.commit()
+        
+        async def read() -> int:
+            async with factory() as session:
+                result = await session.execute(select(Task).where(Task.owner_id == owner_id))
+                return len(result.scalars().all())
+        
+        await asyncio.gather(*(write(n) for n in range(20)), *(read() for _ in range(20)))
+        assert await read() == 20
+
+
+class TestRequestSessions:
+    """Test cases for the per-request session dependencies."""
+    
+    @pytest.fixture
+    async def session_app(self, concurrent_engines, monkeypatch):
+        """A small app on the concurrent engines, counting checkouts and commits."""
+        writer, reader = concurrent_engines
+        monkeypatch.setattr(database, "AsyncSessionLocal", create_session_factory(writer, reader))
+        monkeypatch.setattr(
+            database, "ReadSessionLocal", create_read_session_factory(writer, reader)
+        )
+        counts = {"writer": 0, "reader": 0, "commits": 0}
+        for name, engine in (("writer", writer), ("reader", reader)):
+            event.listen(
+                engine.sync_engine.pool, "checkout",
+                lambda *args, name=name: counts.__setitem__(name, counts[name] + 1),
+            )
+            event.listen(
+                engine.sync_engine, "commit",
+                lambda *args: counts.__setitem__("commits", counts["commits"] + 1),
+            )
+        
+        async def authenticate(db: AsyncSession = Depends(get_db)) -> int:
+            # Stands in for get_current_user: a query on the request's session
+            return (await db.execute(select(func.count(User.id)))).scalar()
+        
+        app = FastAPI()
+        
+        @app.get("/read")
+        async def read(users: int = Depends(authenticate), db: AsyncSession = Depends(get_read_db)):
+            return {"tasks": (await db.execute(select(func.count(Task.id)))).scalar()}
+        
+        @app.post("/write")
+        async def write(users: int = Depends(authenticate), db: AsyncSession = Depends(get_db)):
+            db.add(User(email="w@example.com", username="writer", hashed_password="x"))
+        
+        @app.get("/idle")
+        async def idle(db: AsyncSession = Depends(get_read_db)):
+            return {}
+        
+        async def tasks_db(db: AsyncSession = Depends(get_read_db)) -> AsyncSession:
+            # Like get_task_read_db: declares get_read_db one level down
+            return db
+        
+        @app.get("/nested")
+        async def nested(users: int = Depends(authenticate), db: AsyncSession = Depends(tasks_db)):
+            return {"tasks": (await db.execute(select(func.count(Task.id)))).scalar()}
+        
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client, counts
+    
+    @pytest.mark.asyncio
+    async def test_read_request_uses_one_read_only_checkout(self, session_app):
+        """Test authentication and a read endpoint share one reader connection."""
+        client, counts = session_app
+        
+        response = await client.get("/read")
+        
+        assert response.status_code == 200
+        assert counts == {"writer": 0, "reader": 1, "commits": 0}
+    
+    @pytest.mark.asyncio
+    async def test_write_request_commits(self, session_app):
+        """Test a write endpoint's session is committed at the end of the request."""
+        client, counts = session_app
+        
+        await client.post("/write")
+        
+        # Authentication's read included: the write must apply to what was read
+        assert counts == {"writer": 1, "reader": 0, "commits": 1}
+        async with database.AsyncSessionLocal() as session:
+            assert (await session.execute(select(func.count(User.id)))).scalar() == 1
+    
+    @pytest.mark.asyncio
+    async def test_nested_read_dependency(self, session_app):
+        """Test get_read_db declared by another dependency still makes the request read-only."""
+        client, counts = session_app
+        
+        response = await client.get("/nested")
+        
+        assert response.status_code == 200
+        assert counts == {"writer": 0, "reader": 1, "commits": 0}
+    
+    @pytest.mark.asyncio
+    async def test_no_query_no_checkout(self, session_app):
+        """Test a request that never queries never checks out a connection."""
+        client, counts = session_app
+        
+        await client.get("/idle")
+        
+        assert counts == {"writer": 0, "reader": 0, "commits": 0}
+    
+    @pytest.mark.asyncio
+    async def test_read_only_session_refuses_writes(self, concurrent_engines):
+        """Test read-only sessions cannot write."""
+        factory = create_read_session_factory(*concurrent_engines)
+        async with factory() as session:
+            with pytest.raises(OperationalError):
+                await session.execute(text("DELETE FROM tasks"))
@@ -0,0 +1,173 @@
+"""Tests for task change events and the SSE stream."""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.utils.events import (
+    RESYNC,
+    EventBackend,
+    EventHub,
+    LocalBackend,
+    LocalBroker,
+    event_hub,
+    event_stream,
+)
+
+
+def message(owner_id: int, seq: int) -> dict:
+    return {"type": "task.updated", "owner_id": owner_id, "task_id": 1, "change_seq": seq}
+
+
+async def next_message(subscription) -> dict:
+    return await asyncio.wait_for(subscription.queue.get(), timeout=1)
+
+
+class TestEventHub:
+    """Test cases for the in-process hub and backends."""
+    
+    def test_incomplete_backend_rejected(self):
+        """Test a backend that cannot publish cannot be built."""
+        class ReceiveOnlyBackend(EventBackend):
+            async def start(self, deliver):
+                pass
+        
+        with pytest.raises(TypeError):
+            ReceiveOnlyBackend()
+    
+    @pytest.mark.asyncio
+    async def test_fan_out_to_owner_only(self):
+        """Test events reach every connection of the owner and nobody else."""
+        hub = EventHub()
+        await hub.start()
+        mine = [hub.subscribe(1), hub.subscribe(1)]
+        other = hub.subscribe(2)
+        
+        hub.publish(message(1, 5))
+        for subscription in mine:
+            assert (await next_message(subscription))["change_seq"] == 5
+        assert other.queue.empty()
+        await hub.close()
+    
+    @pytest.mark.asyncio
+    async def test_shared_broker_reaches_other_workers(self):
+        """Test hubs on one broker behave like workers sharing a backend."""
+        broker = LocalBroker()
+        worker_a = EventHub(LocalBackend(broker))
+        worker_b = EventHub(LocalBackend(broker))
+        subscription = worker_b.subscribe(1)
+        await worker_b.start()
+        
+        worker_a.publish(message(1, 7))
+        assert (await next_message(subscription))["change_seq"] == 7
+        await worker_a.close()
+        await worker_b.close()
+        assert broker.receivers == []
+    
+    def test_slow_subscriber_dropped_with_resync(self):
+        """Test a full queue is replaced by a single resync message."""
+        hub = EventHub(queue_size=2)
+        slow = hub.subscribe(1)
+        for seq in range(3):
+            hub.deliver(message(1, seq))
+        
+        assert slow.queue.qsize() == 1
+        assert slow.queue.get_nowait() is RESYNC
+        assert hub.dropped == 1
+        assert hub.subscriber_count == 0
+        hub.deliver(message(1, 4))
+        assert slow.queue.empty()
+    
+    def test_subscriber_limit(self):
+        """Test subscriptions beyond the limit are refused."""
+        hub = EventHub(max_subscribers=1)
+        assert hub.subscribe(1) is not None
+        assert hub.full
+        assert hub.subscribe(2) is None
+
+
+class TestEventStream:
+    """Test cases for SSE rendering."""
+    
+    @pytest.mark.asyncio
+    async def test_stream_heartbeats_events_and_resync(self):
+        """Test the stream sends heartbeats, events with ids, and ends on resync."""
+        hub = EventHub(queue_size=1, heartbeat=0.01)
+        await hub.start()
+        stream = event_stream(hub, 1, last_event_id=3)
+        
+        assert await stream.__anext__() == "retry: 3000\n\n"
+        assert await stream.__anext__() == 'event: resync\ndata: {"since": 3}\n\n'
+        assert await stream.__anext__() == ": heartbeat\n\n"
+        
+        hub.deliver(message(1, 8))
+        chunk = await stream.__anext__()
+        assert chunk.startswith("id: 8\nevent: task.updated\ndata: ")
+        
+        hub.deliver(message(1, 9))
+        hub.deliver(message(1, 10))
+        assert await stream.__anext__() == 'event: resync\ndata: {"since": 8}\n\n'
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert hub.subscriber_count == 0
+        await hub.close()
+    
+    @pytest.mark.asyncio
+    async def test_stream_closed_by_client(self):
+        """Test closing the stream releases the subscription."""
+        hub = EventHub()
+        stream = event_stream(hub, 1)
+        await stream.__anext__()
+        assert hub.subscriber_count == 1
+        await stream.aclose()
+        assert hub.subscriber_count == 0
+
+
+class TestTaskEvents:
+    """Test cases for events published by task writes."""
+    
+    @pytest.mark.asyncio
+    async def test_writes_publish_events(self, client: AsyncClient, auth_headers: dict, test_user):
+        """Test create, update and delete publish events after commit."""
+        await event_hub.start()
+        subscription = event_hub.subscribe(test_user.id)
+        try:
+            response = await client.post(
+                "/api/v1/tasks/", headers=auth_headers, json={"title": "Pushed"}
+            )
+            task_id = response.json()["id"]
+            created = await next_message(subscription)
+            assert created["type"] == "task.created"
+            assert created["task"]["title"] == "Pushed"
+            
+            await client.put(
+                f"/api/v1/tasks/{task_id}", headers=auth_headers, json={"status": "done"}
+            )
+            updated = await next_message(subscription)
+            assert updated["type"] == "task.updated"
+            assert updated["task"]["status"] == "done"
+            assert updated["change_seq"] > created["change_seq"]
+            
+            await client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+            deleted = await next_message(subscription)
+            assert deleted == {
+                "type": "task.deleted",
+                "owner_id": test_user.id,
+                "task_id": task_id,
+                "change_seq": updated["change_seq"] + 1,
+            }
+        finally:
+            event_hub.unsubscribe(subscription)
+    
+    @pytest.mark.asyncio
+    async def test_events_endpoint_requires_auth(self, client: AsyncClient):
+        """Test the stream needs authentication."""
+        response = await client.get("/api/v1/tasks/events")
+        assert response.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_events_endpoint_full(self, client: AsyncClient, auth_headers: dict, monkeypatch):
+        """Test a full worker answers 503."""
+        monkeypatch.setattr(event_hub, "max_subscribers", 0)
+        response = await client.get("/api/v1/tasks/events", headers=auth_headers)
+        assert response.status_code == 503
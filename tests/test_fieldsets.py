@@ -0,0 +1,116 @@
+"""Tests for sparse fieldsets on task reads."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task, User
+from app.utils.fieldsets import UnknownFields, parse_fields, sparse_task_model
+
+
+@pytest.fixture
+async def task(db_session: AsyncSession, test_user: User) -> Task:
+    """A task with a long description."""
+    task = Task(title="Write report", description="x" * 5000, owner_id=test_user.id)
+    db_session.add(task)
+    await db_session.commit()
+    return task
+
+
+@pytest.fixture
+def statements(db_session: AsyncSession):
+    """SQL statements executed during the test."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def task_selects(statements):
+    """Column lists of the SELECTs on tasks."""
+    return [
+        s.split("FROM tasks")[0] for s in statements if s.startswith("SELECT") and "FROM tasks" in s
+    ]
+
+
+class TestParseFields:
+    """Test cases for the fields parameter."""
+
+    def test_orders_and_deduplicates(self):
+        """Test fieldsets are canonical so equal ones share a model."""
+        assert parse_fields("status, id,title,id") == ("title", "status", "id")
+        model = sparse_task_model(parse_fields("title,id"))
+        assert model is sparse_task_model(parse_fields("id,title"))
+
+    def test_missing_or_empty_means_all(self):
+        """Test no fields parameter keeps the full response."""
+        assert parse_fields(None) is None
+        assert parse_fields(" , ") is None
+
+    def test_rejects_unknown(self):
+        """Test unknown and non-response attributes are rejected."""
+        with pytest.raises(UnknownFields) as exc:
+            parse_fields("id,title_lower,hashed")
+        assert exc.value.names == ["hashed", "title_lower"]
+
+
+class TestSparseFieldsets:
+    """Test cases for ?fields= on task reads."""
+
+    @pytest.mark.asyncio
+    async def test_list_returns_only_requested_fields(
+        self, client: AsyncClient, auth_headers: dict, task: Task, statements
+    ):
+        """Test list responses and queries are trimmed to the fieldset."""
+        statements.clear()
+        response = await client.get(
+            "/api/v1/tasks/?fields=id,title,status,due_date", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"id": task.id, "title": "Write report", "status": "todo", "due_date": None}
+        ]
+        [query] = task_selects(statements)
+        assert "tasks.description" not in query
+        assert "tasks.created_at" not in query
+
+    @pytest.mark.asyncio
+    async def test_default_list_is_unchanged(
+        self, client: AsyncClient, auth_headers: dict, task: Task
+    ):
+        """Test the list without fields still returns every field."""
+        response = await client.get("/api/v1/tasks/", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()[0]["description"] == "x" * 5000
+        assert response.json()[0]["created_at"] == task.created_at.isoformat()
+
+    @pytest.mark.asyncio
+    async def test_get_task_with_fields(
+        self, client: AsyncClient, auth_headers: dict, task: Task
+    ):
+        """Test a single task is trimmed to the fieldset."""
+        response = await client.get(
+            f"/api/v1/tasks/{task.id}?fields=title,created_at", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "title": "Write report",
+            "created_at": task.created_at.isoformat(),
+        }
+
+    @pytest.mark.asyncio
+    async def test_unknown_field_is_rejected(self, client: AsyncClient, auth_headers: dict):
+        """Test unknown fields return 400 listing the allowed ones."""
+        response = await client.get("/api/v1/tasks/?fields=id,secret", headers=auth_headers)
+
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+        assert "description" in response.json()["detail"]
@@ -0,0 +1,119 @@
+"""Tests for the liveness and readiness probes."""
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import main
+from app.utils.health import HealthMonitor, pool_saturation
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    """An engine with a one-connection pool, so a single checkout saturates it."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'health.db'}", pool_size=1, max_overflow=0
+    )
+    yield engine
+    await engine.dispose()
+
+
+class TestHealthMonitor:
+    """Test cases for the readiness measurements."""
+
+    @pytest.mark.asyncio
+    async def test_ready_after_ping(self, file_engine):
+        """Test a running monitor with a successful ping reports ready."""
+        monitor = HealthMonitor({"primary": file_engine})
+        assert monitor.readiness()["ready"] is False
+        monitor._runner = asyncio.get_running_loop().create_future()  # counts as running
+
+        # Ping, then sample, as the monitor does: sampling mid-ping would see the checkout
+        assert await monitor.ping() is True
+        monitor.sample(0.0)
+        report = monitor.readiness()
+        await monitor.close()
+
+        assert report["ready"] is True and report["reasons"] == []
+        assert report["database"]["ok"] and report["database"]["ping_ms"] >= 0
+        assert report["pool_saturation"] == {"primary": 0.0}
+        assert "monitor not running" in monitor.readiness()["reasons"]
+
+    @pytest.mark.asyncio
+    async def test_exhausted_pool_not_ready(self, file_engine):
+        """Test a fully checked out pool saturates and makes the ping time out."""
+        monitor = HealthMonitor({"primary": file_engine}, ping_timeout=0.05)
+        monitor._runner = asyncio.get_running_loop().create_future()  # counts as running
+
+        async with file_engine.connect():
+            assert pool_saturation(file_engine) == 1.0
+            monitor.sample(0.0)
+            assert await monitor.ping() is False
+
+        report = monitor.readiness()
+        assert report["ready"] is False
+        assert report["reasons"] == ["database unavailable", "primary pool saturated"]
+        assert report["database"]["error"] == "TimeoutError"
+
+    @pytest.mark.asyncio
+    async def test_loop_lag_not_ready(self, file_engine):
+        """Test sustained event loop lag flips readiness until it averages out."""
+        monitor = HealthMonitor(
+            {"primary": file_engine}, sample_interval=1, ping_interval=2, max_loop_lag_ms=100
+        )
+        monitor._runner = asyncio.get_running_loop().create_future()
+        await monitor.ping()
+
+        monitor.sample(0.3)
+        assert monitor.readiness()["reasons"] == ["event loop lagging"]
+        monitor.sample(0.0)
+        monitor.sample(0.0)
+        assert monitor.readiness()["ready"] is True
+
+    def test_unsized_pools_skipped(self, test_engine):
+        """Test pools without a fixed size report no saturation."""
+        assert pool_saturation(test_engine) is None
+
+
+class TestHealthEndpoints:
+    """Test cases for the probe endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_live(self, client: AsyncClient):
+        """Test liveness does not depend on the monitor."""
+        response = await client.get("/health/live")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    @pytest.mark.asyncio
+    async def test_ready_status_codes(self, client: AsyncClient, file_engine, monkeypatch):
+        """Test readiness answers 503 until the monitor has a fresh ping, then 200."""
+        monitor = HealthMonitor({"primary": file_engine})
+        monkeypatch.setattr(main, "health_monitor", monitor)
+
+        response = await client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "not_ready"
+
+        monitor._runner = asyncio.get_running_loop().create_future()
+        await monitor.ping()
+        response = await client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert (await client.get("/health")).json()["database"] == "connected"
+
+    @pytest.mark.asyncio
+    async def test_probe_is_cheap(self, file_engine):
+        """Test computing readiness stays well under a millisecond."""
+        monitor = HealthMonitor({"primary": file_engine})
+        for _ in range(10):
+            monitor.sample(0.0)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            monitor.readiness()
+
+        assert (time.perf_counter() - started) / 1000 < 0.001
@@ -0,0 +1,105 @@
+"""Tests for the paginated task envelope."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Task, TaskStatus, User
+
+
+@pytest.fixture
+async def seven_tasks(db_session: AsyncSession, test_user: User) -> None:
+    """Seven tasks, two of them done."""
+    for i in range(7):
+        status = TaskStatus.DONE if i < 2 else TaskStatus.TODO
+        db_session.add(Task(title=f"Task {i}", status=status, owner_id=test_user.id))
+    await db_session.commit()
+
+
+async def get_page(client: AsyncClient, headers: dict, query: str) -> dict:
+    response = await client.get(f"/api/v1/tasks/?envelope=true&{query}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+class TestPaginatedEnvelope:
+    """Test cases for GET /tasks/?envelope=true."""
+
+    @pytest.mark.asyncio
+    async def test_pages_carry_total_and_has_more(
+        self, client: AsyncClient, auth_headers: dict, seven_tasks
+    ):
+        """Test has_more and total across pages."""
+        first = await get_page(client, auth_headers, "limit=5")
+        second = await get_page(client, auth_headers, "skip=5&limit=5")
+
+        assert (len(first["items"]), first["total"], first["has_more"]) == (5, 7, True)
+        assert (len(second["items"]), second["total"], second["has_more"]) == (2, 7, False)
+        assert first["estimated"] is False
+        assert {"skip", "limit"} <= first.keys()
+
+    @pytest.mark.asyncio
+    async def test_total_comes_with_the_page(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        seven_tasks,
+    ):
+        """Test items and total are fetched by a single statement."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM tasks" in statement:
+                statements.append(statement)
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            page = await get_page(client, auth_headers, "status=todo&limit=2")
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert (page["total"], page["has_more"]) == (5, True)
+        assert len(statements) == 1
+        assert "count(*)" in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_past_the_end(self, client: AsyncClient, auth_headers: dict, seven_tasks):
+        """Test an empty page beyond the last task still reports the total."""
+        page = await get_page(client, auth_headers, "skip=20")
+
+        assert (page["items"], page["total"], page["has_more"]) == ([], 7, False)
+
+    @pytest.mark.asyncio
+    async def test_no_tasks(self, client: AsyncClient, auth_headers: dict):
+        """Test an empty account."""
+        page = await get_page(client, auth_headers, "")
+
+        assert (page["items"], page["total"], page["has_more"]) == ([], 0, False)
+
+    @pytest.mark.asyncio
+    async def test_estimate_is_capped(
+        self, client: AsyncClient, auth_headers: dict, seven_tasks, monkeypatch
+    ):
+        """Test estimated totals stop at the cap but never trail the page."""
+        monkeypatch.setattr(settings, "PAGE_TOTAL_ESTIMATE_CAP", 3)
+
+        first = await get_page(client, auth_headers, "estimate=true&limit=2")
+        later = await get_page(client, auth_headers, "estimate=true&skip=4&limit=2")
+        small = await get_page(client, auth_headers, "estimate=true&status=done")
+
+        assert (first["total"], first["estimated"]) == (3, True)
+        assert (later["total"], later["has_more"], later["estimated"]) == (7, True, True)
+        assert (small["total"], small["estimated"]) == (2, False)
+
+    @pytest.mark.asyncio
+    async def test_envelope_with_fields(
+        self, client: AsyncClient, auth_headers: dict, seven_tasks
+    ):
+        """Test sparse fieldsets apply to the envelope's items."""
+        page = await get_page(client, auth_headers, "fields=title&limit=1&sort=created_at")
+
+        assert page["items"] == [{"title": "Task 0"}]
+        assert (page["total"], page["has_more"]) == (7, True)
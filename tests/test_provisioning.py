@@ -0,0 +1,123 @@
+"""Tests for bulk user provisioning."""
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.models import User
+from app.provision import load_rows
+from app.utils.provisioning import shutdown_hash_pool
+
+
+@pytest.fixture(scope="module", autouse=True)
+def hash_pool():
+    """Stop the hashing workers once the module is done."""
+    yield
+    shutdown_hash_pool()
+
+
+def _user(n: int, **overrides) -> dict:
+    row = {
+        "email": f"bulk{n}@example.com",
+        "username": f"bulk{n}",
+        "password": "BulkPassword123!",
+    }
+    row.update(overrides)
+    return row
+
+
+class TestBulkProvisioning:
+    """Test cases for bulk user provisioning."""
+    
+    @pytest.mark.asyncio
+    async def test_bulk_create_users(self, client: AsyncClient, superuser_headers: dict):
+        """Test provisioning a batch of valid users."""
+        response = await client.post(
+            "/api/v1/users/bulk",
+            headers=superuser_headers,
+            json={"users": [_user(n) for n in range(3)]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 3
+        assert data["failed"] == 0
+        assert data["users_per_second"] > 0
+        
+        login_response = await client.post(
+            "/api/v1/auth/login",
+            json={"username": "bulk1", "password": "BulkPassword123!"}
+        )
+        assert login_response.status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_bulk_reports_row_failures(
+        self,
+        client: AsyncClient,
+        superuser_headers: dict,
+        test_user: User
+    ):
+        """Test invalid, duplicate and colliding rows are reported per row."""
+        rows = [
+            _user(0),
+            _user(1, password="weak"),
+            _user(2, username="bulk0"),
+            _user(3, username="testuser"),
+            _user(4, email="test@example.com"),
+        ]
+        response = await client.post(
+            "/api/v1/users/bulk",
+            headers=superuser_headers,
+            json={"users": rows}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 4
+        details = {failure["index"]: failure["detail"] for failure in data["failures"]}
+        assert "password" in details[1]
+        assert details[2] == "Duplicate username in batch"
+        assert details[3] == "Username already registered"
+        assert details[4] == "Email already registered"
+    
+    @pytest.mark.asyncio
+    async def test_bulk_requires_superuser(self, client: AsyncClient, auth_headers: dict):
+        """Test regular users cannot provision users."""
+        response = await client.post(
+            "/api/v1/users/bulk",
+            headers=auth_headers,
+            json={"users": [_user(0)]}
+        )
+        assert response.status_code == 403
+    
+    @pytest.mark.asyncio
+    async def test_bulk_rejects_oversized_batch(
+        self,
+        client: AsyncClient,
+        superuser_headers: dict,
+        monkeypatch
+    ):
+        """Test batches above the configured maximum are rejected."""
+        monkeypatch.setattr(settings, "BULK_PROVISION_MAX_USERS", 2)
+        response = await client.post(
+            "/api/v1/users/bulk",
+            headers=superuser_headers,
+            json={"users": [_user(n) for n in range(3)]}
+        )
+        assert response.status_code == 400
+
+
+def test_load_rows_formats(tmp_path):
+    """Test the CLI reads CSV and JSON lines input."""
+    csv_file = tmp_path / "users.csv"
+    csv_file.write_text(
+        "email,username,full_name,password\n"
+        "a@example.com,usera,,Password123!\n"
+    )
+    assert load_rows(csv_file) == [
+        {"email": "a@example.com", "username": "usera", "password": "Password123!"}
+    ]
+    
+    jsonl_file = tmp_path / "users.jsonl"
+    jsonl_file.write_text("\n".join(json.dumps(_user(n)) for n in range(2)))
+    assert [row["username"] for row in load_rows(jsonl_file)] == ["bulk0", "bulk1"]
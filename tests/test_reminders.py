@@ -0,0 +1,320 @@
+"""Tests for due-date reminders and the job lease."""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import Task, TaskStatus, User
+from app.utils import changes
+from app.utils.changes import run_tombstone_compaction
+from app.utils.events import task_event
+from app.utils.leases import Lease
+from app.utils.reminders import LEASE_NAME, ReminderScheduler, ReminderSink
+
+START = datetime(2026, 10, 19, 12, 0, 0)
+
+
+class FakeClock:
+    """UTC clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = START
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+        await asyncio.sleep(0)
+
+
+class RecordingSink(ReminderSink):
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, reminder):
+        self.sent.append(reminder)
+
+
+class FlakySink(RecordingSink):
+    """Sink refusing the first ``failures`` reminders."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def send(self, reminder):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink unavailable")
+        await super().send(reminder)
+
+
+@pytest.fixture
+def sessions(db_session: AsyncSession) -> async_sessionmaker:
+    """Session factory joining the test transaction."""
+    return async_sessionmaker(
+        db_session.bind, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def scheduler(sessions, clock, holder="worker-1", sink=None, **kwargs) -> ReminderScheduler:
+    lease = Lease(sessions, LEASE_NAME, ttl=30, holder=holder, clock=clock)
+    return ReminderScheduler(
+        [sessions], sink or RecordingSink(), lease, window=300, clock=clock, **kwargs
+    )
+
+
+async def add_task(db: AsyncSession, owner: User, title: str, due_in: float = None,
+                   status: TaskStatus = TaskStatus.TODO) -> Task:
+    due_date = START + timedelta(seconds=due_in) if due_in is not None else None
+    task = Task(title=title, owner_id=owner.id, due_date=due_date, status=status)
+    db.add(task)
+    await db.commit()
+    return task
+
+
+def titles(reminders: ReminderScheduler) -> list:
+    return [reminder["title"] for reminder in reminders.sink.sent]
+
+
+class TestReminderScheduler:
+    """Test cases for loading and sending reminders."""
+
+    @pytest.mark.asyncio
+    async def test_sends_due_tasks_in_order(
+        self, db_session: AsyncSession, sessions, clock: FakeClock, test_user: User
+    ):
+        """Test open tasks in the window are sent at their due date, earliest first."""
+        await add_task(db_session, test_user, "Later", 10)
+        await add_task(db_session, test_user, "Sooner", 5)
+        await add_task(db_session, test_user, "Next hour", 3600)
+        await add_task(db_session, test_user, "Done", 3, TaskStatus.DONE)
+        await add_task(db_session, test_user, "Overdue", -60)
+        await add_task(db_session, test_user, "Undated")
+        reminders = scheduler(sessions, clock)
+
+        assert await reminders.step() == pytest.approx(5)
+        assert len(reminders.entries) == 2
+        clock.advance(5)
+        assert await reminders.step() == pytest.approx(5)
+        assert titles(reminders) == ["Sooner"]
+        clock.advance(5)
+        await reminders.step()
+        assert titles(reminders) == ["Sooner", "Later"]
+        assert reminders.sink.sent[0]["type"] == "task.reminder"
+        assert reminders.sink.sent[0]["owner_id"] == test_user.id
+
+        clock.advance(3590)
+        await reminders.step()
+        assert titles(reminders) == ["Sooner", "Later", "Next hour"]
+        assert reminders.lease.checkpoint == clock.now
+
+    @pytest.mark.asyncio
+    async def test_lead_time(
+        self, db_session: AsyncSession, sessions, clock: FakeClock, test_user: User
+    ):
+        """Test reminders go out ``lead`` seconds before the due date."""
+        await add_task(db_session, test_user, "Meeting", 610)
+        reminders = scheduler(sessions, clock, lead=600)
+
+        assert await reminders.step() == pytest.approx(10)
+        clock.advance(10)
+        await reminders.step()
+        assert titles(reminders) == ["Meeting"]
+
+    @pytest.mark.asyncio
+    async def test_failed_send_is_retried(
+        self, db_session: AsyncSession, sessions, clock: FakeClock, test_user: User
+    ):
+        """Test a reminder the sink refuses is retried, and a successor sends it too."""
+        await add_task(db_session, test_user, "Refused", 10)
+        await add_task(db_session, test_user, "Queued", 10)
+        reminders = scheduler(sessions, clock, sink=FlakySink(2), retry=5)
+
+        await reminders.step()
+        clock.advance(10)
+        assert await reminders.step() == pytest.approx(5)
+        assert titles(reminders) == []
+        assert len(reminders.entries) == 2
+        assert reminders.sent_through < clock.now
+
+        clock.advance(5)
+        assert await reminders.step() == pytest.approx(5)
+        assert titles(reminders) == []
+        await reminders.lease.release()  # the worker dies with both unsent
+
+        successor = scheduler(sessions, clock, holder="worker-2")
+        await successor.step()
+        assert sorted(titles(successor)) == ["Queued", "Refused"]
+
+        clock.advance(5)
+        await reminders.step()
+        assert titles(reminders) == []
+
+    @pytest.mark.asyncio
+    async def test_task_events_update_heap(
+        self, db_session: AsyncSession, sessions, clock: FakeClock, test_user: User
+    ):
+        """Test created, rescheduled, completed and deleted tasks keep the heap exact."""
+        reminders = scheduler(sessions, clock)
+        await reminders.step()
+        created = await add_task(db_session, test_user, "Created", 60)
+        moved = await add_task(db_session, test_user, "Moved", 30)
+        done = await add_task(db_session, test_user, "Done", 40)
+        deleted = await add_task(db_session, test_user, "Deleted", 50)
+        for task in (created, moved, done, deleted):
+            reminders.on_task_event(task_event("created", task))
+
+        moved.due_date = START + timedelta(seconds=20)
+        reminders.on_task_event(task_event("updated", moved))
+        done.status = TaskStatus.DONE
+        reminders.on_task_event(task_event("updated", done))
+        reminders.on_task_event(task_event("deleted", (deleted.id, test_user.id, 1)))
+        reminders.on_task_event({"type": "task.reminder", "task_id": created.id})
+
+        assert sorted(reminders.entries) == [created.id, moved.id]
+        for _ in range(3):
+            clock.advance(20)
+            await reminders.step()
+        assert titles(reminders) == ["Moved", "Created"]
+
+    @pytest.mark.asyncio
+    async def test_events_during_first_load_are_kept(
+        self, db_session: AsyncSession, sessions, clock: FakeClock, test_user: User
+    ):
+        """Test a change arriving while the first window is being scanned is applied after it."""
+        moved = await add_task(db_session, test_user, "Moved", 3600)
+        reminders = scheduler(sessions, clock)
+
+        def scanning_session():
+            # The scan reads the old due date; the change arrives while it runs
+            moved.due_date = START + timedelta(seconds=10)
+            reminders.on_task_event(task_event("updated", moved))
+            return sessions()
+
+        reminders.session_factories = [scanning_session]
+        assert await reminders.step() == pytest.approx(10)
+        assert list(reminders.entries) == [moved.id]
+
+    @pytest.mark.asyncio
+    async def test_window_scan_uses_due_date_index(self, db_session: AsyncSession, sessions,
+                                                   clock: FakeClock):
+        """Test loading a window is a range scan on the due date, not a table scan."""
+        query = scheduler(sessions, clock).due_tasks(START, START + timedelta(minutes=5))
+        compiled = query.compile(
+            db_session.bind.sync_engine, compile_kwargs={"literal_binds": True}
+        )
+
+        plan = (await db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+
+        assert "USING INDEX ix_tasks_due_date (due_date>? AND due_date<?)" in str(plan)
+
+    @pytest.mark.asyncio
+    async def test_background_loop(
+        self, db_session: AsyncSession, sessions, clock: FakeClock, test_user: User
+    ):
+        """Test the running scheduler sleeps until each reminder and sends it."""
+        await add_task(db_session, test_user, "First", 20)
+        await add_task(db_session, test_user, "Second", 400)
+        sink = RecordingSink()
+        parked = asyncio.Event()
+
+        async def sleep(seconds: float) -> None:
+            if len(sink.sent) == 2:
+                parked.set()
+                await asyncio.Future()  # park until closed, never mid-query
+            await clock.sleep(seconds)
+
+        reminders = scheduler(sessions, clock, sink=sink, sleep=sleep)
+        reminders.start()
+        try:
+            # Closing once both are sent could cancel the lease renewal after the last one
+            await asyncio.wait_for(parked.wait(), 5)
+        finally:
+            await reminders.close()
+
+        assert titles(reminders) == ["First", "Second"]
+        assert reminders.lease.expires_at is None
+
+
+class TestLease:
+    """Test cases for electing the reminder worker."""
+
+    @pytest.mark.asyncio
+    async def test_one_worker_sends_and_successor_resumes(
+        self, db_session: AsyncSession, sessions, clock: FakeClock, test_user: User
+    ):
+        """Test only the lease holder sends, and a successor resumes without repeats."""
+        await add_task(db_session, test_user, "One", 10)
+        await add_task(db_session, test_user, "Two", 50)
+        first = scheduler(sessions, clock, holder="worker-1")
+        second = scheduler(sessions, clock, holder="worker-2")
+
+        await first.step()
+        assert await second.step() == pytest.approx(15)
+        clock.advance(10)
+        await first.step()
+        await second.step()
+        assert titles(first) == ["One"] and titles(second) == []
+
+        clock.advance(31)  # the first worker died before its lease ran out
+        await second.step()
+        clock.advance(10)
+        await second.step()
+        assert titles(second) == ["Two"]
+
+    @pytest.mark.asyncio
+    async def test_stale_holder_cannot_rewind_progress(self, sessions, clock: FakeClock):
+        """Test a worker coming back after losing its lease keeps the successor's checkpoint."""
+        stale = Lease(sessions, LEASE_NAME, ttl=30, holder="stale", clock=clock)
+        successor = Lease(sessions, LEASE_NAME, ttl=30, holder="successor", clock=clock)
+        assert await stale.acquire()
+        assert not await successor.acquire()
+
+        clock.advance(31)
+        assert await successor.acquire()
+        assert await successor.acquire(clock.now)
+        await successor.release()
+
+        assert await stale.acquire(START)
+        assert stale.checkpoint == clock.now
+
+    @pytest.mark.asyncio
+    async def test_periodic_job_runs_only_on_holder(self, sessions, monkeypatch):
+        """Test a periodic job skips runs while another worker holds its lease."""
+        purges = []
+
+        async def purge(session, retention):
+            purges.append(retention)
+            return 0
+
+        async def stop(seconds):
+            raise asyncio.CancelledError()
+
+        monkeypatch.setattr(changes, "purge_tombstones", purge)
+        monkeypatch.setattr(changes, "asyncio", SimpleNamespace(sleep=stop))
+        other = Lease(sessions, "tombstone_compaction:0", holder="other")
+        worker = Lease(sessions, "tombstone_compaction:0", holder="worker")
+        assert await other.acquire()
+
+        with pytest.raises(asyncio.CancelledError):
+            await run_tombstone_compaction(sessions, 60, timedelta(days=1), worker)
+        assert purges == []
+
+        await other.release()
+        with pytest.raises(asyncio.CancelledError):
+            await run_tombstone_compaction(sessions, 60, timedelta(days=1), worker)
+        assert purges == [timedelta(days=1)]
+        assert await other.acquire()  # released when the job was cancelled
@@ -0,0 +1,96 @@
+"""Tests for on-demand request profiling."""
+import json
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app as main_app, request_profiler
+from app.utils.request_profiling import RequestProfiler, install_sql_hooks, write_profile
+
+TOKEN = "profile-secret"
+
+
+@pytest.fixture
+def profiled_app(db_session: AsyncSession, tmp_path):
+    """An app with one SQL-issuing route behind the profiler."""
+    install_sql_hooks()
+    profiler = RequestProfiler(token=TOKEN, directory=tmp_path / "profiles", max_files=2)
+    app = FastAPI()
+    app.middleware("http")(profiler)
+
+    async def session():
+        return db_session
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int, db: AsyncSession = Depends(session)):
+        value = (await db.execute(text("SELECT :n"), {"n": item_id})).scalar()
+        return {"value": value}
+
+    return app, profiler
+
+
+class TestRequestProfiler:
+    """Test cases for the profiling middleware."""
+
+    @pytest.mark.asyncio
+    async def test_token_returns_annotated_profile(self, profiled_app):
+        """Test the admin token turns the response into a profile download."""
+        app, _ = profiled_app
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/items/7", headers={"X-Profile-Token": TOKEN})
+
+        assert response.status_code == 200
+        assert response.headers["X-Profiled-Status"] == "200"
+        assert response.headers["Content-Disposition"].startswith("attachment;")
+        profile = response.json()
+        assert profile["route"] == "GET /items/{item_id}"
+        assert profile["path"] == "/items/7"
+        # The test database also issues BEGIN/SAVEPOINT statements
+        select = [query for query in profile["sql"] if query["statement"] == "SELECT ?"]
+        assert len(select) == 1 and select[0]["duration_ms"] >= 0
+        assert profile["sql_count"] == len(profile["sql"])
+        assert isinstance(profile["folded"], str)
+
+    @pytest.mark.asyncio
+    async def test_other_requests_untouched(self, profiled_app):
+        """Test requests without a valid token are served normally."""
+        app, profiler = profiled_app
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            plain = await client.get("/items/1")
+            wrong = await client.get("/items/1", headers={"X-Profile-Token": "guess"})
+
+        assert plain.json() == wrong.json() == {"value": 1}
+        assert "X-Profiled-Status" not in wrong.headers
+        assert not profiler.directory.exists()
+
+    @pytest.mark.asyncio
+    async def test_sampled_profiles_rotate(self, profiled_app):
+        """Test sampled requests keep their response and write the newest profiles."""
+        app, profiler = profiled_app
+        profiler.sample_rate = 1.0
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            for n in range(3):
+                response = await client.get(f"/items/{n}")
+                assert response.json() == {"value": n}
+
+        files = sorted(profiler.directory.glob("*.json"))
+        assert len(files) == 2
+        assert json.loads(files[-1].read_text())["path"] == "/items/2"
+
+    def test_write_profile_keeps_newest(self, tmp_path):
+        """Test rotation deletes the oldest profiles by name."""
+        for name in ["1.json", "2.json", "3.json"]:
+            write_profile(tmp_path, name, {}, keep=2)
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["2.json", "3.json"]
+
+    def test_disabled_by_default(self):
+        """Test the application installs no profiling middleware unless configured."""
+        assert not request_profiler.enabled
+        assert all(
+            getattr(middleware, "kwargs", {}).get("dispatch") is not request_profiler
+            for middleware in main_app.user_middleware
+        )
@@ -0,0 +1,225 @@
+"""Tests for the per-user response cache."""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task, User
+from app.utils.events import EventHub
+from app.utils.response_cache import CacheBackend, MemoryBackend, RedisBackend, ResponseCache
+
+
+class FakeRedis:
+    """The subset of the redis.asyncio client used by ``RedisBackend``."""
+
+    def __init__(self):
+        self.data: Dict[str, Tuple[Optional[float], bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, px: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + px / 1000 if px else None
+        self.data[key] = (expires_at, value)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self.data[key] = (None, str(value).encode())
+        return value
+
+
+class FakeRequest:
+    def __init__(self, path: str, query: Dict[str, str]):
+        self.url = type("URL", (), {"path": path})()
+        self.query_params = type("Query", (), {"multi_items": lambda _: list(query.items())})()
+
+
+@pytest.fixture
+async def task(db_session: AsyncSession, test_user: User) -> Task:
+    task = Task(title="Cached", owner_id=test_user.id)
+    db_session.add(task)
+    await db_session.commit()
+    return task
+
+
+class TestBackends:
+    """Test cases for cache storage."""
+
+    def test_incomplete_backend_rejected(self):
+        """Test a backend missing storage methods cannot be built."""
+        class VersionlessBackend(CacheBackend):
+            async def get(self, key):
+                return None
+
+            async def set(self, key, value, ttl):
+                pass
+
+        with pytest.raises(TypeError):
+            VersionlessBackend()
+
+    @pytest.mark.asyncio
+    async def test_memory_lru_and_byte_cap(self):
+        """Test least recently used entries go first, by count and by size."""
+        backend = MemoryBackend(max_entries=2, max_bytes=1000)
+        await backend.set("a", b"1", 30)
+        await backend.set("b", b"2", 30)
+        await backend.get("a")
+        await backend.set("c", b"3", 30)
+
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1"
+
+        await backend.set("big", b"x" * 997, 30)
+        assert list(backend.entries) == ["big"]
+        assert backend.bytes == 1000
+        assert backend.evictions == 3
+        await backend.set("huge", b"x" * 2000, 30)
+        assert await backend.get("huge") is None
+
+    @pytest.mark.asyncio
+    async def test_memory_ttl(self):
+        """Test expired entries are misses and free their bytes."""
+        backend = MemoryBackend()
+        await backend.set("a", b"1", 0.01)
+        await asyncio.sleep(0.02)
+
+        assert await backend.get("a") is None
+        assert backend.bytes == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("make_backend", [
+        MemoryBackend,
+        lambda: RedisBackend(client=FakeRedis()),
+    ])
+    async def test_version_bump_invalidates(self, make_backend):
+        """Test a bump hides the user's entries but not other users'."""
+        cache = ResponseCache(make_backend())
+        request = FakeRequest("/api/v1/tasks/", {"status": "todo", "limit": "5"})
+        mine, theirs = await cache.key(1, request), await cache.key(2, request)
+        await cache.set(mine, b"[1]")
+        await cache.set(theirs, b"[2]")
+
+        assert await cache.get(await cache.key(1, request)) == b"[1]"
+        await cache.invalidate(1)
+
+        assert await cache.get(await cache.key(1, request)) is None
+        assert await cache.get(await cache.key(2, request)) == b"[2]"
+        assert cache.stats()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_key_ignores_parameter_order(self):
+        """Test equal queries share a key."""
+        cache = ResponseCache(MemoryBackend())
+
+        first = await cache.key(1, FakeRequest("/t", {"a": "1", "b": "2"}))
+        second = await cache.key(1, FakeRequest("/t", {"b": "2", "a": "1"}))
+
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_backend_failure_is_a_miss(self):
+        """Test an unavailable backend never fails the request."""
+        class Broken(MemoryBackend):
+            async def version(self, scope):
+                raise ConnectionError("down")
+
+        cache = ResponseCache(Broken())
+
+        assert await cache.key(1, FakeRequest("/t", {})) is None
+        assert await cache.get(None) is None
+
+    @pytest.mark.asyncio
+    async def test_task_events_invalidate(self):
+        """Test a hub listener invalidates for events written elsewhere."""
+        cache = ResponseCache(MemoryBackend())
+        hub = EventHub()
+        hub.listeners.append(cache.on_task_event)
+
+        hub.deliver({"type": "task.updated", "owner_id": 3, "task_id": 1})
+        await asyncio.sleep(0)
+
+        assert await cache.backend.version("3") == 1
+
+
+class TestCachedEndpoints:
+    """Test cases for cached task reads."""
+
+    @pytest.mark.asyncio
+    async def test_list_and_detail_hit_after_miss(
+        self, client: AsyncClient, auth_headers: dict, task: Task
+    ):
+        """Test repeated reads are served from the cache with the same body."""
+        for url in ["/api/v1/tasks/?limit=5", f"/api/v1/tasks/{task.id}?fields=id,title"]:
+            first = await client.get(url, headers=auth_headers)
+            second = await client.get(url, headers=auth_headers)
+
+            assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+            assert first.json() == second.json()
+
+    @pytest.mark.asyncio
+    async def test_later_pages_not_cached(
+        self, client: AsyncClient, auth_headers: dict, task: Task
+    ):
+        """Test only first pages are cached."""
+        response = await client.get("/api/v1/tasks/?skip=20", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert "X-Cache" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate(
+        self, client: AsyncClient, auth_headers: dict, task: Task
+    ):
+        """Test create, update and delete are visible on the next read."""
+        async def titles():
+            response = await client.get("/api/v1/tasks/?sort=created_at", headers=auth_headers)
+            return [item["title"] for item in response.json()]
+
+        assert await titles() == ["Cached"]
+        await client.post("/api/v1/tasks/", json={"title": "New"}, headers=auth_headers)
+        assert await titles() == ["Cached", "New"]
+        await client.put(f"/api/v1/tasks/{task.id}", json={"title": "Renamed"},
+                         headers=auth_headers)
+        assert await titles() == ["Renamed", "New"]
+        await client.delete(f"/api/v1/tasks/{task.id}", headers=auth_headers)
+        assert await titles() == ["New"]
+
+    @pytest.mark.asyncio
+    async def test_users_do_not_share_entries(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        superuser_headers: dict,
+        task: Task,
+    ):
+        """Test the same URL is cached separately per user."""
+        await client.get("/api/v1/tasks/", headers=auth_headers)
+        response = await client.get("/api/v1/tasks/", headers=superuser_headers)
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert response.json() == []
+
+    @pytest.mark.asyncio
+    async def test_metrics(
+        self, client: AsyncClient, auth_headers: dict, task: Task, response_cache
+    ):
+        """Test hit ratio and bytes are reported."""
+        for _ in range(4):
+            await client.get(f"/api/v1/tasks/{task.id}", headers=auth_headers)
+
+        stats = response_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (3, 1, 0.75)
+        assert stats["bytes_served"] > 0 and stats["entries"] == 1
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert "hit_ratio" in response.json()["response_cache"]
@@ -0,0 +1,200 @@
+"""Tests for the production server entrypoint."""
+import json
+import os
+import sys
+import types
+
+import pytest
+
+from app.config import Settings
+from app import serve
+from app.serve import (
+    available_cpus,
+    cgroup_cpu_limit,
+    main,
+    prepare_schema,
+    response_cache_coherent,
+    run_worker,
+    server_options,
+    worker_count,
+)
+
+
+def make_settings(**overrides) -> Settings:
+    return Settings(DATABASE_URL="sqlite+aiosqlite:///./app.db", **overrides)
+
+
+class TestCpuDetection:
+    """Test cases for reading CPU limits."""
+
+    def test_cgroup_v2_quota(self, tmp_path):
+        """Test a cgroup v2 quota is converted to CPUs."""
+        (tmp_path / "cpu.max").write_text("250000 100000\n")
+
+        assert cgroup_cpu_limit(tmp_path) == 2.5
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        """Test an unlimited cgroup v2 quota."""
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+
+        assert cgroup_cpu_limit(tmp_path) is None
+
+    def test_cgroup_v1_quota(self, tmp_path):
+        """Test cgroup v1 quota and period files."""
+        cpu = tmp_path / "cpu,cpuacct"
+        cpu.mkdir()
+        (cpu / "cpu.cfs_quota_us").write_text("200000\n")
+        (cpu / "cpu.cfs_period_us").write_text("100000\n")
+
+        assert cgroup_cpu_limit(tmp_path) == 2.0
+        (cpu / "cpu.cfs_quota_us").write_text("-1\n")
+        assert cgroup_cpu_limit(tmp_path) is None
+
+    def test_quota_caps_affinity(self, tmp_path, monkeypatch):
+        """Test a quota below the host's CPUs wins."""
+        monkeypatch.setattr("os.sched_getaffinity", lambda pid: set(range(16)))
+        (tmp_path / "cpu.max").write_text("200000 100000\n")
+
+        assert available_cpus(tmp_path) == 2.0
+        assert available_cpus(tmp_path / "missing") == 16.0
+
+
+class TestWorkerSizing:
+    """Test cases for choosing the worker count."""
+
+    def test_sized_from_cpus(self):
+        """Test workers follow available CPUs within the configured bounds."""
+        assert worker_count(make_settings(), 16) == 16
+        assert worker_count(make_settings(), 2.5) == 2
+        assert worker_count(make_settings(), 0.5) == 1
+        assert worker_count(make_settings(SERVER_WORKERS_PER_CPU=2), 4) == 8
+        assert worker_count(make_settings(SERVER_MAX_WORKERS=4), 16) == 4
+
+    def test_explicit_workers(self):
+        """Test SERVER_WORKERS overrides sizing."""
+        assert worker_count(make_settings(SERVER_WORKERS=3), 16) == 3
+
+    def test_in_memory_sqlite_single_worker(self):
+        """Test an in-memory database is never split across processes."""
+        config = Settings(DATABASE_URL="sqlite+aiosqlite:///:memory:", SERVER_WORKERS=4)
+        shared = Settings(
+            DATABASE_URL="sqlite+aiosqlite:///file:db?mode=memory&cache=shared&uri=true",
+            SERVER_WORKERS=4,
+        )
+
+        assert worker_count(config, 16) == 1
+        assert worker_count(shared, 16) == 1
+        assert worker_count(Settings(DATABASE_URL="sqlite+aiosqlite://"), 16) == 1
+
+
+class TestSchemaPreparation:
+    """Test cases for creating the schema before workers start."""
+
+    @pytest.mark.parametrize("workers, mode, created", [
+        (4, "create_all", True),
+        (1, "create_all", False),
+        (4, "migrations", False),
+    ])
+    def test_created_once_for_several_workers(self, monkeypatch, workers, mode, created):
+        """Test several create_all workers get the schema from the supervisor and skip DDL."""
+        calls = []
+        # Stands in for asyncio.run, which would also close the test's event loop
+        monkeypatch.setattr(serve.asyncio, "run", lambda coro: calls.append(coro.close()))
+        monkeypatch.setenv("DB_STARTUP_MODE", mode)
+
+        prepare_schema(make_settings(DB_STARTUP_MODE=mode), workers)
+
+        assert len(calls) == int(created)
+        assert os.environ["DB_STARTUP_MODE"] == ("none" if created else mode)
+
+
+class TestResponseCacheCoherence:
+    """Test cases for keeping per-worker caches from serving stale reads."""
+
+    def test_off_by_default(self):
+        """Test the response cache is off unless configured."""
+        assert Settings.model_fields["RESPONSE_CACHE_BACKEND"].default == "off"
+
+    def test_memory_cache_needs_one_worker_or_shared_events(self):
+        """Test a memory cache is only kept where other workers' writes reach it."""
+        memory = make_settings(RESPONSE_CACHE_BACKEND="memory")
+
+        assert response_cache_coherent(memory, 1)
+        assert not response_cache_coherent(memory, 4)
+        assert response_cache_coherent(memory.model_copy(update={"EVENTS_BACKEND": "postgres"}), 4)
+        assert response_cache_coherent(make_settings(RESPONSE_CACHE_BACKEND="redis"), 4)
+
+
+class TestServerOptions:
+    """Test cases for the uvicorn options."""
+
+    def test_settings_are_applied(self):
+        """Test keep-alive, backlog, shutdown and recycling settings."""
+        options = server_options(
+            make_settings(
+                SERVER_KEEPALIVE_SECONDS=120,
+                SERVER_BACKLOG=4096,
+                SERVER_GRACEFUL_TIMEOUT_SECONDS=10,
+                SERVER_MAX_REQUESTS=5000,
+                SERVER_LOOP="asyncio",
+                SERVER_HTTP="h11",
+            ),
+            workers=4,
+        )
+
+        assert options["workers"] == 4
+        assert options["timeout_keep_alive"] == 120
+        assert options["backlog"] == 4096
+        assert options["timeout_graceful_shutdown"] == 10
+        assert options["limit_max_requests"] == 5000
+        assert (options["loop"], options["http"]) == ("asyncio", "h11")
+        assert server_options(make_settings(), 1)["limit_max_requests"] is None
+
+    def test_auto_uses_fast_implementations_when_installed(self, monkeypatch):
+        """Test auto picks uvloop and httptools only when importable."""
+        monkeypatch.setattr(
+            "importlib.util.find_spec", lambda name: object() if name == "uvloop" else None
+        )
+
+        options = server_options(make_settings(), 1)
+
+        assert (options["loop"], options["http"]) == ("uvloop", "h11")
+
+    def test_dry_run(self, capsys):
+        """Test --dry-run prints the options without serving."""
+        assert main(["--workers", "2", "--dry-run"]) == 0
+
+        printed = json.loads(capsys.readouterr().out)
+        assert printed["workers"] in (1, 2)  # 1 when the test database is in memory
+        assert printed["app"] == "app.main:app"
+
+
+class TestWorkerRecycling:
+    """Test cases for per-worker request limits."""
+
+    def test_limit_is_jittered(self, monkeypatch):
+        """Test each worker adds up to the jitter to its request limit."""
+        started = []
+
+        class FakeServer:
+            def __init__(self, config):
+                self.config = config
+
+            def run(self, sockets=None):
+                started.append(self.config.limit_max_requests)
+
+        monkeypatch.setitem(sys.modules, "uvicorn", types.SimpleNamespace(Server=FakeServer))
+        for _ in range(20):
+            run_worker(types.SimpleNamespace(limit_max_requests=1000), max_requests_jitter=50)
+        run_worker(types.SimpleNamespace(limit_max_requests=None), max_requests_jitter=50)
+
+        assert all(1000 <= limit <= 1050 for limit in started[:20])
+        assert len(set(started[:20])) > 1
+        assert started[-1] is None
+
+
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_invalid_worker_settings_rejected(value):
+    """Test nonsensical sizing settings fail validation."""
+    with pytest.raises(ValueError):
+        make_settings(SERVER_WORKERS_PER_CPU=value)
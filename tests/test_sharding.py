@@ -0,0 +1,250 @@
+"""Tests for owner-based task sharding."""
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import ShardRouter, get_shard_router
+from app.main import app
+from app.models import ArchivedTask, Task, TaskPriority, TaskStatus, TaskTombstone, User
+from app.utils import provisioning
+from app.utils.sharding import create_shard_schema, move_user, plan_rebalance
+
+
+@pytest.fixture
+async def shards(tmp_path) -> ShardRouter:
+    """Three task shards in local SQLite files."""
+    router = ShardRouter([f"sqlite+aiosqlite:///{tmp_path / f'shard{n}.db'}" for n in range(3)])
+    await create_shard_schema(router)
+    yield router
+    await router.dispose()
+
+
+@pytest.fixture
+def sharded(client: AsyncClient, shards: ShardRouter) -> AsyncClient:
+    """The test client with tasks stored on the shards."""
+    app.dependency_overrides[get_shard_router] = lambda: shards
+    return client
+
+
+@pytest.fixture
+def directory(db_session: AsyncSession) -> async_sessionmaker:
+    """Main database sessions joining the test transaction."""
+    return async_sessionmaker(
+        db_session.bind, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+
+async def shard_tasks(shards: ShardRouter, shard: int, owner_id: int) -> list:
+    async with shards.session_factory(shard)() as session:
+        query = select(Task).where(Task.owner_id == owner_id).order_by(Task.id)
+        return (await session.execute(query)).scalars().all()
+
+
+class TestShardRouter:
+    """Test cases for shard placement."""
+
+    def test_ring_spreads_and_appending_moves_few(self, shards: ShardRouter):
+        """Test placement is stable, uses every shard and mostly survives a new shard."""
+        before = {owner: shards.place(owner) for owner in range(1, 2001)}
+        grown = ShardRouter([f"sqlite+aiosqlite:///unused{n}.db" for n in range(4)])
+
+        after = {owner: grown.place(owner) for owner in before}
+        moved = [owner for owner in before if before[owner] != after[owner]]
+
+        assert set(before.values()) == {0, 1, 2}
+        assert before == {owner: shards.place(owner) for owner in before}
+        assert len(moved) < 0.4 * len(before)
+        assert {after[owner] for owner in moved} == {3}
+
+    def test_task_ids_hold_every_shard_range(self):
+        """Test task id columns are 64-bit on PostgreSQL, where shard 1 starts past INT4."""
+        tasks, archived, tombstones = (
+            str(CreateTable(model.__table__).compile(dialect=postgresql.dialect()))
+            for model in (Task, ArchivedTask, TaskTombstone)
+        )
+
+        assert "\tid BIGSERIAL NOT NULL" in tasks
+        assert "\tid BIGINT NOT NULL" in archived
+        assert "\ttask_id BIGINT NOT NULL" in tombstones
+        assert ShardRouter.ID_RANGE > 2**31
+
+    def test_unplaced_users_on_shard_zero(self, shards: ShardRouter):
+        """Test users from before sharding map to the first shard."""
+        assert shards.shard_for(User(shard=None)) == 0
+        assert shards.shard_for(User(shard=2)) == 2
+
+
+class TestShardedRequests:
+    """Test cases for task endpoints on shards."""
+
+    @pytest.mark.asyncio
+    async def test_tasks_live_on_users_shard(
+        self,
+        sharded: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        test_user: User,
+        shards: ShardRouter,
+    ):
+        """Test writes and reads go to the user's shard with ids from its range."""
+        test_user.shard = 2
+        await db_session.commit()
+
+        created = await sharded.post("/api/v1/tasks/", json={"title": "Sharded"},
+                                     headers=auth_headers)
+        task_id = created.json()["id"]
+
+        assert created.status_code == 201
+        assert task_id > 2 * ShardRouter.ID_RANGE
+        assert [task.id for task in await shard_tasks(shards, 2, test_user.id)] == [task_id]
+        assert (await db_session.execute(select(func.count(Task.id)))).scalar() == 0
+
+        response = await sharded.get(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+        assert response.json()["title"] == "Sharded"
+        stats = await sharded.get("/api/v1/tasks/stats/summary", headers=auth_headers)
+        assert stats.json()["total_tasks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_register_places_user(
+        self, sharded: AsyncClient, db_session: AsyncSession, shards: ShardRouter
+    ):
+        """Test new users are pinned to their hash ring shard."""
+        response = await sharded.post("/api/v1/auth/register", json={
+            "email": "placed@example.com",
+            "username": "placed",
+            "password": "Placed123!",
+        })
+
+        user = await db_session.get(User, response.json()["id"])
+        assert user.shard == shards.place(user.id)
+
+    @pytest.mark.asyncio
+    async def test_bulk_provisioning_places_users(
+        self, sharded: AsyncClient, db_session: AsyncSession, shards: ShardRouter,
+        superuser_headers: dict, monkeypatch,
+    ):
+        """Test bulk provisioned users are pinned to their shards like registered ones."""
+        async def hash_passwords(passwords):
+            return ["x"] * len(passwords)
+
+        monkeypatch.setattr(provisioning, "hash_passwords", hash_passwords)
+        rows = [
+            {"email": f"bulk{n}@example.com", "username": f"bulk{n}", "password": "Bulk1234!"}
+            for n in range(12)
+        ]
+
+        response = await sharded.post(
+            "/api/v1/users/bulk", headers=superuser_headers, json={"users": rows}
+        )
+
+        assert response.json()["created"] == 12
+        users = (await db_session.execute(
+            select(User).where(User.username.like("bulk%"))
+        )).scalars().all()
+        assert [user.shard for user in users] == [shards.place(user.id) for user in users]
+        assert len({user.shard for user in users}) > 1
+
+
+class TestRebalancing:
+    """Test cases for moving users between shards."""
+
+    @pytest.mark.asyncio
+    async def test_move_keeps_ids_and_sync_state(
+        self,
+        sharded: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        directory: async_sessionmaker,
+        test_user: User,
+        shards: ShardRouter,
+    ):
+        """Test a move copies tasks and tombstones, switches the user and empties the source."""
+        ids = []
+        for title in ["One", "Two", "Three"]:
+            response = await sharded.post("/api/v1/tasks/", json={"title": title},
+                                          headers=auth_headers)
+            ids.append(response.json()["id"])
+        await sharded.delete(f"/api/v1/tasks/{ids[1]}", headers=auth_headers)
+        token = (await sharded.get("/api/v1/tasks/changes", headers=auth_headers)).json()
+        await sharded.put(f"/api/v1/tasks/{ids[0]}", json={"status": "done"},
+                          headers=auth_headers)
+
+        moved = await move_user(shards, directory, test_user.id, 1, batch_size=1)
+
+        assert moved == 2
+        await db_session.refresh(test_user)
+        assert test_user.shard == 1
+        assert await shard_tasks(shards, 0, test_user.id) == []
+        async with shards.session_factory(1)() as session:
+            tombstones = (await session.execute(select(TaskTombstone.task_id))).scalars().all()
+        assert tombstones == [ids[1]]
+
+        task = (await sharded.get(f"/api/v1/tasks/{ids[0]}", headers=auth_headers)).json()
+        assert task["status"] == "done"
+        changes = (await sharded.get(
+            f"/api/v1/tasks/changes?since={token['next_token']}", headers=auth_headers
+        )).json()
+        assert sorted(item["id"] for item in changes["changed"]) == [ids[0], ids[2]]
+        assert changes["deleted"] == [ids[1]]
+
+        created = await sharded.post("/api/v1/tasks/", json={"title": "Four"},
+                                     headers=auth_headers)
+        assert created.json()["id"] > ShardRouter.ID_RANGE
+
+    @pytest.mark.asyncio
+    async def test_move_carries_archive(
+        self, directory: async_sessionmaker, test_user: User, shards: ShardRouter
+    ):
+        """Test archived tasks move too and replace a stale hot copy on the target."""
+        archived = dict(
+            id=5, title="Old", owner_id=test_user.id, status=TaskStatus.DONE,
+            priority=TaskPriority.MEDIUM,
+            created_at=datetime(2020, 1, 1), updated_at=datetime(2020, 1, 2),
+        )
+        async with shards.session_factory(0)() as session:
+            await session.execute(insert(ArchivedTask.__table__).values(**archived))
+            await session.commit()
+        async with shards.session_factory(1)() as session:
+            session.add(Task(id=5, title="Stale", owner_id=test_user.id))
+            await session.commit()
+
+        await move_user(shards, directory, test_user.id, 1)
+
+        assert await shard_tasks(shards, 1, test_user.id) == []
+        for shard, expected in [(0, []), (1, [5])]:
+            async with shards.session_factory(shard)() as session:
+                rows = (await session.execute(select(ArchivedTask.id))).scalars().all()
+            assert rows == expected
+
+    @pytest.mark.asyncio
+    async def test_plan_lists_misplaced_users(
+        self,
+        db_session: AsyncSession,
+        directory: async_sessionmaker,
+        test_user: User,
+        shards: ShardRouter,
+    ):
+        """Test the plan moves users whose shard differs from the ring, and nobody else."""
+        placed = shards.place(test_user.id)
+        test_user.shard = (placed + 1) % 3
+        await db_session.commit()
+
+        assert await plan_rebalance(shards, directory) == [
+            (test_user.id, (placed + 1) % 3, placed)
+        ]
+        test_user.shard = placed
+        await db_session.commit()
+        assert await plan_rebalance(shards, directory) == []
+
+    @pytest.mark.asyncio
+    async def test_move_rejects_unknown_shard(
+        self, directory: async_sessionmaker, test_user: User, shards: ShardRouter
+    ):
+        """Test moving to a shard that is not configured fails before copying."""
+        with pytest.raises(ValueError, match="No shard 7"):
+            await move_user(shards, directory, test_user.id, 7)
@@ -0,0 +1,90 @@
+"""Tests for startup helpers."""
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.database import create_engines
+from app.startup import StartupTimer, check_schema_revision, over_budget, warm_up_pool
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    """Engine on a throwaway SQLite file."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}", pool_size=5)
+    yield engine
+    await engine.dispose()
+
+
+class TestStartup:
+    """Test cases for startup helpers."""
+    
+    def test_timer_report(self):
+        """Test phases are reported in milliseconds with a total."""
+        timer = StartupTimer()
+        timer.record("engine", 0.25)
+        with timer.phase("warmup"):
+            pass
+        timer.mark_imports_done()
+        report = timer.report()
+        assert report["engine"] == 250.0
+        assert set(report) == {"engine", "warmup", "imports", "total"}
+        assert report["total"] >= report["imports"]
+    
+    def test_over_budget(self):
+        """Test the budget check ignores a zero budget."""
+        assert over_budget({"total": 2500.0}, 2.0)
+        assert not over_budget({"total": 1500.0}, 2.0)
+        assert not over_budget({"total": 2500.0}, 0)
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_pool(self, file_engine):
+        """Test warm-up leaves connections open in the pool."""
+        assert await warm_up_pool(file_engine, 3) == 3
+        assert file_engine.pool.checkedin() == 3
+        assert await warm_up_pool(file_engine, 0) == 0
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_concurrent_mode(self, tmp_path, monkeypatch):
+        """Test warm-up in SQLite concurrent mode stays within the writer's single connection."""
+        monkeypatch.setattr(settings, "SQLITE_CONCURRENT_MODE", True)
+        monkeypatch.setattr(settings, "SQLITE_READ_POOL_SIZE", 2)
+        writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'concurrent.db'}")
+        try:
+            warmed = await asyncio.wait_for(asyncio.gather(
+                warm_up_pool(writer, 3), warm_up_pool(reader, 3)
+            ), timeout=5)
+            assert warmed == [1, 2]
+            assert writer.pool.checkedin() == 1
+            assert reader.pool.checkedin() == 2
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_schema_revision_matches_head(self, file_engine):
+        """Test a database stamped at head passes the check."""
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+        
+        heads = ScriptDirectory.from_config(Config("alembic.ini")).get_heads()
+        async with file_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+            for head in heads:
+                await conn.execute(
+                    text("INSERT INTO alembic_version VALUES (:rev)"), {"rev": head}
+                )
+        
+        await check_schema_revision(file_engine)
+    
+    @pytest.mark.asyncio
+    async def test_schema_revision_mismatch(self, file_engine):
+        """Test an out-of-date database refuses to start."""
+        async with file_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+            await conn.execute(text("INSERT INTO alembic_version VALUES ('deadbeef')"))
+        
+        with pytest.raises(RuntimeError, match="alembic upgrade head"):
+            await check_schema_revision(file_engine)
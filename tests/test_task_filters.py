@@ -0,0 +1,141 @@
+"""Tests for task list filters, sorting and their indexes."""
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task, TaskPriority, TaskStatus, User
+from app.utils.task_filters import filter_tasks, sort_tasks
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+async def tasks(db_session: AsyncSession, test_user: User) -> dict:
+    """Tasks covering every filter, keyed by title."""
+    specs = [
+        ("Alpha report", TaskPriority.HIGH, TaskStatus.TODO, NOW - timedelta(days=2), None),
+        ("alpha review", TaskPriority.LOW, TaskStatus.DONE, NOW - timedelta(days=1), NOW),
+        ("Beta plan", TaskPriority.MEDIUM, TaskStatus.IN_PROGRESS, NOW + timedelta(days=3), None),
+        ("Gamma%", TaskPriority.HIGH, TaskStatus.TODO, None, None),
+    ]
+    created = {}
+    for offset, (title, priority, status, due_date, completed_at) in enumerate(specs):
+        task = Task(
+            title=title,
+            priority=priority,
+            status=status,
+            due_date=due_date,
+            completed_at=completed_at,
+            created_at=NOW - timedelta(hours=10 - offset),
+            owner_id=test_user.id,
+        )
+        db_session.add(task)
+        created[title] = task
+    await db_session.commit()
+    return created
+
+
+async def list_titles(client: AsyncClient, headers: dict, query: str) -> list:
+    response = await client.get(f"/api/v1/tasks/?{query}", headers=headers)
+    assert response.status_code == 200, response.text
+    return [task["title"] for task in response.json()]
+
+
+class TestTaskFilters:
+    """Test cases for filtering and sorting GET /tasks/."""
+
+    @pytest.mark.asyncio
+    async def test_filters(self, client: AsyncClient, auth_headers: dict, tasks: dict):
+        """Test each filter on its own."""
+        now = NOW.isoformat()
+        assert await list_titles(client, auth_headers, "priority=high") == [
+            "Gamma%", "Alpha report"
+        ]
+        assert await list_titles(
+            client, auth_headers, f"due_after={now}&due_before={NOW + timedelta(days=7)}"
+        ) == ["Beta plan"]
+        assert await list_titles(client, auth_headers, "overdue=true") == ["Alpha report"]
+        assert await list_titles(client, auth_headers, "overdue=false") == [
+            "Gamma%", "Beta plan", "alpha review"
+        ]
+        assert await list_titles(
+            client, auth_headers, f"completed_since={(NOW - timedelta(hours=1)).isoformat()}"
+        ) == ["alpha review"]
+        assert await list_titles(client, auth_headers, "status=done") == ["alpha review"]
+
+    @pytest.mark.asyncio
+    async def test_title_prefix(self, client: AsyncClient, auth_headers: dict, tasks: dict):
+        """Test the title prefix ignores case and treats wildcards literally."""
+        assert await list_titles(client, auth_headers, "title_prefix=ALPHA") == [
+            "alpha review", "Alpha report"
+        ]
+        assert await list_titles(client, auth_headers, "title_prefix=gamma%25") == ["Gamma%"]
+        assert await list_titles(client, auth_headers, "title_prefix=%25") == []
+
+    @pytest.mark.asyncio
+    async def test_timezone_aware_bounds(
+        self, client: AsyncClient, auth_headers: dict, tasks: dict
+    ):
+        """Test aware timestamps are compared in UTC."""
+        bound = (NOW + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%S") + "%2B02:00"
+        assert await list_titles(client, auth_headers, f"due_after={bound}") == ["Beta plan"]
+
+    @pytest.mark.asyncio
+    async def test_sorting(self, client: AsyncClient, auth_headers: dict, tasks: dict):
+        """Test whitelisted sort keys in both directions."""
+        assert await list_titles(client, auth_headers, "sort=-priority") == [
+            "Gamma%", "Alpha report", "Beta plan", "alpha review"
+        ]
+        assert await list_titles(client, auth_headers, "sort=priority&status=todo") == [
+            "Alpha report", "Gamma%"
+        ]
+        titles = await list_titles(client, auth_headers, "sort=due_date&overdue=false")
+        assert titles[-1] == "Beta plan"
+
+    @pytest.mark.asyncio
+    async def test_unknown_sort_key(self, client: AsyncClient, auth_headers: dict):
+        """Test sorting by a column outside the whitelist is rejected."""
+        response = await client.get("/api/v1/tasks/?sort=description", headers=auth_headers)
+
+        assert response.status_code == 422
+
+
+class TestTaskListIndexes:
+    """Test every supported filter and sort uses a matching index."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("filters,sort,index", [
+        ({}, "-created_at", "ix_tasks_owner_id_created_at"),
+        ({}, "updated_at", "ix_tasks_owner_id_updated_at"),
+        ({}, "-due_date", "ix_tasks_owner_id_due_date"),
+        ({}, "-priority", "ix_tasks_owner_id_priority_rank_created_at"),
+        ({"status": TaskStatus.TODO}, "-created_at", "ix_tasks_owner_id_status_created_at"),
+        (
+            {"priority": TaskPriority.HIGH},
+            "-created_at",
+            "ix_tasks_owner_id_priority_rank_created_at",
+        ),
+        ({"overdue": True}, "due_date", "ix_tasks_owner_id_due_date"),
+        (
+            {"due_after": NOW, "due_before": NOW + timedelta(days=7)},
+            "due_date",
+            "ix_tasks_owner_id_due_date",
+        ),
+        ({"completed_since": NOW}, "-created_at", "ix_tasks_owner_id_completed_at"),
+        ({"title_prefix": "rep"}, "-created_at", "ix_tasks_owner_id_title_lower"),
+    ])
+    async def test_query_plan(self, db_session: AsyncSession, filters, sort, index):
+        """Test the query plan seeks the expected index."""
+        query = filter_tasks(select(Task).where(Task.owner_id == 1), now=NOW, **filters)
+        query = sort_tasks(query, sort).limit(20)
+        compiled = query.compile(compile_kwargs={"literal_binds": True})
+        connection = await db_session.connection()
+        rows = (await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")).all()
+        detail = " ".join(row[-1] for row in rows)
+        assert f"USING INDEX {index} " in detail
+        if filters.keys() <= {"status", "priority", "overdue", "due_after", "due_before"}:
+            # The index also delivers the order, so no sort step
+            assert "TEMP B-TREE" not in detail
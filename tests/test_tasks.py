@@ -3,6 +3,7 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models import User, Task, TaskStatus, TaskPriority
 
 
@@ -270,3 +271,63 @@ class TestTasks:
         assert data["by_status"]["todo"] == 2
         assert data["by_status"]["in_progress"] == 1
         assert data["by_status"]["done"] == 1
+
+
+class TestTaskBatch:
+    """Test cases for fetching tasks by id in one request."""
+    
+    @pytest.fixture
+    async def tasks(self, db_session: AsyncSession, test_user: User, test_superuser: User):
+        """Three of the user's tasks and one of another user's."""
+        mine = [Task(title=f"Task {i}", owner_id=test_user.id) for i in range(3)]
+        theirs = Task(title="Not mine", owner_id=test_superuser.id)
+        db_session.add_all([*mine, theirs])
+        await db_session.commit()
+        return mine, theirs
+    
+    @pytest.mark.asyncio
+    async def test_get_preserves_order_and_reports_missing(
+        self, client: AsyncClient, auth_headers: dict, tasks
+    ):
+        """Test items follow the request and foreign or unknown ids are missing."""
+        mine, theirs = tasks
+        ids = [mine[2].id, 999999, mine[0].id, theirs.id, mine[2].id]
+        
+        response = await client.get(
+            f"/api/v1/tasks/batch?ids={','.join(map(str, ids))}", headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["title"] for item in data["items"]] == ["Task 2", "Task 0"]
+        assert data["missing"] == [999999, theirs.id]
+    
+    @pytest.mark.asyncio
+    async def test_post_with_fields(self, client: AsyncClient, auth_headers: dict, tasks):
+        """Test the POST variant and sparse fieldsets."""
+        mine, _ = tasks
+        
+        response = await client.post(
+            "/api/v1/tasks/batch?fields=id,title",
+            json={"ids": [mine[1].id, mine[0].id]},
+            headers=auth_headers,
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "items": [{"id": mine[1].id, "title": "Task 1"}, {"id": mine[0].id, "title": "Task 0"}],
+            "missing": [],
+        }
+    
+    @pytest.mark.asyncio
+    async def test_invalid_requests(self, client: AsyncClient, auth_headers: dict, monkeypatch):
+        """Test malformed, empty and oversized id lists are rejected."""
+        monkeypatch.setattr(settings, "TASK_BATCH_MAX_IDS", 2)
+        
+        for query in ["ids=1,x", "ids=", "ids=1,2,3"]:
+            response = await client.get(f"/api/v1/tasks/batch?{query}", headers=auth_headers)
+            assert response.status_code == 400, query
+        response = await client.post(
+            "/api/v1/tasks/batch", json={"ids": []}, headers=auth_headers
+        )
+        assert response.status_code == 422
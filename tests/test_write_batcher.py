@@ -0,0 +1,135 @@
+"""Tests for group-commit write batching."""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.main import app
+from app.models import Task, User
+from app.utils.write_batcher import WriteBatcher, get_write_batcher
+
+
+@pytest.fixture
+async def file_sessions(tmp_path):
+    """Session factory on a throwaway SQLite file with one user."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'batch.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(User(email="batch@example.com", username="batch", hashed_password="x"))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+def insert_task(title: str):
+    """Write operation inserting a task for user 1."""
+    async def operation(session: AsyncSession) -> Task:
+        task = Task(title=title, owner_id=1)
+        session.add(task)
+        await session.flush()
+        return task
+    return operation
+
+
+async def failing(session: AsyncSession) -> None:
+    """Write operation that always fails."""
+    raise ValueError("bad write")
+
+
+async def count_tasks(factory) -> int:
+    async with factory() as session:
+        return (await session.execute(select(func.count(Task.id)))).scalar()
+
+
+class TestWriteBatcher:
+    """Test cases for the write batcher."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_commits(self, file_sessions):
+        """Test concurrent submissions are committed in few batches."""
+        batcher = WriteBatcher(file_sessions, max_batch_size=10, max_latency_ms=50)
+        tasks = await asyncio.gather(*(batcher.submit(insert_task(f"T{i}")) for i in range(25)))
+        await batcher.close()
+        
+        assert [task.title for task in tasks] == [f"T{i}" for i in range(25)]
+        assert all(task.id for task in tasks)
+        assert batcher.operations == 25
+        assert batcher.batches == 3
+        assert await count_tasks(file_sessions) == 25
+    
+    @pytest.mark.asyncio
+    async def test_latency_bound(self, file_sessions):
+        """Test a lone write is committed after the latency bound."""
+        batcher = WriteBatcher(file_sessions, max_batch_size=100, max_latency_ms=1)
+        task = await asyncio.wait_for(batcher.submit(insert_task("alone")), timeout=2)
+        await batcher.close()
+        assert task.id is not None
+        assert batcher.batches == 1
+    
+    @pytest.mark.asyncio
+    async def test_failure_is_isolated(self, file_sessions):
+        """Test a failing write gets its error while the rest of the batch commits."""
+        batcher = WriteBatcher(file_sessions, max_batch_size=10, max_latency_ms=50)
+        results = await asyncio.gather(
+            batcher.submit(insert_task("ok 1")),
+            batcher.submit(failing),
+            batcher.submit(insert_task("ok 2")),
+            return_exceptions=True,
+        )
+        await batcher.close()
+        
+        assert results[0].title == "ok 1"
+        assert isinstance(results[1], ValueError)
+        assert results[2].title == "ok 2"
+        assert await count_tasks(file_sessions) == 2
+    
+    @pytest.mark.asyncio
+    async def test_close_flushes_queue(self, file_sessions):
+        """Test closing commits writes that are still queued."""
+        batcher = WriteBatcher(file_sessions, max_batch_size=100, max_latency_ms=10_000)
+        pending = [asyncio.ensure_future(batcher.submit(insert_task(f"Q{i}"))) for i in range(3)]
+        await asyncio.sleep(0)
+        await batcher.close()
+        assert len(await asyncio.gather(*pending)) == 3
+        assert await count_tasks(file_sessions) == 3
+    
+    @pytest.mark.asyncio
+    async def test_task_endpoints_batched(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test create and update go through the batcher when it is enabled."""
+        # Batch sessions join the test transaction like the db_session fixture
+        sessions = async_sessionmaker(
+            db_session.bind, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+        batcher = WriteBatcher(sessions, max_latency_ms=1)
+        app.dependency_overrides[get_write_batcher] = lambda: batcher
+        try:
+            response = await client.post(
+                "/api/v1/tasks/", headers=auth_headers, json={"title": "Batched"}
+            )
+            assert response.status_code == 201
+            task_id = response.json()["id"]
+            
+            response = await client.put(
+                f"/api/v1/tasks/{task_id}", headers=auth_headers, json={"status": "done"}
+            )
+            assert response.status_code == 200
+            assert response.json()["completed_at"] is not None
+            
+            response = await client.put(
+                "/api/v1/tasks/99999", headers=auth_headers, json={"status": "done"}
+            )
+            assert response.status_code == 404
+        finally:
+            await batcher.close()
+            app.dependency_overrides.pop(get_write_batcher, None)
+        assert batcher.operations == 3